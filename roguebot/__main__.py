@@ -10,6 +10,12 @@ import logging
 import random
 from .bot import Bot
 from .client import EntityClient
+from .state.state import State
+from .state.entity import Entities
+from .retention import RetentionPolicy
+from .wire_trace import WireTracer
+from .tick_scheduler import create_tick_scheduler
+from .json_codec import create_json_codec
 
 from .env_vars import EnvVarExtractor
 
@@ -24,13 +30,26 @@ def main():
         logger = logging.getLogger(__name__)
         logger.debug(str(env))
 
+        wire_tracer = WireTracer(file_path=env.wire_trace_file,
+                                 sample_rates=env.wire_trace_sample_rates,
+                                 payload_bytes=env.wire_trace_payload_bytes)
         client = EntityClient(env.character_name, env.character_role,
-                              env.url)
+                              env.url, wire_tracer=wire_tracer,
+                              json_codec=create_json_codec(env.json_codec))
+        if env.columnar_entities:
+            client.state = State(entities=Entities(columnar=True))
         bot = Bot(env.character_name, client, speed=env.speed,
                   actions_per_turn=env.actions_per_turn,
                   bot_http_server_port=env.bot_http_server_port,
                   bot_http_server_address=env.bot_http_server_address,
-                  startup_delay_seconds=env.startup_delay_seconds)
+                  startup_delay_seconds=env.startup_delay_seconds,
+                  retention_policy=RetentionPolicy(
+                      max_levels=env.retention_max_levels,
+                      max_level_age_seconds=env.retention_max_level_age_seconds,
+                      max_places_per_level=env.retention_max_places_per_level,
+                      max_goal_depth=env.retention_max_goal_depth),
+                  tick_scheduler=create_tick_scheduler(
+                      env.scheduler, env.speed, env.actions_per_turn))
         client.bot = bot
 
         # Run the game on this thread. This blocks until the bot dies.
@@ -0,0 +1,187 @@
+"""
+Sends the bot's actions to the server from a task of its own, so the bot
+doesn't wait for them to be sent before carrying on.
+"""
+
+import asyncio
+import collections
+import logging
+import time
+from .action import Action, ActionCode
+
+
+class ActionWriter:
+    """
+    A queue of actions waiting to be sent to the server, with a task
+    which sends them one at a time, oldest first.
+
+    - When new actions including moves are queued, moves queued earlier
+      which haven't been sent yet are dropped, as they belong to an older plan.
+      Item actions are always kept.
+    - The queue holds at most max_queue_depth actions. If it gets that full,
+      the oldest unsent moves are dropped to make room, and if there is still
+      no room the new actions are dropped.
+
+    The depth of the queue and how long each emit takes are recorded.
+    """
+
+    DEFAULT_MAX_QUEUE_DEPTH = 32
+
+    def __init__(self, client, max_queue_depth: int = DEFAULT_MAX_QUEUE_DEPTH,
+                 clock=time.monotonic):
+        """
+        Parameters:
+            client (IEntityClient): Where actions are sent.
+            max_queue_depth (int): The most actions waiting to be sent.
+            clock : Gives the time in seconds. Defaults to time.monotonic
+        """
+        self._logger = logging.getLogger(__name__)
+        self._client = client
+        self._max_queue_depth = max(max_queue_depth, 1)
+        self._clock = clock
+        self._queue = collections.deque()
+        self._has_work = None
+        self._task = None
+
+        self._submitted_count = 0
+        self._sent_count = 0
+        self._failed_count = 0
+        self._superseded_count = 0
+        self._dropped_count = 0
+        self._max_depth_seen = 0
+        self._emit_seconds_total = 0.0
+        self._emit_seconds_max = 0.0
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """
+        Starts the writer task on the running event loop, if it isn't running already.
+        """
+        if not self.is_running:
+            self._has_work = asyncio.Event()
+            if len(self._queue) > 0:
+                self._has_work.set()
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stops the writer task. Anything not sent yet stays queued.
+        """
+        if self.is_running:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def clear(self) -> None:
+        """
+        Forgets all the actions not sent yet. eg: because we are in a new cave.
+        """
+        self._queue.clear()
+
+    def submit(self, actions: [Action]) -> int:
+        """
+        Queues actions to be sent, and returns straight away.
+
+        Parameters:
+            actions ([Action]): The actions to send, in order.
+
+        Returns:
+            int : How many of the actions were queued.
+        """
+        if len(actions) == 0:
+            return 0
+        self._submitted_count += len(actions)
+
+        if any(action.action_code == ActionCode.MOVE for action in actions):
+            self._superseded_count += self._drop_queued_moves(len(self._queue))
+
+        room = self._max_queue_depth - len(self._queue)
+        if room < len(actions):
+            self._dropped_count += self._drop_queued_moves(len(actions) - room)
+            room = self._max_queue_depth - len(self._queue)
+
+        accepted = actions[:room]
+        self._dropped_count += len(actions) - len(accepted)
+        self._queue.extend(accepted)
+        self._max_depth_seen = max(self._max_depth_seen, len(self._queue))
+
+        if len(accepted) > 0 and self._has_work is not None:
+            self._has_work.set()
+        return len(accepted)
+
+    def _drop_queued_moves(self, most: int) -> int:
+        """
+        Drops up to 'most' of the oldest moves waiting to be sent.
+
+        Returns:
+            int : How many moves were dropped.
+        """
+        if most <= 0:
+            return 0
+        kept = collections.deque()
+        dropped = 0
+        for action in self._queue:
+            if dropped < most and action.action_code == ActionCode.MOVE:
+                dropped += 1
+            else:
+                kept.append(action)
+        self._queue = kept
+        return dropped
+
+    async def _run(self) -> None:
+        while True:
+            if len(self._queue) == 0:
+                self._has_work.clear()
+                await self._has_work.wait()
+                continue
+            await self._send(self._queue.popleft())
+
+    async def _send(self, action: Action) -> None:
+        started_at = self._clock()
+        try:
+            await action.do_action(self._client)
+            self._sent_count += 1
+        except Exception:
+            self._failed_count += 1
+            self._logger.exception("Could not send %s", action)
+        emit_seconds = self._clock() - started_at
+        self._emit_seconds_total += emit_seconds
+        self._emit_seconds_max = max(self._emit_seconds_max, emit_seconds)
+
+    @property
+    def sent_count(self) -> int:
+        return self._sent_count
+
+    @property
+    def superseded_count(self) -> int:
+        return self._superseded_count
+
+    @property
+    def dropped_count(self) -> int:
+        return self._dropped_count
+
+    def summary(self) -> dict:
+        sent_or_failed = self._sent_count + self._failed_count
+        emit_seconds_average = None
+        if sent_or_failed > 0:
+            emit_seconds_average = self._emit_seconds_total / sent_or_failed
+        return {
+            "submitted": self._submitted_count,
+            "sent": self._sent_count,
+            "failed": self._failed_count,
+            "superseded": self._superseded_count,
+            "dropped": self._dropped_count,
+            "queue_depth": len(self._queue),
+            "max_queue_depth": self._max_depth_seen,
+            "emit_seconds_average": emit_seconds_average,
+            "emit_seconds_max": self._emit_seconds_max
+        }
@@ -11,6 +11,10 @@ from .brains.megabrain import MegaBrain
 from .brains.item_handling_brain import ItemHandlingBrain
 from .brains.ibrain import IBrain
 from .httpserver.bot_http_server import BotHttpServer
+from .state.state_publisher import StatePublisher, StateSnapshot
+from .retention import RetentionPolicy
+from .pending_actions import PendingActionTracker
+from .tick_scheduler import TickScheduler, FixedTickScheduler
 
 
 class Bot():
@@ -25,13 +29,22 @@ class Bot():
         brain_name (str): Where multiple brains are supported, which one
             do we use ? eg: GoalDrivenBrain
         speed (int) : Number from 1-10 inclusive. 10 is faster.
-            Controls how many 'turns' we ignore before making a move.
+            Controls how many 'turns' we ignore before making a move,
+            unless a tick_scheduler is given.
             Defaults to 5.
         actions_per_turn (int) : Number of actions we try to mave in one
             turn. Larger numbers may hit a server limit.
             Defaults to 1
         startup_delay_seconds (int) : Number of seconds to wait between
             the 'ALIVE' state, and the 'READY' state.
+        retention_policy (RetentionPolicy) : Limits how much the bot
+            remembers. Defaults to a RetentionPolicy with default limits.
+        pending_action_tracker (PendingActionTracker) : Stops the same item
+            action being sent again before the server has done it.
+            Defaults to a PendingActionTracker with the default time-to-live.
+        tick_scheduler (TickScheduler) : Decides which ticks to act on, and
+            how many moves to make each time. Defaults to a FixedTickScheduler
+            using the speed and actions_per_turn.
     """
 
     def __init__(self,
@@ -42,18 +55,20 @@ class Bot():
                  actions_per_turn: int = 1,
                  bot_http_server_port: int = None,
                  bot_http_server_address: str = "127.0.0.1",
-                 startup_delay_seconds=0
+                 startup_delay_seconds=0,
+                 retention_policy: RetentionPolicy = None,
+                 pending_action_tracker: PendingActionTracker = None,
+                 tick_scheduler: TickScheduler = None
                  ):
         self._logger = logging.getLogger(__name__)
 
         self._character_name = character_name
 
-        self._tick_count = 0
-
-        self._logger.debug("Speed is %s", speed)
-        self._ignore_ticks_before_act = 11-speed
-        self._logger.debug("Going to act once every %s ticks",
-                           self._ignore_ticks_before_act)
+        # Decides which ticks we act on, and how many moves we make each time.
+        if tick_scheduler is None:
+            self._logger.debug("Speed is %s", speed)
+            tick_scheduler = FixedTickScheduler(speed, actions_per_turn)
+        self._tick_scheduler = tick_scheduler
 
         self._client = client
         self._brain = self._select_brain(brain_name)
@@ -61,6 +76,9 @@ class Bot():
         # Tell the brain how many actions we want maximum per turn.
         self._brain.max_actions_per_turn = actions_per_turn
 
+        # The client tells the scheduler how our moves fare.
+        client.add_move_listener(tick_scheduler)
+
         # game events from the network are sent to the entity client.
         # tell the entity client about ourselves so it can call us back
         # when certain events occur. eg:when the timer ticks.
@@ -70,6 +88,19 @@ class Bot():
         self._bot_http_server_address = bot_http_server_address
         self._startup_delay_seconds = startup_delay_seconds
 
+        # Read-only copies of the state, for anything not on the event loop.
+        self._state_publisher = StatePublisher()
+
+        if retention_policy is None:
+            retention_policy = RetentionPolicy()
+        self._retention_policy = retention_policy
+
+        if pending_action_tracker is None:
+            pending_action_tracker = PendingActionTracker()
+        self._pending_actions = pending_action_tracker
+
+        self._decision_cpu_seconds = 0.0
+
     def _select_brain(self, brain_name: str) -> IBrain:
         """ Dynamicall loads a brain based on it's name.
         Though we must have them all imported into the global namespace.
@@ -101,6 +132,26 @@ class Bot():
         """
         self._client.state = new_state
 
+    @property
+    def snapshot(self) -> StateSnapshot:
+        """
+        The latest published snapshot of the state, which is safe to read
+        from any thread, as it never changes.
+
+        Returns:
+            snapshot (StateSnapshot): The version number and a few facts
+                about the state.
+        """
+        return self._state_publisher.current
+
+    @property
+    def is_ready(self) -> bool:
+        """
+        True once the bot has had enough state to act on, and published
+        a snapshot of it. Safe to call from any thread.
+        """
+        return self._state_publisher.current.version > 0
+
     def clear(self):
         """
         We have entered a new cave, either the first cave,
@@ -111,6 +162,7 @@ class Bot():
         """
         if self._brain is not None:
             self._brain.clear()
+        self._pending_actions.clear()
 
     def play(self):
         """ Starts the bot playing a game.
@@ -160,6 +212,14 @@ class Bot():
 
         return False
 
+    @property
+    def decision_cpu_seconds(self) -> float:
+        """
+        Returns:
+            float : The CPU time the brain has spent deciding what to do so far.
+        """
+        return self._decision_cpu_seconds
+
     @property
     def status_summary(self) -> dict:
         """
@@ -168,6 +228,26 @@ class Bot():
         summary = {}
         if self._brain is not None:
             summary = self._brain.status_summary
+        snapshot = self._state_publisher.current
+        if snapshot.version > 0:
+            summary = dict(summary)
+            summary["state"] = snapshot.summary()
+        retention_report = self._retention_policy.last_report
+        if len(retention_report) > 0:
+            summary = dict(summary)
+            summary["retention"] = retention_report
+        client_summary = self._client.status_summary
+        if isinstance(client_summary, dict) and len(client_summary) > 0:
+            summary = dict(summary)
+            summary.update(client_summary)
+        scheduler_summary = self._tick_scheduler.summary()
+        if scheduler_summary["acts"] > 0:
+            summary = dict(summary)
+            summary["scheduler"] = scheduler_summary
+        pending_summary = self._pending_actions.summary()
+        if pending_summary["sent"] > 0:
+            summary = dict(summary)
+            summary["pending_actions"] = pending_summary
         return summary
 
     async def tick(self):
@@ -175,12 +255,19 @@ class Bot():
         A regular clock 'tick' so we can do something whenever this happens.
         """
 
+        self._tick_scheduler.observe_tick(time.monotonic())
+
         if self.got_enough_state_to_start():
-            # Only do anything every n ticks... to slow things down.
-            if self._tick_count >= self._ignore_ticks_before_act:
-                self._tick_count = 0
+            # Only act on some ticks... as the scheduler sees fit.
+            if self._tick_scheduler.should_act():
+                # Copied only when acting, as it can change on every tick.
+                self._state_publisher.publish(self.state)
+                self._brain.max_actions_per_turn = self._tick_scheduler.moves_per_act
                 await self._do_action()
-            self._tick_count += 1
+
+            # Every so often, forget what we don't need to remember.
+            if self._brain is not None:
+                self._retention_policy.on_tick(self.state, self._brain)
 
     async def _do_action(self):
         """
@@ -189,12 +276,21 @@ class Bot():
         # print("> do_action")
 
         # Find out which actions the brain thinks we should be doing.
+        # The CPU time spent deciding lets a fleet share bots out fairly.
+        decision_started_at = time.thread_time()
+        decision_started_at_wall = time.perf_counter()
         actions = self._brain.decide_actions(self.state)
+        self._decision_cpu_seconds += time.thread_time() - decision_started_at
+        self._tick_scheduler.observe_decision(
+            time.perf_counter() - decision_started_at_wall)
 
         self._logger.debug("actions: %s", actions)
 
-        # Enact those actions
-        for action in actions:
+        # Don't ask again for things the server hasn't done yet.
+        actions_to_send = [action for action in actions
+                           if self._pending_actions.should_send(action, self.state)]
 
-            # Tell the server to do something through the client.
-            await action.do_action(self._client)
+        # Tell the server to do things through the client.
+        # The client may send them later, so we can carry on.
+        if len(actions_to_send) > 0:
+            await self._client.submit_actions(actions_to_send)
@@ -12,6 +12,8 @@ from ..state.state import State
 from ..action import Action
 from ..goals.goal import Goal
 from ..goals.explore_goal import ExploreGoal
+from .goal_stack import GoalStack
+from ..state.fingerprint import zobrist_key
 
 # logging.basicConfig(level=logging.DEBUG)
 
@@ -27,18 +29,54 @@ class GoalDrivenBrain(IBrain):
         The one at the end of the list is the one to do next.
         """
         super().__init__()
-        self._goals = []
+        self._goals = GoalStack()
         self._logger = logging.getLogger(__name__)
 
+        # Total of what goals have forgotten to stay within a retention policy.
+        self._goal_memory_forgotten = 0
+
+        # The last decision, and a fingerprint of what it depended on, so it
+        # can be re-used while nothing it depended on has changed.
+        self._memo_fingerprint = None
+        self._memo_actions = []
+        self._memo_hits = 0
+        self._memo_misses = 0
+
     def clear(self):
         """
         Clear the brain of any state it may have accrued.
         We have probably just entered a new dungeon, so 
         any goals or suchlike are now not relevent.
         """
-        self._goals = []
+        self._goals.clear()
+        self._memo_fingerprint = None
+        self._memo_actions = []
         self._logger.debug("Cleared the brain of all previous thoughts.")
 
+    def compact(self, policy, current_floor: int, now: float) -> dict:
+        """
+        Trims the goal stack down to the policy's maximum depth, dropping
+        the oldest goals first, and lets each goal forget what it no longer
+        needs to remember.
+
+        Returns:
+            dict : The goal stack depth, and how many things the goals remember.
+        """
+        self._goals.trim_to(policy.max_goal_depth)
+
+        for goal in self._goals:
+            if isinstance(goal, Goal):
+                self._goal_memory_forgotten += goal.compact(
+                    policy, current_floor, now)
+
+        return {
+            "goal_depth": len(self._goals),
+            "goals_dropped": self._goals.dropped_count,
+            "goal_memory": sum(goal.retained_size for goal in self._goals
+                               if isinstance(goal, Goal)),
+            "goal_memory_forgotten": self._goal_memory_forgotten
+        }
+
     def decide_actions(self, state: State) -> [Action]:
         """Decides what actions we want to do next.
 
@@ -52,11 +90,20 @@ class GoalDrivenBrain(IBrain):
         """
         # self._logger.debug("> decide_actions")
 
+        me = state.find_my_entity()
+
+        # When nothing the last decision depended on has changed, we'd
+        # decide the same thing again, so don't bother.
+        fingerprint = self._decision_fingerprint(me, state)
+        if fingerprint is not None and fingerprint == self._memo_fingerprint:
+            self._memo_hits += 1
+            self._record_status(me, self._goals[-1])
+            return list(self._memo_actions)
+        self._memo_misses += 1
+
         # We want to return a list of actions.
         actions = []
 
-        me = state.find_my_entity()
-
         # self._logger.debug("state: {}".format(state))
         # self._logger.debug("me:{}".format(me))
 
@@ -81,23 +128,18 @@ class GoalDrivenBrain(IBrain):
 
             self._logger.debug("decide_actions using goal:%s", goal_to_run)
 
-            self._logger.debug("Goal stack:")
-            for goal in self._goals:
-                self._logger.debug("  %s", goal)
+            if self._logger.isEnabledFor(logging.DEBUG):
+                self._logger.debug("Goal stack: %s", self._goals)
 
             # record our current status in case anyone is interrested.
-            self._status_summary = {
-                "hp": me.hit_points,
-                "ac": me.armour_class,
-                "weapon": me.current_weapon,
-                "armour": me.current_armour,
-                "name": me.name,
-                "point": me.position.to_dictionary(),
-                "goal": str(goal_to_run)
-            }
+            self._record_status(me, goal_to_run)
 
             self._logger.debug("goal:%s", goal_to_run)
 
+            if isinstance(goal_to_run, Goal):
+                goal_to_run.max_moves_per_turn = self.max_actions_per_turn
+                goal_to_run.burst_safety = self.burst_safety
+
             actions_from_goal = goal_to_run.decide_actions(
                 me, state, self._goals)
 
@@ -105,8 +147,75 @@ class GoalDrivenBrain(IBrain):
                 for action in actions_from_goal:
                     actions.append(action)
 
+        # If deciding changed nothing the decision depended on (no goals came
+        # or went, and the goal didn't change its mind about where it's going)
+        # then the same decision holds until something else changes.
+        if fingerprint is not None and \
+                fingerprint == self._decision_fingerprint(me, state):
+            self._memo_fingerprint = fingerprint
+            self._memo_actions = list(actions)
+        else:
+            self._memo_fingerprint = None
+            self._memo_actions = []
+
         return actions
 
+    def _record_status(self, me: Entity, goal_to_run) -> None:
+        self._status_summary = {
+            "hp": me.hit_points,
+            "ac": me.armour_class,
+            "weapon": me.current_weapon,
+            "armour": me.current_armour,
+            "name": me.name,
+            "point": me.position.to_dictionary(),
+            "goal": str(goal_to_run),
+            "decision_cache_hits": self._memo_hits,
+            "decision_cache_misses": self._memo_misses
+        }
+
+    @property
+    def decision_cache_hits(self) -> int:
+        """ How many times the last decision was re-used. """
+        return self._memo_hits
+
+    @property
+    def decision_cache_misses(self) -> int:
+        """ How many times we had to think afresh. """
+        return self._memo_misses
+
+    def _decision_fingerprint(self, me: Entity, state: State) -> int:
+        """
+        A fingerprint of everything a decision depends on, or None if the
+        goal we would run can't have its decisions re-used.
+        """
+        if me is None or len(self._goals) == 0:
+            return None
+        goal = self._goals[-1]
+        if not isinstance(goal, Goal):
+            return None
+        goal_key = goal.decision_key(me, state)
+        if goal_key is None:
+            return None
+
+        return zobrist_key((
+            me.position,
+            goal_key,
+            tuple(id(stacked_goal) for stacked_goal in self._goals),
+            id(state.dungeon_map), state.dungeon_map.revision,
+            id(state.entities), state.entities.occupancy_hash,
+            self.decision_inputs(me, state)))
+
+    def decision_inputs(self, me: Entity, state: State) -> tuple:
+        """
+        Anything else this brain's decisions depend on, so a change to them
+        means thinking again. Subclasses which look at more of the state
+        in decide_pre_move_actions should add to this.
+
+        Returns:
+            tuple : Hashable values.
+        """
+        return ()
+
     def decide_pre_move_actions(self, me: Entity, state: State, actions: [Action]) -> None:
         """ 
         Gives subclasses of this class a chance to do 
@@ -0,0 +1,231 @@
+"""
+The stack of goals a brain is working through.
+"""
+
+import bisect
+import collections
+import logging
+
+
+class GoalStack:
+    """
+    A stack of goals. The goal at the top (index -1) is the one to work on next.
+
+    It behaves like the plain list it replaces: goals append() new goals to
+    it, and pop() themselves off when they are done. On top of that:
+
+    - Pushing a goal which is already on the stack moves it to the top
+      rather than adding it twice.
+    - The stack never grows beyond a maximum depth. The oldest goals at the
+      bottom are dropped first.
+    - Goals can be pushed with a priority. A goal never sits above a goal
+      with a higher priority. Goals appended without a priority take the
+      priority of the goal on top, so a goal's sub-goals run before it resumes.
+    - Whether a goal of a given kind (class or superclass) is on the stack
+      can be asked in O(1).
+    """
+
+    DEFAULT_MAX_DEPTH = 32
+
+    NORMAL = 0
+    URGENT = 10
+
+    def __init__(self, goals=None, max_depth: int = DEFAULT_MAX_DEPTH):
+        """
+        Parameters:
+            goals (list): Optional. Goals to start with, bottom first.
+            max_depth (int): The most goals kept. Minimum 1.
+        """
+        self._logger = logging.getLogger(__name__)
+        self._max_depth = max(int(max_depth), 1)
+
+        # Bottom of the stack first. Each entry is (priority, sequence, goal),
+        # so the list stays sorted as goals are inserted.
+        self._entries = []
+        self._sequence = 0
+
+        # id(goal) for everything on the stack.
+        self._ids = set()
+
+        # class -> how many goals on the stack are of that class, or a subclass.
+        self._type_counts = collections.Counter()
+
+        self._dropped_count = 0
+
+        if goals is not None:
+            for goal in goals:
+                self.append(goal)
+
+    @property
+    def max_depth(self) -> int:
+        return self._max_depth
+
+    @property
+    def dropped_count(self) -> int:
+        """
+        How many goals have been dropped off the bottom of the stack.
+        """
+        return self._dropped_count
+
+    def append(self, goal) -> None:
+        """
+        Pushes a goal onto the top of the stack, at the priority of the goal
+        which is currently on top.
+        """
+        priority = self._entries[-1][0] if len(
+            self._entries) > 0 else GoalStack.NORMAL
+        self.push(goal, priority)
+
+    def push(self, goal, priority: int = NORMAL) -> None:
+        """
+        Pushes a goal onto the stack, above all goals of the same or lower priority.
+
+        If the goal is already on the stack, it is moved rather than added again.
+        """
+        if id(goal) in self._ids:
+            self._remove_entry(self._index_of(goal))
+
+        self._sequence += 1
+        entry = (priority, self._sequence, goal)
+        position = bisect.bisect_right(self._entries, (priority, self._sequence))
+        self._entries.insert(position, entry)
+        self._track(goal)
+
+        if len(self._entries) > self._max_depth:
+            self.trim_to(self._max_depth)
+
+    def push_unless_active(self, goal, priority: int = NORMAL):
+        """
+        Pushes a goal, unless a goal of the same kind is already on the
+        stack, in which case the most recent goal of that kind is moved to
+        the top instead.
+
+        Returns:
+            Goal : Whichever goal is now on the top of the stack.
+        """
+        existing = self.find_latest_of_type(type(goal))
+        if existing is not None:
+            goal = existing
+        self.push(goal, priority)
+        return goal
+
+    def push_replacing(self, goal, priority: int = NORMAL) -> None:
+        """
+        Pushes a goal, first removing any goals of exactly the same class,
+        so there is only ever one of them on the stack.
+        """
+        if self.contains_type(type(goal)):
+            for (_, _, other) in list(self._entries):
+                if type(other) is type(goal) and other is not goal:
+                    self.remove(other)
+        self.push(goal, priority)
+
+    def pop(self, index: int = -1):
+        """
+        Removes and returns a goal. The top one by default, like list.pop()
+        """
+        if len(self._entries) == 0:
+            raise IndexError("pop from empty GoalStack")
+        return self._remove_entry(index)
+
+    def remove(self, goal) -> None:
+        """
+        Removes a goal from wherever it is in the stack.
+        """
+        if id(goal) not in self._ids:
+            raise ValueError("goal is not in the GoalStack")
+        self._remove_entry(self._index_of(goal))
+
+    def clear(self) -> None:
+        self._entries = []
+        self._ids = set()
+        self._type_counts = collections.Counter()
+
+    def trim_to(self, depth: int) -> int:
+        """
+        Drops the oldest goals from the bottom of the stack until it is
+        no deeper than depth.
+
+        Returns:
+            int : The number of goals dropped.
+        """
+        excess = len(self._entries) - max(int(depth), 0)
+        if excess <= 0:
+            return 0
+        for (_, _, goal) in self._entries[:excess]:
+            self._untrack(goal)
+        del self._entries[:excess]
+        self._dropped_count += excess
+        self._logger.debug("Dropped %s old goals", excess)
+        return excess
+
+    def contains_type(self, goal_class) -> bool:
+        """
+        Is there a goal of this class (or a subclass of it) on the stack ?
+        """
+        return self._type_counts.get(goal_class, 0) > 0
+
+    def find_latest_of_type(self, goal_class):
+        """
+        The goal of this class (or a subclass) nearest the top of the stack,
+        or None if there isn't one.
+        """
+        if not self.contains_type(goal_class):
+            return None
+        for (_, _, goal) in reversed(self._entries):
+            if isinstance(goal, goal_class):
+                return goal
+        return None
+
+    def _index_of(self, goal) -> int:
+        for index in range(len(self._entries) - 1, -1, -1):
+            if self._entries[index][2] is goal:
+                return index
+        raise ValueError("goal is not in the GoalStack")
+
+    def _remove_entry(self, index: int):
+        (_, _, goal) = self._entries.pop(index)
+        self._untrack(goal)
+        return goal
+
+    def _track(self, goal) -> None:
+        self._ids.add(id(goal))
+        for goal_class in type(goal).__mro__:
+            self._type_counts[goal_class] += 1
+
+    def _untrack(self, goal) -> None:
+        self._ids.discard(id(goal))
+        for goal_class in type(goal).__mro__:
+            remaining = self._type_counts[goal_class] - 1
+            if remaining > 0:
+                self._type_counts[goal_class] = remaining
+            else:
+                del self._type_counts[goal_class]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self):
+        for (_, _, goal) in list(self._entries):
+            yield goal
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [goal for (_, _, goal) in self._entries[index]]
+        return self._entries[index][2]
+
+    def __contains__(self, goal) -> bool:
+        return id(goal) in self._ids
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (GoalStack, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __str__(self):
+        return "[" + ", ".join(str(goal) for goal in self) + "]"
+
+    def __repr__(self):
+        return "GoalStack" + str(self)
@@ -13,10 +13,13 @@ class IBrain(ABC):
         max_actions_per_turn (int) : A number, minumum 1, default of 1.
         Indicates the maximum number of 'move' commands are to be sent to the server
         in one 'turn'.
+        burst_safety (bool) : When sending several moves in one turn, stop
+        early next to other entities, or on stairs. Default of True.
     """
 
     def __init__(self):
         self._max_actions_per_turn = 1
+        self._burst_safety = True
         self._status_summary = {}
 
     def clear(self):
@@ -26,6 +29,20 @@ class IBrain(ABC):
         any goals or suchlike are now not relevent.
         """
 
+    def compact(self, policy, current_floor: int, now: float) -> dict:
+        """
+        Forget things to stay within a retention policy.
+
+        Parameters:
+            policy (RetentionPolicy): The limits to keep within.
+            current_floor (int): The floor we are on, or None if not known.
+            now (float): The time.monotonic() to measure ages from.
+
+        Returns:
+            dict : The sizes of whatever the brain is still remembering.
+        """
+        return {}
+
     @abstractmethod
     def decide_actions(self, state: State) -> [Action]:
         """
@@ -40,6 +57,14 @@ class IBrain(ABC):
     def max_actions_per_turn(self, max_actions_per_turn: int = 1):
         self._max_actions_per_turn = max_actions_per_turn
 
+    @property
+    def burst_safety(self) -> bool:
+        return self._burst_safety
+
+    @burst_safety.setter
+    def burst_safety(self, is_safe: bool = True):
+        self._burst_safety = is_safe
+
     @property
     def status_summary(self) -> dict:
         """
@@ -24,8 +24,22 @@ class ItemHandlingBrain(GoalDrivenBrain):
         self.decide_wear_action(me, actions)
         self.decide_wield_action(me, actions)
 
+    def decision_inputs(self, me: Entity, state: State) -> tuple:
+        """ What we carry, whether we are hungry, and the items around us. """
+        weapon = me.current_weapon
+        armour = me.current_armour
+        return super().decision_inputs(me, state) + (
+            tuple(item.name for item in me.inventory),
+            None if weapon is None else (weapon.name, weapon.damage),
+            None if armour is None else (armour.name, armour.armour_class),
+            me.hunger > 0,
+            id(state.items), state.items.version)
+
     def decide_eat_action(self, me, actions):
-        """ If we have something edible in the inventory, eat ! Yum ! """
+        """ If we have something edible in the inventory, eat ! Yum !
+
+        Only one thing is eaten at a time. We may not be hungry afterwards.
+        """
         for item in me.inventory:
             # self._logger.debug(
             #     "  decide_eat_action : Looking to see if Item %s is edible", item.name)
@@ -34,6 +48,7 @@ class ItemHandlingBrain(GoalDrivenBrain):
                     " decide_eat_action : Item %s is edible. yummy ! ", item.name)
                 action = EatAction(item.name)
                 actions.append(action)
+                break
 
     def decide_wear_action(self, me, actions):
         """ If we are not wearing anything, and we have something in the
@@ -107,8 +122,4 @@ class ItemHandlingBrain(GoalDrivenBrain):
                     actions.append(action)
 
     def is_item_useful(self, item: Item) -> bool:
-        is_useful = True
-        if (not item.wearable) and (not item.edible) and (not item.wieldable):
-            # Item is pretty useless. Ignore.
-            is_useful = False
-        return is_useful
+        return item.is_useful
@@ -10,11 +10,13 @@ from ..navigation.point import Point
 from .item_handling_brain import ItemHandlingBrain
 from ..state.entity import Entity
 from ..state.state import State
+from ..state.state_changes import ChangeWatcher, StateTopic, ENTITY_TOPICS
 from ..goals.goal import Goal
 from ..state.item import Item
 from ..goals.choose_goal import ChooseGoalGoal
 from ..goals.seek_item_goal import SeekItemGoal
 from ..goals.attack_goal import AttackEntity
+from .goal_stack import GoalStack
 
 
 # Only has any effect when running tests.
@@ -35,12 +37,27 @@ class MegaBrain(ItemHandlingBrain):
         # by adding another goal to our goal stack.
         self._items_visible_count = 0
 
+        # Whether enemies were near last time we looked, and a dirty flag
+        # saying whether the entities or map have changed since then.
+        self._enemies_near = False
+        self._enemy_watcher = ChangeWatcher(
+            ENTITY_TOPICS | {StateTopic.MAP_REPLACED})
+
+    def clear(self):
+        super().clear()
+        self._enemies_near = False
+        self._enemy_watcher.reset()
+
     def decide_pre_move_actions(self, me, state, actions):
         # self._logger.debug("Megabrain: decide_pre_move_actions")
         super().decide_pre_move_actions(me, state, actions)
         self._monitor_new_items_available(state)
         self._detect_local_enemies(me, state)
 
+    def decision_inputs(self, me: Entity, state: State) -> tuple:
+        return super().decision_inputs(me, state) + (
+            self._refresh_enemies_near(state),)
+
     def create_goal(self):
         self._goals.append(ChooseGoalGoal())
 
@@ -50,16 +67,13 @@ class MegaBrain(ItemHandlingBrain):
 
         We only care about useful items. Ignore any others.
         """
-        all_items = state.items.get_as_list()
-        useful_item_count = 0
-
-        for item in all_items:
-            if item.edible or item.wearable or item.wieldable:
-                useful_item_count += 1
+        useful_item_count = state.items.useful_count
 
         if useful_item_count != self._items_visible_count:
-            self._goals.append(ChooseGoalGoal())
-            self._goals.append(SeekItemGoal())
+            # Replace any goals we already had for this, rather than stacking
+            # up more of them, so a new item target gets picked.
+            self._goals.push_replacing(ChooseGoalGoal())
+            self._goals.push_replacing(SeekItemGoal())
         self._items_visible_count = useful_item_count
 
     def _detect_local_enemies(self, me: Entity, state: State) -> None:
@@ -70,51 +84,70 @@ class MegaBrain(ItemHandlingBrain):
         So put outselves in fight mode... and hit them back.
         """
 
-        me = state.find_my_entity()
-
-        # No point finding enemies if we have no weapon.
-        if me.current_weapon is not None:
-
-            my_position = me.position
-
-            frontier_points = [my_position]
-            closed_points = []
+        if self._refresh_enemies_near(state):
+            self._logger.debug("Enemy is near. Fight mode...")
+            # Carry on with any fight we are already in, rather than
+            # starting another one every tick.
+            self._goals.push_unless_active(AttackEntity(), GoalStack.URGENT)
 
-            found_enemies = False
-            search_distance = 3
-            while search_distance > 0 and not found_enemies:
-                # Expand frontiers
-                new_frontier_points = []
-                for frontier_point in frontier_points:
-                    neighbours = state.dungeon_map.get_neighbour_points(
-                        frontier_point)
-
-                    for neighbour in neighbours:
-                        if (neighbour not in closed_points) and (neighbour not in frontier_points):
-                            new_frontier_points.append(neighbour)
+    def _refresh_enemies_near(self, state: State) -> bool:
+        """
+        Whether enemies are near. Only looks again if the entities or map
+        have changed since we last looked. Otherwise the answer is the same
+        as last time.
+        """
+        if self._enemy_watcher.is_dirty(state.changes):
+            self._enemies_near = self._are_enemies_near(state)
+            self._enemy_watcher.mark_clean(state.changes)
+        return self._enemies_near
 
-                    closed_points.append(frontier_point)
+    def _are_enemies_near(self, state: State) -> bool:
+        """
+        Are there any living entities which aren't brother-bots within
+        walking distance of us ?
+        """
+        me = state.find_my_entity()
 
-                frontier_points = new_frontier_points
+        # No point finding enemies if we have no weapon.
+        if me.current_weapon is None:
+            return False
 
-                for frontier_point in frontier_points:
-                    enemies_near_me = state.entities.get_by_position(
-                        frontier_point)
+        search_distance = 3
 
-                    # Don't treat our brother-bots as enemies near me.
-                    non_assassin_enemies_near_me = list()
-                    my_prefix = me.name.split('-')[0]
-                    for enemy in enemies_near_me:
-                        if not enemy.name.startswith(my_prefix):
-                            non_assassin_enemies_near_me.append(enemy)
+        # Ask the spatial index who is close by. Walking distance is never
+        # shorter than the manhattan distance, so this finds everyone who
+        # could possibly be within reach.
+        # Don't treat our brother-bots as enemies near me.
+        my_prefix = me.name.split('-')[0]
+        enemies = state.entities.living_non_allies_within(
+            me.position, search_distance,
+            ally_prefix=my_prefix, exclude_id=me.entity_id)
+        enemy_points = {enemy.position for enemy in enemies}
 
-                    # Are there any enemies left we want to attack ?
-                    if len(non_assassin_enemies_near_me) > 0:
-                        # There are enemies nearbye.
-                        found_enemies = True
+        if len(enemy_points) == 0:
+            return False
 
-                search_distance -= 1
+        # Only now check that one of them really is within walking distance.
+        return self._is_any_point_within_steps(
+            state, me.position, enemy_points, search_distance)
 
-            if found_enemies:
-                self._logger.debug("Enemy is near. Fight mode...")
-                self._goals.append(AttackEntity())
+    def _is_any_point_within_steps(self, state: State, start: Point,
+                                   targets: set, steps: int) -> bool:
+        """
+        Expand outwards from the start point a number of steps, to see if
+        any of the target points can be reached.
+        """
+        frontier_points = [start]
+        visited_points = {start}
+        while steps > 0 and len(frontier_points) > 0:
+            new_frontier_points = []
+            for frontier_point in frontier_points:
+                for neighbour in state.dungeon_map.get_neighbour_points(frontier_point):
+                    if neighbour not in visited_points:
+                        if neighbour in targets:
+                            return True
+                        visited_points.add(neighbour)
+                        new_frontier_points.append(neighbour)
+            frontier_points = new_frontier_points
+            steps -= 1
+        return False
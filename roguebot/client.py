@@ -1,5 +1,5 @@
 import logging
-import json
+import time
 import asyncio.events
 import socketio
 
@@ -10,6 +10,13 @@ from .state.entity import Entities, Entity
 from .bot import Bot
 from .iclient import IEntityClient
 from .state.state import State
+from .wire_trace import WireTracer
+from .event_coalescer import EventCoalescer
+from .state.map_cache import MapCache
+from .action_writer import ActionWriter
+from .move_predictor import MovePredictor
+from .move_ack import MoveAckTracker
+from .json_codec import JsonCodec, create_json_codec
 
 
 class EntityClient(IEntityClient):
@@ -17,7 +24,10 @@ class EntityClient(IEntityClient):
     Coordinates responses by calling other objects.
     """
 
-    def __init__(self, character_name: str, character_role: str, url: str):
+    def __init__(self, character_name: str, character_role: str, url: str,
+                 wire_tracer: WireTracer = None,
+                 map_cache: MapCache = None,
+                 json_codec: JsonCodec = None):
         self._character_name = character_name
         self._character_role = character_role
         self._bot: Bot = None
@@ -25,47 +35,173 @@ class EntityClient(IEntityClient):
         self._server_url = url
         self._server_url_path_part = None
         self._sio = None
-        self._is_reconnecting = True
         self._logger = logging.getLogger(__name__)
 
+        # Records what arrives from the server. Disabled unless given a file.
+        if wire_tracer is None:
+            wire_tracer = WireTracer()
+        self._wire_tracer = wire_tracer
+
+        # Bots in a fleet share the maps of the caves they are in.
+        # A lone bot builds its own.
+        self._map_cache = map_cache
+
+        # Decodes everything the server sends. Big maps and busy entities
+        # events decode much faster with orjson or ujson, if installed.
+        if json_codec is None:
+            json_codec = create_json_codec()
+        self._json_codec = json_codec
+
+        # Entity events are queued here, and applied to the state in one go
+        # just before the bot thinks, so events which are out of date by then
+        # can be skipped.
+        self._event_coalescer = EventCoalescer()
+
+        # Actions are sent from a task of their own, so the bot doesn't
+        # wait for them to go before carrying on.
+        self._action_writer = ActionWriter(self)
+
+        # Our own moves are applied to the state as soon as they are sent,
+        # and checked when the server says where we are.
+        self._move_predictor = MovePredictor()
+
+        # Each move sent is matched with the server saying where we are,
+        # to see how long moves take, and which go missing.
+        self._move_acks = MoveAckTracker()
+
+        # How long moving through gateways to another cave takes.
+        self._handoff_started_at = None
+        self._handoff_count = 0
+        self._failed_handoff_count = 0
+        self._last_handoff_seconds = None
+        self._max_handoff_seconds = None
+        self._stale_events_ignored = 0
+
     def start_comms(self, async_client=None):
-        while self._is_reconnecting:
-            if async_client is not None:
-                self._sio = async_client
-            else:
-                self._sio = socketio.AsyncClient(logger=False,  # Set to true to see websocket traffic
-                                                 engineio_logger=False,
-                                                 reconnection=True,
-                                                 reconnection_attempts=10,
-                                                 # How long to wait in seconds before the first
-                                                 # reconnection attempt.
-                                                 # Each successive attempt doubles this delay.
-                                                 reconnection_delay=1,
-
-                                                 # The maximum delay between reconnection attempts.
-                                                 reconnection_delay_max=3
-                                                 )
-            self._sio.on('connect', self.connect_received)
-            self._sio.on('connect_error', self.connect_error)
-            self._sio.on('missing_role', self.missing_role_received)
-            self._sio.on('map', self.map_received)
-            self._sio.on('disconnect', self.disconnect_received)
-            self._sio.on('entities', self.entities_received)
-            self._sio.on('ping', self.ping_received)
-            self._sio.on('*', self.other_event_received)
-            self._sio.on('items', self.items_received)
-            self._sio.on('position', self.position_received)
-            self._sio.on('dead', self.dead_received)
-            self._sio.on('delete', self.delete_received)
-            self._sio.on('message', self.message_received)
-            self._sio.on('update', self.update_received)
-            self._sio.on('reconnect', self.reconnect_received)
-
-            self._is_reconnecting = False
-            self._logger.debug('asyncio-running url %s', self._server_url)
-            asyncio.run(self._do_comms())
+        """
+        Talk to the server until the bot dies. Blocks until then.
+
+        Parameters:
+            async_client : The socket to use for the first connection.
+                A new socketio.AsyncClient is created if this is None.
+        """
+        asyncio.run(self.run_comms(async_client))
+
+    async def run_comms(self, async_client=None):
+        """
+        Talk to the server until the bot dies.
+
+        Everything happens on the one event loop, including moving through
+        gateways to other caves, when the connection to the new cave is
+        opened before the connection to the old cave is closed.
+        """
+        if async_client is None:
+            async_client = self._create_socket()
+        await self._open_connection(async_client, self._server_url)
+
+        while self._sio is not None:
+            current_sio = self._sio
+            await current_sio.wait()
+            if self._sio is current_sio or self._sio is None:
+                # It wasn't replaced by a connection to another cave,
+                # so we've finished.
+                break
+            self._logger.debug("Carrying on in the next cave.")
+
+        await self._action_writer.stop()
+        self._wire_tracer.close()
+
+    def _create_socket(self):
+        """
+        Creates a socket to talk to the server with.
+        """
+        return socketio.AsyncClient(logger=False,  # Set to true to see websocket traffic
+                                    engineio_logger=False,
+                                    reconnection=True,
+                                    reconnection_attempts=10,
+                                    # How long to wait in seconds before the first
+                                    # reconnection attempt.
+                                    # Each successive attempt doubles this delay.
+                                    reconnection_delay=1,
+
+                                    # The maximum delay between reconnection attempts.
+                                    reconnection_delay_max=3,
+
+                                    # socket.io uses this for every socket
+                                    # in the process, not only this one.
+                                    json=self._json_codec
+                                    )
+
+    def _register_handlers(self, sio) -> None:
+        sio.on('connect', self._only_if_current(sio, self.connect_received))
+        sio.on('connect_error', self._only_if_current(sio, self.connect_error))
+        sio.on('missing_role', self._only_if_current(sio, self.missing_role_received))
+        sio.on('map', self._only_if_current(sio, self.map_received))
+        sio.on('disconnect', self._only_if_current(sio, self.disconnect_received))
+        sio.on('entities', self._only_if_current(sio, self.entities_received))
+        sio.on('ping', self._only_if_current(sio, self.ping_received))
+        sio.on('*', self._only_if_current(sio, self.other_event_received))
+        sio.on('items', self._only_if_current(sio, self.items_received))
+        sio.on('position', self._only_if_current(sio, self.position_received))
+        sio.on('dead', self._only_if_current(sio, self.dead_received))
+        sio.on('delete', self._only_if_current(sio, self.delete_received))
+        sio.on('message', self._only_if_current(sio, self.message_received))
+        sio.on('update', self._only_if_current(sio, self.update_received))
+        sio.on('reconnect', self._only_if_current(sio, self.reconnect_received))
+
+    def _only_if_current(self, sio, handler):
+        """
+        Wraps an event handler so that events from a socket we've stopped
+        using are ignored. eg: from the cave we just left.
+        """
+        async def handle_if_current(*args):
+            if sio is not self._sio:
+                self._stale_events_ignored += 1
+                return None
+            return await handler(*args)
+        return handle_if_current
+
+    async def _open_connection(self, sio, url: str) -> bool:
+        """
+        Connects a socket to the server, and makes it the one we use.
+
+        Returns:
+            bool : False if the connection failed.
+        """
+        self._register_handlers(sio)
+        self._sio = sio
+        self._logger.debug("Connecting using %s", url)
+        try:
+            # Split the URL into 2 parts. The base part and the path part.
+            # eg: http://frontend-kandk.apps.jordan-test.cp.fyre.ibm.com/cave/0
+            # The base part is http://frontend-kandk.apps.jordan-test.cp.fyre.ibm.com
+            # The path part is /cave/0
+            (base_part, path_part) = EntityClient.split_url_parts(url)
             self._logger.debug(
-                'asyncio-run returned. is_reconnecting is %s', self._is_reconnecting)
+                "Connecting to base %s path %s", base_part, path_part)
+
+            if path_part == "/":
+                await sio.connect(base_part,
+                                  auth={'name': self._character_name,
+                                        'role': self._character_role}, transports=['websocket']
+                                  )
+            else:
+                await sio.connect(base_part,
+                                  auth={'name': self._character_name,
+                                        'role': self._character_role}, transports=['websocket'],
+                                  socketio_path=path_part
+                                  )
+
+            self._logger.debug("connected ok")
+            return True
+
+        except socketio.exceptions.ConnectionError as connectError:
+            self._logger.error(
+                "Failed to connect to server %s. %s", url, connectError)
+            if self._sio is sio:
+                self._sio = None
+            await sio.disconnect()
+            return False
 
     async def connect_received(self):
         self._logger.debug('> connection established')
@@ -81,6 +217,12 @@ class EntityClient(IEntityClient):
         # state in the entities list, using our own entity id.
         self._state.my_entity_id = my_entity_id
 
+        # Anything queued was about wherever we were before.
+        self._event_coalescer.clear()
+        self._action_writer.clear()
+        self._move_predictor.clear()
+        self._move_acks.clear()
+
         await self._sio.emit('get_map')
         self._logger.debug("< get_map")
 
@@ -89,18 +231,10 @@ class EntityClient(IEntityClient):
         if self._bot is not None:
             self._bot.clear()
 
-        # We won't try to reconnect, unless we get a re-connect
-        # after going through a gateway.
-        self._is_reconnecting = False
-
     async def connect_error(self, data):
         self._logger.debug("The connection failed!")
         self._logger.debug(data)
 
-        # We won't try to reconnect, unless we get a re-connect
-        # after going through a gateway.
-        self._is_reconnecting = False
-
         return False
 
     async def reconnect_received(self, data):
@@ -127,9 +261,21 @@ class EntityClient(IEntityClient):
             (base_part, _) = EntityClient.split_url_parts(self._server_url)
             self._server_url = base_part + new_path_part
 
-        self._is_reconnecting = True
-
-        await self.stop_comms()
+        self._handoff_started_at = time.monotonic()
+
+        # Connect to the next cave before leaving this one, so we are
+        # never without a connection.
+        old_sio = self._sio
+        connected = await self._open_connection(self._create_socket(), self._server_url)
+        if not connected:
+            self._handoff_started_at = None
+            self._failed_handoff_count += 1
+            self._logger.error("Could not move to the next cave at %s. Leaving this one anyway.",
+                               self._server_url)
+            # The server has sent us on from this cave, so staying connected
+            # to it is no use. With no connection left, run_comms finishes.
+        if old_sio is not None:
+            await old_sio.disconnect()
 
     @staticmethod
     def split_url_parts(url: str) -> (str, str):
@@ -156,55 +302,120 @@ class EntityClient(IEntityClient):
         return (base_part, path_part)
 
     async def ping_received(self):
+        self.apply_pending_events()
+        self._move_acks.expire()
+        if self._handoff_started_at is not None:
+            self._record_handoff_finished()
         await self._bot.tick()
 
+    def _record_handoff_finished(self) -> None:
+        handoff_seconds = time.monotonic() - self._handoff_started_at
+        self._handoff_started_at = None
+        self._handoff_count += 1
+        self._last_handoff_seconds = handoff_seconds
+        if self._max_handoff_seconds is None or handoff_seconds > self._max_handoff_seconds:
+            self._max_handoff_seconds = handoff_seconds
+        self._logger.debug("Moved to the next cave in %s seconds", handoff_seconds)
+
+    def apply_pending_events(self) -> int:
+        """
+        Brings the state up to date with the entity and item events which
+        have arrived since we last did this.
+
+        Returns:
+            int : The number of events which were applied. Some events may
+                have been skipped, as later events replaced them.
+        """
+        server_position = self._event_coalescer.latest_position_of(
+            self._state.my_entity_id)
+        applied = self._event_coalescer.apply_to(self._state)
+        self._move_predictor.reconcile(self._state, server_position)
+        return applied
+
+    def add_move_listener(self, listener) -> None:
+        self._move_acks.add_listener(listener)
+
+    @property
+    def move_acks(self) -> MoveAckTracker:
+        """
+        How our moves have fared: round trip times, and how many were
+        acknowledged, rejected or lost.
+        """
+        return self._move_acks
+
+    @property
+    def json_codec(self) -> JsonCodec:
+        """ What decodes the events which arrive from the server. """
+        return self._json_codec
+
+    async def submit_actions(self, actions: list):
+        """
+        Queues actions to be sent to the server by the writer task,
+        and returns without waiting for them to be sent.
+        """
+        self._action_writer.start()
+        self._action_writer.submit(actions)
+
+    @property
+    def status_summary(self) -> dict:
+        summary = {"events": self._event_coalescer.summary(),
+                   "actions": self._action_writer.summary(),
+                   "prediction": self._move_predictor.summary(),
+                   "moves": self._move_acks.summary(),
+                   "json_codec": self._json_codec.name}
+        if self._handoff_count > 0 or self._failed_handoff_count > 0 \
+                or self._stale_events_ignored > 0:
+            summary["handoff"] = {
+                "count": self._handoff_count,
+                "failed": self._failed_handoff_count,
+                "last_seconds": self._last_handoff_seconds,
+                "max_seconds": self._max_handoff_seconds,
+                "stale_events_ignored": self._stale_events_ignored
+            }
+        return summary
+
     async def missing_role_received(self):
         self._logger.debug('> missing role !')
 
     async def update_received(self, data):
         self._logger.debug('> update received')
-        self._logger.debug(json.dumps(data, sort_keys=False, indent=4))
-        entity = Entity.from_wire_format(data)
-        self._state.entities.update(entity)
+        if self._wire_tracer.enabled:
+            self._wire_tracer.trace('update', data)
+        self._event_coalescer.add_update(data)
 
     async def dead_received(self, data):
         """ The you-are-dead event sent from the server once.
         It is only sent to people who have just died.
         """
         self._logger.debug('> dead - GAME OVER')
-        # Pretty Print JSON
-        # self._logger.debug(json.dumps(data, sort_keys=False, indent=4))
+        if self._wire_tracer.enabled:
+            self._wire_tracer.trace('dead', data)
         await self.stop_comms()
 
     async def delete_received(self, data):
         self._logger.debug('> deleted')
+        if self._wire_tracer.enabled:
+            self._wire_tracer.trace('delete', data)
 
-        # Pretty Print JSON
-        self._logger.debug(json.dumps(data, sort_keys=False, indent=4))
-
-        if data.get('id', None) is not None:
-            # Data looks like an entity which has just died.
-            # So we want to delete the entity at this point.
-            wire_entity = Entity.from_wire_format(data)
-            identifier = wire_entity.identifier
-            self._state.entities.delete_by_id(identifier)
-
-        else:
-            # Data looks like a point, so find the entity at that point
-            # and remove it.
-            point = Point.from_dictionary(data)
-            self._state.entities.delete_at_position(point)
+        # Data looks like an entity which has just died, in which case
+        # we delete that entity. Otherwise it looks like a point, so we
+        # delete whatever entity is at that point.
+        self._event_coalescer.add_delete(data)
 
     async def entities_received(self, data):
         self._logger.debug('> entities')
-        # Pretty Print JSON
-        # self._logger.debug(json.dumps(data, sort_keys=False, indent=4))
-        self._state.entities = Entities.from_wire_format(data)
+        if self._wire_tracer.enabled:
+            self._wire_tracer.trace('entities', data)
+        self._event_coalescer.add_entities(data)
 
     async def map_received(self, map_data):
         self._logger.debug('> map')
-        #self._logger.debug(json.dumps(map_data, sort_keys=False, indent=4))
-        dungeon_map = DungeonMap.from_wire_format(map_data)
+        if self._wire_tracer.enabled:
+            self._wire_tracer.trace('map', map_data)
+        if self._map_cache is None:
+            dungeon_map = DungeonMap.from_wire_format(map_data)
+        else:
+            dungeon_map = self._map_cache.get_or_build(map_data)
         self._state.dungeon_map = dungeon_map
 
     async def disconnect_received(self):
@@ -221,60 +432,71 @@ class EntityClient(IEntityClient):
         It may refresh if someone else picks up an item. Not sure yet...
         """
         self._logger.debug('> items:')
-        # Pretty Print JSON
-        self._logger.debug(json.dumps(data, sort_keys=False, indent=4))
-        self._state.update_items(data)
+        if self._wire_tracer.enabled:
+            self._wire_tracer.trace('items', data)
+        level = self._floor_of_items(data)
+        if level is None:
+            self._logger.debug("Items ignored, as we don't know which floor they are on")
+            return
+        # Queued, and applied with the entity events.
+        self._event_coalescer.add_items(data, level)
+
+    def _floor_of_items(self, items_data: dict) -> int:
+        """
+        The floor an items list is for. The items say, if there are any.
+        Otherwise it's the floor we are on, as far as the events which
+        have arrived so far say.
+        """
+        for raw_items_at_point in items_data.values():
+            for raw_item in raw_items_at_point:
+                return raw_item['pos']['z']
+        position = self._event_coalescer.latest_position_of(self._state.my_entity_id)
+        if position is None:
+            me = self._state.find_my_entity()
+            if me is not None:
+                position = me.position
+        return None if position is None else position.z
 
     async def position_received(self, data):
         self._logger.debug('> position %s', data)
-        # # Pretty Print JSON
-        # self._logger.debug(json.dumps(data, sort_keys=False, indent=4))
+        if self._wire_tracer.enabled:
+            self._wire_tracer.trace('position', data)
         identifier = data['id']
         point = Point.from_dictionary(data['pos'])
-        self.state.update_position(identifier, point)
+        if identifier == self._state.my_entity_id:
+            # Checked as it arrives, so the round trip time is accurate.
+            self._move_acks.position_received(point)
+        self._event_coalescer.add_position(identifier, point)
 
     async def message_received(self, message: str):
         self._logger.debug('> message:%s', message)
-        self.state.messages.append(message)
+        if self._wire_tracer.enabled:
+            self._wire_tracer.trace('message', message)
+        self.state.add_message(message)
 
     async def stop_comms(self):
-        await self._sio.disconnect()
-
-    async def _do_comms(self):
-        url = self._server_url
-        self._logger.debug("Connecting using %s", url)
-        try:
-            # Split the URL into 2 parts. The base part and the path part.
-            # eg: http://frontend-kandk.apps.jordan-test.cp.fyre.ibm.com/cave/0
-            # The base part is http://frontend-kandk.apps.jordan-test.cp.fyre.ibm.com
-            # The path part is /cave/0
-            (base_part, path_part) = EntityClient.split_url_parts(url)
-            self._logger.debug(
-                "Connecting to base %s path %s", base_part, path_part)
-
-            if path_part == "/":
-                await self._sio.connect(base_part,
-                                        auth={'name': self._character_name,
-                                              'role': self._character_role}, transports=['websocket']
-                                        )
-            else:
-                await self._sio.connect(base_part,
-                                        auth={'name': self._character_name,
-                                              'role': self._character_role}, transports=['websocket'],
-                                        socketio_path=path_part
-                                        )
-
-            self._logger.debug("connected ok")
-            await self._sio.wait()
-
-        except socketio.exceptions.ConnectionError as connectError:
-            self._logger.error(
-                "Failed to connect to server %s. %s", url, connectError)
-            await self.stop_comms()
+        if self._sio is not None:
+            await self._sio.disconnect()
 
     async def send_move(self, direction):
         self._logger.debug("< send_move direction: %s", direction.name)
         await self._sio.emit('move', direction.name)
+        self._track_move(direction)
+        self._move_predictor.predict(self._state, direction)
+
+    def _track_move(self, direction) -> None:
+        """
+        Waits for the server to say we got where a move should take us.
+        Moves into other entities are attacks, which don't move us, so
+        they aren't waited for.
+        """
+        me = self._state.find_my_entity()
+        if me is None:
+            return
+        target = me.position.get_neighbour(direction)
+        if len(self._state.entities.get_by_position(target)) > 0:
+            return
+        self._move_acks.move_sent(me.position, direction)
 
     @property
     def bot(self):
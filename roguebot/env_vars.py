@@ -8,6 +8,9 @@ import os
 import sys
 import logging
 import random
+from .wire_trace import WireTracer
+from .json_codec import CODECS, AUTO
+from .retention import RetentionPolicy
 
 
 class EnvVarExtractor():
@@ -43,6 +46,47 @@ class EnvVarExtractor():
             The number of seconds delay the bot waits until it starts 
             playing. The HTTP server reports "ALIVE" until this point.
             After this point, it will report "READY".
+        columnar_entities (bool):
+            Keep a columnar (numpy) table of entity positions and numbers
+            as well as the entity objects. Helps in crowded caves.
+            Defaults to False.
+        retention_max_levels (int):
+            The most dungeon levels the bot remembers items and visited
+            places for, including the one it is on. Defaults to 3.
+        retention_max_level_age_seconds (int):
+            Levels left longer ago than this are forgotten.
+            Defaults to 1800.
+        retention_max_places_per_level (int):
+            The most visited places remembered on each level.
+            Defaults to 2000.
+        retention_max_goal_depth (int):
+            The most goals kept on the goal stack. Defaults to 32.
+        wire_trace_file (str):
+            A file to record events from the server in. None (the default)
+            turns tracing off.
+        wire_trace_sample_rates (dict):
+            Event name -> fraction of those events to record.
+            Other events are all recorded.
+        wire_trace_payload_bytes (int):
+            How much of each event's payload to record. Defaults to 256.
+        scheduler (str):
+            "adaptive" (the default) lets the bot choose how often to act,
+            and how many moves to make each time, from how fast the server
+            and the brain are. It never acts more often than speed allows. "fixed" acts every 11-speed ticks, making
+            actions_per_turn moves each time.
+        fleet_size (int):
+            How many bots `python -m roguebot.fleet` plays at once,
+            in one process. Defaults to 1.
+        fleet_workers (int):
+            How many processes the fleet's bots are spread over.
+            0 means one process per CPU core. Defaults to 1.
+        fleet_rebalance_seconds (int):
+            The least time between sharing a fleet's bots out between its
+            worker processes again. 0 never does. Defaults to 300.
+        json_codec (str):
+            The json library which decodes events from the server.
+            "auto" (the default) uses the fastest one installed.
+            "orjson", "ujson" or "json" asks for that one.
 
     """
 
@@ -61,6 +105,19 @@ class EnvVarExtractor():
                     K_AND_K_BOT_HTTP_SERVER_PORT
                     K_AND_K_BOT_HTTP_SERVER_ADDRESS
                     K_AND_K_BOT_STARTUP_DELAY_SECONDS
+                    K_AND_K_BOT_COLUMNAR_ENTITIES
+                    K_AND_K_BOT_RETENTION_MAX_LEVELS
+                    K_AND_K_BOT_RETENTION_MAX_LEVEL_AGE_SECONDS
+                    K_AND_K_BOT_RETENTION_MAX_PLACES_PER_LEVEL
+                    K_AND_K_BOT_RETENTION_MAX_GOAL_DEPTH
+                    K_AND_K_BOT_WIRE_TRACE_FILE
+                    K_AND_K_BOT_WIRE_TRACE_SAMPLE_RATES
+                    K_AND_K_BOT_WIRE_TRACE_PAYLOAD_BYTES
+                    K_AND_K_BOT_SCHEDULER
+                    K_AND_K_BOT_FLEET_SIZE
+                    K_AND_K_BOT_FLEET_WORKERS
+                    K_AND_K_BOT_FLEET_REBALANCE_SECONDS
+                    K_AND_K_BOT_JSON_CODEC
 
             python_version (sys.version_info): The version of python.
         """
@@ -73,12 +130,31 @@ class EnvVarExtractor():
         self.bot_http_server_port = None
         self.bot_http_server_address = None
         self.startup_delay_seconds = None
+        self.columnar_entities = None
+        self.retention_max_levels = None
+        self.retention_max_level_age_seconds = None
+        self.retention_max_places_per_level = None
+        self.retention_max_goal_depth = None
+        self.wire_trace_file = None
+        self.wire_trace_sample_rates = None
+        self.wire_trace_payload_bytes = None
+        self.scheduler = None
+        self.fleet_size = None
+        self.fleet_workers = None
+        self.fleet_rebalance_seconds = None
+        self.json_codec = None
 
         self.init_startup_delay(env)
         self.init_bot_http_server_settings(env)
         self.init_debug(env)
         self.init_speed(env)
         self.init_actions_per_turn(env)
+        self.init_columnar_entities(env)
+        self.init_retention(env)
+        self.init_wire_trace(env)
+        self.init_scheduler(env)
+        self.init_fleet(env)
+        self.init_json_codec(env)
 
         is_ok = self.init_character_name(env)
 
@@ -107,6 +183,27 @@ class EnvVarExtractor():
             self.bot_http_server_address)
         s += 'K_AND_K_BOT_STARTUP_DELAY_SECONDS={}\n'.format(
             self.startup_delay_seconds)
+        s += 'K_AND_K_BOT_COLUMNAR_ENTITIES={}\n'.format(
+            self.columnar_entities)
+        s += 'K_AND_K_BOT_RETENTION_MAX_LEVELS={}\n'.format(
+            self.retention_max_levels)
+        s += 'K_AND_K_BOT_RETENTION_MAX_LEVEL_AGE_SECONDS={}\n'.format(
+            self.retention_max_level_age_seconds)
+        s += 'K_AND_K_BOT_RETENTION_MAX_PLACES_PER_LEVEL={}\n'.format(
+            self.retention_max_places_per_level)
+        s += 'K_AND_K_BOT_RETENTION_MAX_GOAL_DEPTH={}\n'.format(
+            self.retention_max_goal_depth)
+        s += 'K_AND_K_BOT_WIRE_TRACE_FILE={}\n'.format(self.wire_trace_file)
+        s += 'K_AND_K_BOT_WIRE_TRACE_SAMPLE_RATES={}\n'.format(
+            self.wire_trace_sample_rates)
+        s += 'K_AND_K_BOT_WIRE_TRACE_PAYLOAD_BYTES={}\n'.format(
+            self.wire_trace_payload_bytes)
+        s += 'K_AND_K_BOT_SCHEDULER={}\n'.format(self.scheduler)
+        s += 'K_AND_K_BOT_FLEET_SIZE={}\n'.format(self.fleet_size)
+        s += 'K_AND_K_BOT_FLEET_WORKERS={}\n'.format(self.fleet_workers)
+        s += 'K_AND_K_BOT_FLEET_REBALANCE_SECONDS={}\n'.format(
+            self.fleet_rebalance_seconds)
+        s += 'K_AND_K_BOT_JSON_CODEC={}\n'.format(self.json_codec)
         return s
 
     def check_python_pre_req_level(self, python_version: sys.version_info) -> bool:
@@ -148,6 +245,56 @@ class EnvVarExtractor():
             speed = 10
         self.speed = speed
 
+    def init_columnar_entities(self, env: dict) -> None:
+        columnar_str = env.get('K_AND_K_BOT_COLUMNAR_ENTITIES', "False")
+        self.columnar_entities = (columnar_str == "True")
+
+    def init_retention(self, env: dict) -> None:
+        # Max to make sure none of them drop below 1
+        self.retention_max_levels = max(int(env.get(
+            'K_AND_K_BOT_RETENTION_MAX_LEVELS', "3")), 1)
+        self.retention_max_level_age_seconds = max(int(env.get(
+            'K_AND_K_BOT_RETENTION_MAX_LEVEL_AGE_SECONDS', "1800")), 1)
+        self.retention_max_places_per_level = max(int(env.get(
+            'K_AND_K_BOT_RETENTION_MAX_PLACES_PER_LEVEL', "2000")), 1)
+        self.retention_max_goal_depth = max(int(env.get(
+            'K_AND_K_BOT_RETENTION_MAX_GOAL_DEPTH',
+            str(RetentionPolicy.DEFAULT_MAX_GOAL_DEPTH))), 1)
+
+    def init_wire_trace(self, env: dict) -> None:
+        self.wire_trace_file = env.get('K_AND_K_BOT_WIRE_TRACE_FILE', None)
+        self.wire_trace_sample_rates = WireTracer.parse_sample_rates(
+            env.get('K_AND_K_BOT_WIRE_TRACE_SAMPLE_RATES', None))
+        # Max to make sure it never drops below 0
+        self.wire_trace_payload_bytes = max(int(env.get(
+            'K_AND_K_BOT_WIRE_TRACE_PAYLOAD_BYTES',
+            str(WireTracer.DEFAULT_PAYLOAD_BYTES))), 0)
+
+    def init_scheduler(self, env: dict) -> None:
+        scheduler = env.get('K_AND_K_BOT_SCHEDULER', "adaptive")
+        if scheduler not in ("adaptive", "fixed"):
+            print(
+                "Environment variable K_AND_K_BOT_SCHEDULER should be adaptive or fixed. Assumed to be adaptive.")
+            scheduler = "adaptive"
+        self.scheduler = scheduler
+
+    def init_fleet(self, env: dict) -> None:
+        # Max to make sure it never drops below 1
+        self.fleet_size = max(int(env.get('K_AND_K_BOT_FLEET_SIZE', "1")), 1)
+        # Max to make sure it never drops below 0
+        self.fleet_workers = max(
+            int(env.get('K_AND_K_BOT_FLEET_WORKERS', "1")), 0)
+        self.fleet_rebalance_seconds = max(
+            int(env.get('K_AND_K_BOT_FLEET_REBALANCE_SECONDS', "300")), 0)
+
+    def init_json_codec(self, env: dict) -> None:
+        json_codec = env.get('K_AND_K_BOT_JSON_CODEC', AUTO)
+        if json_codec != AUTO and json_codec not in CODECS:
+            print(
+                "Environment variable K_AND_K_BOT_JSON_CODEC should be auto, orjson, ujson or json. Assumed to be auto.")
+            json_codec = AUTO
+        self.json_codec = json_codec
+
     def init_debug(self, env: dict) -> None:
         self.is_debug = False
         is_debug_str = env.get('K_AND_K_BOT_DEBUG', "False")
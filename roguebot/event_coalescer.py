@@ -0,0 +1,199 @@
+"""
+Collects the entity events which arrive from the server between ticks, so
+only the ones which still matter are applied to the state.
+"""
+
+import logging
+from .navigation.point import Point
+from .state.entity import Entities, Entity
+from .state.state import State
+
+
+class EventCoalescer:
+    """
+    Queues entity events as they arrive, dropping those which later events
+    make pointless, then applies what is left to the state in one go, just
+    before the brain looks at it.
+
+    - A full 'entities' list replaces everything we knew about entities, so
+      it replaces any entity events queued before it. Only the last one is kept.
+    - A 'position' replaces an earlier 'position' for the same entity.
+    - An 'update' or 'delete' of an entity replaces an earlier 'position'
+      or 'update' of that same entity.
+
+    - An 'items' list replaces an earlier 'items' list for the same floor.
+      The floor is the one the list arrived for, not where we are when it
+      is applied, as we may have taken the stairs in between.
+
+    Deleting whatever is at a point depends on where everything is at that
+    moment, so nothing queued before one of those is merged with anything
+    queued after it.
+
+    Raw event data is kept, and only turned into Entity objects when it is
+    applied, so superseded events cost almost nothing.
+    """
+
+    POSITION = 'position'
+    UPDATE = 'update'
+    DELETE_ID = 'delete'
+    DELETE_POINT = 'delete_at'
+
+    def __init__(self):
+        self._logger = logging.getLogger(__name__)
+        self._entities_snapshot = None
+        # floor -> the last items list for that floor.
+        self._items_by_level = {}
+        # [kind, identifier, data] or None where an event was superseded.
+        self._events = []
+        # identifier -> index in _events of the latest event for that entity.
+        self._latest_event_index = {}
+
+        self._received_count = 0
+        self._applied_count = 0
+        self._batch_count = 0
+
+    @property
+    def pending_count(self) -> int:
+        pending = sum(1 for event in self._events if event is not None)
+        if self._entities_snapshot is not None:
+            pending += 1
+        pending += len(self._items_by_level)
+        return pending
+
+    def add_entities(self, raw_entities) -> None:
+        """ A complete list of entities. Everything queued before it is moot. """
+        self._received_count += 1
+        self._entities_snapshot = raw_entities
+        self._events = []
+        self._latest_event_index = {}
+
+    def add_items(self, raw_items: dict, level: int) -> None:
+        """
+        All the items on a floor. Replaces any items queued before for that floor.
+
+        Parameters:
+            raw_items (dict): The items, as they arrived.
+            level (int): The floor they are on.
+        """
+        self._received_count += 1
+        self._items_by_level[level] = raw_items
+
+    def add_position(self, identifier: str, point: Point) -> None:
+        self._received_count += 1
+        self._supersede(identifier, (EventCoalescer.POSITION,))
+        self._append(EventCoalescer.POSITION, identifier, point)
+
+    def add_update(self, raw_entity: dict) -> None:
+        self._received_count += 1
+        identifier = raw_entity.get('id')
+        self._supersede(identifier, (EventCoalescer.POSITION, EventCoalescer.UPDATE))
+        self._append(EventCoalescer.UPDATE, identifier, raw_entity)
+
+    def add_delete(self, raw_data: dict) -> None:
+        self._received_count += 1
+        identifier = raw_data.get('id', None)
+        if identifier is not None:
+            self._supersede(identifier, (EventCoalescer.POSITION, EventCoalescer.UPDATE))
+            self._append(EventCoalescer.DELETE_ID, identifier, None)
+        else:
+            self._events.append(
+                [EventCoalescer.DELETE_POINT, None, Point.from_dictionary(raw_data)])
+            # Nothing before this can be merged with anything after it.
+            self._latest_event_index = {}
+
+    def latest_position_of(self, identifier: str) -> Point:
+        """
+        Where the queued events say an entity is now.
+
+        Returns:
+            Point : The position from the last queued event giving one for
+                that entity, or None if nothing queued says where it is.
+        """
+        for event in reversed(self._events):
+            if event is None or event[1] != identifier:
+                continue
+            (kind, _, data) = event
+            if kind == EventCoalescer.POSITION:
+                return data
+            if kind == EventCoalescer.UPDATE:
+                return Point.from_dictionary(data['pos'])
+            return None
+        if self._entities_snapshot is not None:
+            for raw_entity in self._entities_snapshot:
+                if raw_entity.get('id') == identifier:
+                    return Point.from_dictionary(raw_entity['pos'])
+        return None
+
+    def clear(self) -> None:
+        """ Forget everything queued. eg: we've moved to a different cave. """
+        self._entities_snapshot = None
+        self._items_by_level = {}
+        self._events = []
+        self._latest_event_index = {}
+
+    def apply_to(self, state: State) -> int:
+        """
+        Applies everything queued to the state, then forgets it.
+
+        Returns:
+            int : The number of events applied.
+        """
+        applied = 0
+        if self._entities_snapshot is not None:
+            # Keep whichever way of storing entities we started with.
+            state.entities = Entities.from_wire_format(
+                self._entities_snapshot, columnar=state.entities.is_columnar)
+            applied += 1
+
+        for event in self._events:
+            if event is None:
+                continue
+            (kind, identifier, data) = event
+            if kind == EventCoalescer.POSITION:
+                if state.entities.get_by_id(identifier) is None:
+                    self._logger.debug(
+                        "Position of unknown entity %s ignored", identifier)
+                    continue
+                state.update_position(identifier, data)
+            elif kind == EventCoalescer.UPDATE:
+                state.update_entity(Entity.from_wire_format(data))
+            elif kind == EventCoalescer.DELETE_ID:
+                state.delete_entity_by_id(identifier)
+            else:
+                state.delete_entity_at_position(data)
+            applied += 1
+
+        for (level, raw_items) in self._items_by_level.items():
+            state.update_items(raw_items, level)
+            applied += 1
+
+        if applied > 0:
+            self._batch_count += 1
+        self._applied_count += applied
+        self.clear()
+        return applied
+
+    def summary(self) -> dict:
+        """
+        How many events arrived, and how many were actually applied.
+        """
+        ratio = 1.0
+        if self._received_count > 0:
+            ratio = round(self._applied_count / self._received_count, 3)
+        return {
+            "received": self._received_count,
+            "applied": self._applied_count,
+            "batches": self._batch_count,
+            "applied_ratio": ratio
+        }
+
+    def _supersede(self, identifier: str, kinds: tuple) -> None:
+        index = self._latest_event_index.get(identifier)
+        if index is not None:
+            event = self._events[index]
+            if event is not None and event[0] in kinds:
+                self._events[index] = None
+
+    def _append(self, kind: str, identifier: str, data) -> None:
+        self._latest_event_index[identifier] = len(self._events)
+        self._events.append([kind, identifier, data])
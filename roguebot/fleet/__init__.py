@@ -0,0 +1,3 @@
+"""
+Runs many bots in one process.
+"""
@@ -0,0 +1,40 @@
+"""This is the first piece of logic which gets executed when
+python -m roguebot.fleet
+is used.
+
+It plays K_AND_K_BOT_FLEET_SIZE bots, in this one process or spread
+over K_AND_K_BOT_FLEET_WORKERS worker processes.
+"""
+
+import os
+import sys
+import logging
+from ..env_vars import EnvVarExtractor
+from .builder import build_fleet
+from .supervisor import Supervisor
+
+
+def main():
+    env = EnvVarExtractor(os.environ, sys.version_info)
+    if env.is_ok:
+
+        if env.is_debug:
+            logging.basicConfig(level=logging.DEBUG)
+
+        logger = logging.getLogger(__name__)
+        logger.debug(str(env))
+
+        if env.fleet_workers == 1:
+            fleet = build_fleet(env, range(env.fleet_size))
+
+            # Run all the bots on this thread. This blocks until they all die.
+            fleet.play()
+        else:
+            # Spread the bots over several processes.
+            # This blocks until they all die.
+            Supervisor(env, worker_count=env.fleet_workers,
+                       rebalance_interval_seconds=env.fleet_rebalance_seconds).run()
+
+
+if __name__ == '__main__':
+    main()
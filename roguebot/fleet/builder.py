@@ -0,0 +1,66 @@
+"""
+Creates fleets of bots, set up from environment variables.
+"""
+
+from ..bot import Bot
+from ..client import EntityClient
+from ..state.state import State
+from ..state.entity import Entities
+from ..retention import RetentionPolicy
+from ..wire_trace import WireTracer
+from ..tick_scheduler import create_tick_scheduler
+from ..json_codec import create_json_codec
+from ..env_vars import EnvVarExtractor
+from .fleet import Fleet
+
+
+def build_fleet(env: EnvVarExtractor, indexes: [int],
+                with_http_server: bool = True) -> Fleet:
+    """
+    Creates a fleet of bots, set up from the environment.
+
+    Parameters:
+        env (EnvVarExtractor): The settings to use for every bot.
+        indexes ([int]): The numbers of the bots to create. Each bot
+            is named after the character name and its number.
+        with_http_server (bool): False if the fleet shouldn't start an
+            HTTP server of its own, or wait before starting to play,
+            as something else is reporting on it.
+
+    Returns:
+        Fleet : The bots, ready to play.
+    """
+    if with_http_server:
+        fleet = Fleet(bot_http_server_port=env.bot_http_server_port,
+                      bot_http_server_address=env.bot_http_server_address,
+                      startup_delay_seconds=env.startup_delay_seconds)
+    else:
+        fleet = Fleet()
+
+    # One trace file is shared by all the bots.
+    wire_tracer = WireTracer(file_path=env.wire_trace_file,
+                             sample_rates=env.wire_trace_sample_rates,
+                             payload_bytes=env.wire_trace_payload_bytes)
+    # As is the json codec.
+    json_codec = create_json_codec(env.json_codec)
+
+    for index in indexes:
+        name = Fleet.bot_name(env.character_name, index)
+        client = EntityClient(name, env.character_role, env.url,
+                              wire_tracer=wire_tracer,
+                              map_cache=fleet.map_cache,
+                              json_codec=json_codec)
+        if env.columnar_entities:
+            client.state = State(entities=Entities(columnar=True))
+        bot = Bot(name, client, speed=env.speed,
+                  actions_per_turn=env.actions_per_turn,
+                  retention_policy=RetentionPolicy(
+                      max_levels=env.retention_max_levels,
+                      max_level_age_seconds=env.retention_max_level_age_seconds,
+                      max_places_per_level=env.retention_max_places_per_level,
+                      max_goal_depth=env.retention_max_goal_depth),
+                  tick_scheduler=create_tick_scheduler(
+                      env.scheduler, env.speed, env.actions_per_turn))
+        client.bot = bot
+        fleet.add(name, bot, client)
+    return fleet
@@ -0,0 +1,181 @@
+"""
+Many bots playing at once, as tasks on one event loop.
+"""
+
+import asyncio
+import logging
+import time
+from ..bot import Bot
+from ..client import EntityClient
+from ..httpserver.bot_http_server import BotHttpServer
+from ..state.map_cache import MapCache
+
+
+class Fleet:
+    """
+    A number of bots, each with its own client, all playing in one process.
+
+    Each bot talks to the server as a task on a single event loop, so the
+    bots share one interpreter, one copy of numpy and one HTTP server thread.
+    Bots in the same cave share its map through the map cache.
+
+    One HTTP server reports on the whole fleet. It is "READY" once any of
+    the bots is ready, and /status lists the status of every bot.
+    """
+
+    DEFAULT_STAGGER_SECONDS = 0.05
+
+    def __init__(self,
+                 map_cache: MapCache = None,
+                 bot_http_server_port: int = None,
+                 bot_http_server_address: str = "127.0.0.1",
+                 startup_delay_seconds: int = 0,
+                 stagger_seconds: float = DEFAULT_STAGGER_SECONDS):
+        """
+        Parameters:
+            map_cache (MapCache): The maps shared by the bots.
+                Defaults to a new empty MapCache.
+            bot_http_server_port (int): The port of the fleet's HTTP server.
+                If None, no HTTP server is started.
+            bot_http_server_address (str): The address the HTTP server binds to.
+            startup_delay_seconds (int): How long to wait before the bots
+                start playing.
+            stagger_seconds (float): The gap between one bot connecting
+                and the next, so the server isn't hit by all of them at once.
+        """
+        self._logger = logging.getLogger(__name__)
+        if map_cache is None:
+            map_cache = MapCache()
+        self._map_cache = map_cache
+        self._bot_http_server_port = bot_http_server_port
+        self._bot_http_server_address = bot_http_server_address
+        self._startup_delay_seconds = startup_delay_seconds
+        self._stagger_seconds = max(stagger_seconds, 0)
+
+        # name -> (bot, client)
+        self._members = {}
+        self._playing_count = 0
+        self._crashed_count = 0
+
+    @property
+    def map_cache(self) -> MapCache:
+        return self._map_cache
+
+    @property
+    def names(self) -> [str]:
+        return list(self._members.keys())
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    @staticmethod
+    def bot_name(character_name: str, index: int) -> str:
+        """
+        The name of bot number index in a fleet.
+        """
+        return '{}-{}'.format(character_name, index)
+
+    def decision_cpu_seconds(self) -> dict:
+        """
+        Returns:
+            dict : The name of each bot -> the CPU time it has spent deciding what to do.
+        """
+        return {name: bot.decision_cpu_seconds
+                for (name, (bot, _)) in list(self._members.items())}
+
+    def add(self, name: str, bot: Bot, client: EntityClient) -> None:
+        """
+        Adds a bot to the fleet. It starts playing when the fleet does.
+
+        Parameters:
+            name (str): The name of the bot. Must be unique in the fleet.
+            bot (Bot): The bot.
+            client (EntityClient): The client the bot plays through.
+        """
+        if name in self._members:
+            raise ValueError("Bot {} is already in the fleet".format(name))
+        self._members[name] = (bot, client)
+
+    @property
+    def is_ready(self) -> bool:
+        """
+        True if any of the bots has enough state to be playing.
+        """
+        for (bot, _) in list(self._members.values()):
+            if bot.is_ready:
+                return True
+        return False
+
+    @property
+    def status_summary(self) -> dict:
+        """
+        The status of the whole fleet, with the status of each bot in it.
+        """
+        bot_summaries = {}
+        ready_count = 0
+        for (name, (bot, _)) in list(self._members.items()):
+            if bot.is_ready:
+                ready_count += 1
+                bot_summaries[name] = {"status": "READY", **bot.status_summary}
+            else:
+                bot_summaries[name] = {"status": "ALIVE"}
+        return {
+            "fleet": {
+                "bots": len(bot_summaries),
+                "ready": ready_count,
+                "playing": self._playing_count,
+                "crashed": self._crashed_count,
+                "maps": self._map_cache.summary()
+            },
+            "bots": bot_summaries
+        }
+
+    def play(self) -> None:
+        """
+        Starts all the bots playing.
+
+        This call blocks until every bot is dead.
+        """
+        http_server = None
+        if self._bot_http_server_port is not None:
+            http_server = BotHttpServer(self._bot_http_server_address,
+                                        self._bot_http_server_port,
+                                        self)
+            http_server.start()
+
+        if self._startup_delay_seconds > 0:
+            self._logger.debug(
+                "Waiting for a bit before we start playing (%s seconds)",
+                self._startup_delay_seconds)
+            time.sleep(self._startup_delay_seconds)
+
+        asyncio.run(self.run())
+
+        if http_server is not None:
+            http_server.stop()
+
+    async def run(self) -> None:
+        """
+        Plays every bot on the current event loop, until they are all dead.
+        """
+        members = list(self._members.items())
+        await asyncio.gather(*[
+            self._run_member(name, client, index * self._stagger_seconds)
+            for (index, (name, (_, client))) in enumerate(members)])
+
+    async def _run_member(self, name: str, client: EntityClient,
+                          delay_seconds: float) -> None:
+        """
+        Plays one bot. If it fails, the others carry on.
+        """
+        if delay_seconds > 0:
+            await asyncio.sleep(delay_seconds)
+        self._playing_count += 1
+        try:
+            await client.run_comms()
+        except Exception:
+            self._crashed_count += 1
+            self._logger.exception("Bot %s stopped with an error", name)
+        finally:
+            self._playing_count -= 1
+        self._logger.debug("Bot %s has finished", name)
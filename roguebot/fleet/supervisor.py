@@ -0,0 +1,503 @@
+"""
+Spreads the bots of a fleet over several worker processes, one per CPU core.
+
+Deciding what to do is CPU-bound, and the bots in one process take turns
+on the one interpreter lock. So the bots are shared out between workers,
+each pinned to a core of its own, and a supervisor looks after them.
+"""
+
+import asyncio
+import heapq
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+from ..env_vars import EnvVarExtractor
+from ..httpserver.bot_http_server import BotHttpServer
+from .builder import build_fleet
+from .fleet import Fleet
+
+
+def available_cpus() -> [int]:
+    """
+    Returns:
+        [int] : The CPU cores this process is allowed to run on.
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def plan_shards(indexes: [int], costs: dict, worker_count: int) -> [[int]]:
+    """
+    Shares bots out between workers so each worker has about the same
+    amount of deciding to do.
+
+    The most expensive bots are placed first, each going to the worker
+    with the least to do so far (longest processing time first).
+    Bots we don't know the cost of yet are assumed to be average,
+    and workers with the same load are told apart by how many bots they have.
+
+    Parameters:
+        indexes ([int]): The numbers of the bots to share out.
+        costs (dict): Bot number -> CPU seconds per second it spends deciding.
+        worker_count (int): How many workers to share them between.
+
+    Returns:
+        [[int]] : The bot numbers for each worker, in order.
+    """
+    worker_count = max(worker_count, 1)
+    known_costs = [costs[index] for index in indexes if index in costs]
+    average_cost = 0.0
+    if len(known_costs) > 0:
+        average_cost = sum(known_costs) / len(known_costs)
+
+    most_expensive_first = sorted(
+        indexes, key=lambda index: (-costs.get(index, average_cost), index))
+
+    shards = [[] for _ in range(worker_count)]
+    # (load, number of bots, worker number)
+    loads = [(0.0, 0, worker_number) for worker_number in range(worker_count)]
+    for index in most_expensive_first:
+        (load, bot_count, worker_number) = heapq.heappop(loads)
+        shards[worker_number].append(index)
+        heapq.heappush(loads, (load + costs.get(index, average_cost),
+                               bot_count + 1, worker_number))
+
+    for shard in shards:
+        shard.sort()
+    return shards
+
+
+def worker_context():
+    """
+    The multiprocessing context to start workers with.
+
+    Workers are started, and restarted, while the supervisor's HTTP server
+    thread is running. A plain fork would copy that thread's locks in
+    whatever state they were in, and the server's listening socket too.
+    So workers come from a fork server where there is one, or are spawned
+    as fresh interpreters where there isn't.
+
+    Returns:
+        The context.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def pin_to_cpu(cpu: int) -> None:
+    """
+    Makes the current process run only on one CPU core, where that is possible.
+    """
+    if cpu is not None and hasattr(os, 'sched_setaffinity'):
+        try:
+            os.sched_setaffinity(0, {cpu})
+        except OSError as ex:
+            logging.getLogger(__name__).warning(
+                "Could not pin to cpu %s. %s", cpu, ex)
+
+
+def run_worker(env: EnvVarExtractor, worker_number: int, indexes: [int],
+               cpu: int, reports, report_interval_seconds: float) -> None:
+    """
+    The body of a worker process. Plays a fleet of bots until they all die,
+    reporting on them every so often.
+
+    Parameters:
+        env (EnvVarExtractor): The settings for every bot.
+        worker_number (int): Which worker this is.
+        indexes ([int]): The numbers of the bots this worker plays.
+        cpu (int): The CPU core to run on.
+        reports (Queue): Where reports for the supervisor are put.
+        report_interval_seconds (float): How often to report.
+    """
+    # Workers forked from the supervisor would inherit its SIGTERM handler,
+    # which would stop the supervisor being able to terminate them.
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    if env.is_debug:
+        logging.basicConfig(level=logging.DEBUG)
+    pin_to_cpu(cpu)
+    fleet = build_fleet(env, indexes, with_http_server=False)
+    index_by_name = {Fleet.bot_name(env.character_name, index): index
+                     for index in indexes}
+    asyncio.run(play_and_report(fleet, worker_number, index_by_name,
+                                reports, report_interval_seconds))
+
+
+async def play_and_report(fleet: Fleet, worker_number: int, index_by_name: dict,
+                          reports, report_interval_seconds: float) -> None:
+    """
+    Plays a fleet of bots until they all die, putting a report on the
+    reports queue every report_interval_seconds, and once more at the end.
+
+    Each report is a dict holding the worker number, how long the worker
+    has been playing, the fleet's status, and the CPU time each bot
+    (by number) has spent deciding what to do.
+    """
+    started_at = time.monotonic()
+    playing = asyncio.ensure_future(fleet.run())
+    while not playing.done():
+        await asyncio.wait([playing], timeout=report_interval_seconds)
+        cpu_seconds = {index_by_name[name]: seconds
+                       for (name, seconds) in fleet.decision_cpu_seconds().items()
+                       if name in index_by_name}
+        reports.put({
+            "worker": worker_number,
+            "seconds": time.monotonic() - started_at,
+            "status": fleet.status_summary,
+            "cpu_seconds": cpu_seconds
+        })
+
+
+class WorkerHandle:
+    """
+    What the supervisor knows about one of its worker processes.
+    """
+
+    def __init__(self, worker_number: int, cpu: int, indexes: [int]):
+        self.worker_number = worker_number
+        self.cpu = cpu
+        self.indexes = indexes
+        self.process = None
+        self.restarts = 0
+        self.restart_at = None
+        self.is_finished = False
+        self.last_status = {}
+
+    def load(self, costs: dict) -> float:
+        return sum(costs.get(index, 0.0) for index in self.indexes)
+
+
+class Supervisor:
+    """
+    Plays a fleet of bots spread over worker processes.
+
+    - Each worker plays a shard of the bots, and is pinned to a CPU core.
+    - Workers which crash are started again, after a short delay,
+      up to max_restarts times each. Workers whose bots have all died
+      finish normally, and aren't restarted.
+    - Every so often, if some workers have much more deciding to do than
+      others, the bots are shared out again, by the CPU time they have
+      been measured spending. Workers whose share changes are restarted,
+      so all their bots re-join the game, even those which stay put.
+      A rebalance_interval_seconds of 0 turns this off.
+    - One HTTP server reports on all the workers and all their bots.
+
+    Behaves like a bot as far as the BotHttpServer is concerned.
+    """
+
+    DEFAULT_REPORT_INTERVAL_SECONDS = 5
+    DEFAULT_MAX_RESTARTS = 5
+    DEFAULT_RESTART_DELAY_SECONDS = 1
+    DEFAULT_REBALANCE_THRESHOLD = 1.25
+    DEFAULT_REBALANCE_INTERVAL_SECONDS = 300
+    POLL_INTERVAL_SECONDS = 0.5
+    STOP_TIMEOUT_SECONDS = 5
+
+    def __init__(self,
+                 env: EnvVarExtractor,
+                 worker_count: int = 0,
+                 bot_count: int = None,
+                 cpus: [int] = None,
+                 context=None,
+                 report_interval_seconds: float = DEFAULT_REPORT_INTERVAL_SECONDS,
+                 max_restarts: int = DEFAULT_MAX_RESTARTS,
+                 restart_delay_seconds: float = DEFAULT_RESTART_DELAY_SECONDS,
+                 rebalance_threshold: float = DEFAULT_REBALANCE_THRESHOLD,
+                 rebalance_interval_seconds: float = DEFAULT_REBALANCE_INTERVAL_SECONDS,
+                 clock=time.monotonic):
+        """
+        Parameters:
+            env (EnvVarExtractor): The settings for every bot.
+            worker_count (int): How many worker processes to use.
+                0 means one per CPU core. Never more than the number of bots.
+            bot_count (int): How many bots to play.
+                Defaults to the fleet size in env.
+            cpus ([int]): The CPU cores to pin workers to, in turn.
+                Defaults to all the cores we may run on.
+            context : The multiprocessing context to create workers with.
+                Defaults to worker_context()
+            report_interval_seconds (float): How often workers report.
+            max_restarts (int): How many times a crashed worker is restarted.
+            restart_delay_seconds (float): How long to wait before restarting.
+            rebalance_threshold (float): Bots are shared out again when the
+                busiest worker has this many times the average load.
+            rebalance_interval_seconds (float): The least time between
+                sharing the bots out again. 0 never shares them out again.
+            clock : Gives the time in seconds. Defaults to time.monotonic
+        """
+        self._logger = logging.getLogger(__name__)
+        self._env = env
+        if bot_count is None:
+            bot_count = env.fleet_size
+        if cpus is None or len(cpus) == 0:
+            cpus = available_cpus()
+        if worker_count is None or worker_count < 1:
+            worker_count = len(cpus)
+        worker_count = max(min(worker_count, bot_count), 1)
+
+        if context is None:
+            context = worker_context()
+        self._context = context
+        self._reports = context.Queue()
+
+        self._report_interval_seconds = report_interval_seconds
+        self._max_restarts = max_restarts
+        self._restart_delay_seconds = restart_delay_seconds
+        self._rebalance_threshold = rebalance_threshold
+        self._rebalance_interval_seconds = rebalance_interval_seconds
+        self._clock = clock
+
+        # Bot number -> CPU seconds per second it spends deciding.
+        self._costs = {}
+        self._last_rebalance_at = clock()
+        self._rebalance_count = 0
+        self._stop_requested = False
+
+        shards = plan_shards(list(range(bot_count)), self._costs, worker_count)
+        self._workers = [WorkerHandle(worker_number, cpus[worker_number % len(cpus)], shard)
+                         for (worker_number, shard) in enumerate(shards)]
+
+    @property
+    def workers(self) -> [WorkerHandle]:
+        return self._workers
+
+    @property
+    def rebalance_count(self) -> int:
+        return self._rebalance_count
+
+    @property
+    def is_finished(self) -> bool:
+        return all(worker.is_finished for worker in self._workers)
+
+    def start(self) -> None:
+        """
+        Starts all the workers.
+        """
+        for worker in self._workers:
+            self._start_worker(worker)
+
+    def _start_worker(self, worker: WorkerHandle) -> None:
+        worker.process = self._context.Process(
+            target=run_worker,
+            args=(self._env, worker.worker_number, worker.indexes, worker.cpu,
+                  self._reports, self._report_interval_seconds),
+            daemon=True)
+        worker.process.start()
+        worker.restart_at = None
+        worker.last_status = {}
+        self._logger.debug("Started worker %s on cpu %s with bots %s",
+                           worker.worker_number, worker.cpu, worker.indexes)
+
+    def _stop_worker(self, worker: WorkerHandle) -> None:
+        process = worker.process
+        if process is None or not process.is_alive():
+            return
+        process.terminate()
+        process.join(timeout=Supervisor.STOP_TIMEOUT_SECONDS)
+        if process.is_alive():
+            self._logger.warning("Worker %s ignored being terminated. Killing it.",
+                                 worker.worker_number)
+            process.kill()
+            process.join(timeout=Supervisor.STOP_TIMEOUT_SECONDS)
+
+    def poll(self) -> None:
+        """
+        Takes in the workers' reports, restarts workers which crashed,
+        and shares the bots out again if the workers are unbalanced.
+        """
+        now = self._clock()
+        self._read_reports()
+        for worker in self._workers:
+            self._check_worker(worker, now)
+        self.rebalance_if_needed(now)
+
+    def _read_reports(self) -> None:
+        while True:
+            try:
+                report = self._reports.get_nowait()
+            except queue.Empty:
+                break
+            self.take_report(report)
+
+    def take_report(self, report: dict) -> None:
+        """
+        Remembers what a worker has told us about its bots.
+        """
+        worker = self._workers[report["worker"]]
+        worker.last_status = report["status"]
+        seconds = max(report["seconds"], 1e-3)
+        for (index, cpu_seconds) in report["cpu_seconds"].items():
+            self._costs[index] = cpu_seconds / seconds
+
+    def _check_worker(self, worker: WorkerHandle, now: float) -> None:
+        if worker.is_finished or worker.process is None:
+            return
+        if worker.restart_at is not None:
+            if now >= worker.restart_at:
+                self._start_worker(worker)
+            return
+        if worker.process.is_alive():
+            return
+
+        exit_code = worker.process.exitcode
+        if exit_code == 0:
+            self._logger.debug("Worker %s has finished",
+                               worker.worker_number)
+            worker.is_finished = True
+        elif worker.restarts < self._max_restarts:
+            worker.restarts += 1
+            worker.restart_at = now + self._restart_delay_seconds
+            self._logger.warning("Worker %s crashed with exit code %s. Restart %s of %s.",
+                                 worker.worker_number, exit_code,
+                                 worker.restarts, self._max_restarts)
+        else:
+            self._logger.error("Worker %s crashed with exit code %s. Giving up on it.",
+                               worker.worker_number, exit_code)
+            worker.is_finished = True
+
+    def rebalance_if_needed(self, now: float) -> bool:
+        """
+        Shares the bots out again if the busiest worker has much more
+        deciding to do than the average, and doing so would help.
+
+        Returns:
+            bool : True if the bots were shared out again.
+        """
+        if self._rebalance_interval_seconds <= 0:
+            return False
+        if now - self._last_rebalance_at < self._rebalance_interval_seconds:
+            return False
+        self._last_rebalance_at = now
+
+        workers = [worker for worker in self._workers
+                   if not worker.is_finished and worker.restart_at is None]
+        if len(workers) < 2:
+            return False
+        loads = [worker.load(self._costs) for worker in workers]
+        average_load = sum(loads) / len(loads)
+        if average_load <= 0 or max(loads) < average_load * self._rebalance_threshold:
+            return False
+
+        indexes = [index for worker in workers for index in worker.indexes]
+        shards = plan_shards(indexes, self._costs, len(workers))
+        new_max_load = max(sum(self._costs.get(index, 0.0) for index in shard)
+                           for shard in shards)
+        if new_max_load >= max(loads):
+            return False
+
+        self._rebalance_count += 1
+        self._logger.debug("Sharing the bots out again. Loads were %s", loads)
+        for (worker, shard) in self._match_shards_to_workers(workers, shards):
+            if sorted(worker.indexes) != shard:
+                worker.indexes = shard
+                self._stop_worker(worker)
+                self._start_worker(worker)
+        return True
+
+    @staticmethod
+    def _match_shards_to_workers(workers: [WorkerHandle], shards: [[int]]) -> list:
+        """
+        Pairs each new shard with the worker already playing most of its bots,
+        so as few bots as possible have to move.
+        """
+        unmatched = list(workers)
+        pairs = []
+        for shard in sorted(shards, key=len, reverse=True):
+            shard_set = set(shard)
+            worker = max(unmatched,
+                         key=lambda worker: len(shard_set.intersection(worker.indexes)))
+            unmatched.remove(worker)
+            pairs.append((worker, shard))
+        return pairs
+
+    @property
+    def is_ready(self) -> bool:
+        """
+        True if any bot in any worker has enough state to be playing.
+        """
+        for worker in self._workers:
+            if worker.last_status.get("fleet", {}).get("ready", 0) > 0:
+                return True
+        return False
+
+    @property
+    def status_summary(self) -> dict:
+        """
+        The status of all the workers, and every bot in them.
+        """
+        workers_summary = {}
+        bots_summary = {}
+        for worker in self._workers:
+            process = worker.process
+            workers_summary[str(worker.worker_number)] = {
+                "pid": None if process is None else process.pid,
+                "cpu": worker.cpu,
+                "alive": process is not None and process.is_alive(),
+                "finished": worker.is_finished,
+                "bots": len(worker.indexes),
+                "load": round(worker.load(self._costs), 4),
+                "restarts": worker.restarts
+            }
+            bots_summary.update(worker.last_status.get("bots", {}))
+        return {
+            "supervisor": {
+                "workers": len(self._workers),
+                "bots": sum(len(worker.indexes) for worker in self._workers),
+                "restarts": sum(worker.restarts for worker in self._workers),
+                "rebalances": self._rebalance_count
+            },
+            "workers": workers_summary,
+            "bots": bots_summary
+        }
+
+    def request_stop(self) -> None:
+        """
+        Asks run() to stop all the workers and return.
+        """
+        self._stop_requested = True
+
+    def stop(self) -> None:
+        """
+        Stops all the workers.
+        """
+        for worker in self._workers:
+            self._stop_worker(worker)
+
+    def run(self) -> None:
+        """
+        Starts the HTTP server and the workers, then looks after the workers
+        until all their bots are dead, or we are asked to stop.
+
+        This call blocks until then.
+        """
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM,
+                          lambda signal_number, frame: self.request_stop())
+
+        http_server = None
+        if self._env.bot_http_server_port is not None:
+            http_server = BotHttpServer(self._env.bot_http_server_address,
+                                        self._env.bot_http_server_port,
+                                        self)
+            http_server.start()
+
+        if self._env.startup_delay_seconds > 0:
+            time.sleep(self._env.startup_delay_seconds)
+
+        try:
+            self.start()
+            while not self._stop_requested and not self.is_finished:
+                time.sleep(Supervisor.POLL_INTERVAL_SECONDS)
+                self.poll()
+        except KeyboardInterrupt:
+            self._logger.debug("Interrupted.")
+        finally:
+            self.stop()
+            if http_server is not None:
+                http_server.stop()
@@ -8,7 +8,6 @@ from ..brains.item_handling_brain import ItemHandlingBrain
 from ..state.entity import Entity
 from ..state.state import State
 from ..action import Action, TakeAction, MoveAction, EatAction, WearAction, WieldAction
-from ..navigation.path import PathFinder
 from ..navigation.direction import Direction
 from ..goals.goal import Goal
 from ..state.item import Item
@@ -18,12 +17,6 @@ from ..state.item import Item
 
 
 class AdvancedGoal(Goal):
-    def __init__(self):
-        super().__init__()
-
-        # Allows us to find routes to points.
-        self._path_finder = PathFinder()
-
     def select_stairs(self, state: State, z_dungeon_level: int):
         stairs_list = state.dungeon_map.get_stair_points(
             z_dungeon_level, Direction.UP)
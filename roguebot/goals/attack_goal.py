@@ -7,11 +7,11 @@ from ..brains.item_handling_brain import ItemHandlingBrain
 from ..state.entity import Entity
 from ..state.state import State
 from ..action import Action, TakeAction, MoveAction, EatAction, WearAction, WieldAction
-from ..navigation.path import PathFinder
 from ..navigation.direction import Direction
 from ..goals.goal import Goal
 from ..state.item import Item
 from .seek_point_goal import SeekPointGoal
+from . import candidate_scoring
 
 
 class AttackEntity(SeekPointGoal):
@@ -27,24 +27,32 @@ class AttackEntity(SeekPointGoal):
     def __str__(self):
         return "AttackEntity {} {}".format(self._target_entity_name, self._target_entity_id)
 
+    def decision_key(self, me: Entity, state: State):
+        """ We chase our target wherever it goes. """
+        target_position = None
+        if self._target_entity_id is not None:
+            target_entity = state.entities.get_by_id(self._target_entity_id)
+            if target_entity is not None:
+                target_position = target_entity.position
+        return (self._target_entity_id, target_position)
+
     def acquire_target(self, me: Entity, state: State) -> bool:
-        possible_enemies = state.entities.get_all()
+        possible_enemies = [enemy for enemy in state.entities.get_all()
+                            if enemy.identifier != me.identifier]
 
         self._logger.debug("Acquiring enemy target if we can...")
         self._logger.debug("me: %s %s", me.identifier, me)
 
         # Big scores are entities we want to go after...
+        # Score them all at once, using one map of distances from where we are.
+        distance_map = state.navigation.distance_map(me.position, state)
+        scores = candidate_scoring.score_enemies(me, possible_enemies, distance_map)
+
         best_enemy_score = 0
         best_enemy = None
-        for enemy in possible_enemies:
-
-            if enemy.identifier != me.identifier:
-
-                enemy_score = self.score_enemy(enemy=enemy, me=me, state=state)
-                if enemy_score > best_enemy_score:
-                    self._logger.debug("Thats the best so far...")
-                    best_enemy_score = enemy_score
-                    best_enemy = enemy
+        for (best_enemy_score, best_enemy) in candidate_scoring.top_k(possible_enemies, scores, 1):
+            self._logger.debug("Entity %s at %s is the best, with a score of %s",
+                               best_enemy.name, best_enemy.position, best_enemy_score)
 
         # Only bother with targets with big enough scores.
         if best_enemy_score > 0:
@@ -60,9 +68,9 @@ class AttackEntity(SeekPointGoal):
         enemy_score = 0
 
         # Go for the local enemies first...
-        path_to_enemy = self._path_finder.find_path(from_point=me.position,
-                                                    to_point=enemy.position,
-                                                    state=state)
+        path_to_enemy = state.navigation.find_path(from_point=me.position,
+                                                   to_point=enemy.position,
+                                                   state=state)
         if path_to_enemy is None:
             # Can't find a way to this enemy, so ignore it.
             enemy_score -= 5000
@@ -91,7 +99,7 @@ class AttackEntity(SeekPointGoal):
                 enemy_name_parts = enemy.name.split('-')
                 enemy_bot_number_part = enemy_name_parts[-1]
                 if enemy_bot_number_part.isnumeric():
-                    enemy_bot_number = int()
+                    enemy_bot_number = int(enemy_bot_number_part)
 
                     if my_bot_number > enemy_bot_number:
                         # Don't target assassin bots with a higher number than me.
@@ -141,9 +149,9 @@ class AttackEntity(SeekPointGoal):
             # target entity still exists.
 
             # Use a path-finder to find a route to it.
-            path = self._path_finder.find_path(from_point=me.position,
-                                               to_point=target_entity.position,
-                                               state=state)
+            path = state.navigation.find_path(from_point=me.position,
+                                              to_point=target_entity.position,
+                                              state=state)
 
             if path is None:
                 # Can't find a path to that entity.
@@ -152,7 +160,8 @@ class AttackEntity(SeekPointGoal):
                 goals.pop()
 
             else:
-                self._logger.debug(self._path_printer.render_path(
+                # Only drawn if debug logging is on.
+                self._logger.debug("%s", state.navigation.lazy_render_path(
                     state, path, me.position.z, me.position))
 
                 # There is a path to follow
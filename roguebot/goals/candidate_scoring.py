@@ -0,0 +1,101 @@
+"""
+Scores lots of candidate items or enemies at once, so choosing a target
+in a crowded cave is a few numpy expressions, rather than a loop with a
+path search per candidate.
+
+The scores are the same as SeekItemGoal.score_item and
+AttackEntity.score_enemy would give, except that path lengths come from
+one DistanceMap rather than a separate path search for each candidate.
+"""
+
+import numpy
+from ..navigation.distance_map import DistanceMap
+from ..state.entity import Entity
+from ..state.item import Item
+
+
+def score_items(me: Entity, items: [Item], distance_map: DistanceMap) -> numpy.ndarray:
+    """
+    Scores items in terms of desireability. See SeekItemGoal.score_item
+
+    Parameters:
+        me (Entity): Myself. The weapon I have decides how good other weapons look.
+        items ([Item]): The candidates.
+        distance_map (DistanceMap): Distances from where I am.
+
+    Returns:
+        numpy.ndarray : One score per item. Bigger is better.
+    """
+    count = len(items)
+    edible = numpy.fromiter((item.edible for item in items), dtype=bool, count=count)
+    wearable = numpy.fromiter((item.wearable for item in items), dtype=bool, count=count)
+    wieldable = numpy.fromiter((item.wieldable for item in items), dtype=bool, count=count)
+    damage = numpy.fromiter((item.damage for item in items), dtype=numpy.int64, count=count)
+    steps = distance_map.steps_to_all([item.position for item in items])
+
+    current_damage = 0
+    if me.current_weapon is not None:
+        current_damage = me.current_weapon.damage
+
+    scores = edible * 100 + wearable * 100 + \
+        wieldable * numpy.where(damage > current_damage, 200, 50)
+
+    # A path includes the point we start on, so is one longer than the steps.
+    reachable = steps != DistanceMap.UNREACHABLE
+    distance_term = numpy.where(reachable, 200 - (steps + 1) * 2, -1000)
+    return numpy.where(scores > 0, scores + distance_term, 0)
+
+
+def score_enemies(me: Entity, enemies: [Entity], distance_map: DistanceMap) -> numpy.ndarray:
+    """
+    Scores entities in terms of how much we want to attack them.
+    See AttackEntity.score_enemy
+
+    Parameters:
+        me (Entity): Myself. My name tells us which entities are brother bots.
+        enemies ([Entity]): The candidates.
+        distance_map (DistanceMap): Distances from where I am.
+
+    Returns:
+        numpy.ndarray : One score per entity. Bigger is better.
+    """
+    steps = distance_map.steps_to_all([enemy.position for enemy in enemies])
+    reachable = steps != DistanceMap.UNREACHABLE
+    scores = numpy.where(reachable, 500 - (steps + 1), -5000)
+
+    # Bot names are 'prefix-nnn'. Other instances of our bot share our prefix.
+    my_name_parts = me.name.split('-')
+    if my_name_parts[-1].isnumeric():
+        my_bot_number = int(my_name_parts[-1])
+        my_prefix = my_name_parts[0]
+        count = len(enemies)
+        is_ally = numpy.fromiter(
+            (enemy.name.startswith(my_prefix) for enemy in enemies), dtype=bool, count=count)
+        is_outranked = numpy.fromiter(
+            (_bot_number(enemy.name) is not None and my_bot_number > _bot_number(enemy.name)
+             for enemy in enemies), dtype=bool, count=count)
+        scores = scores - is_ally * 100 - (is_ally & is_outranked) * 20
+
+    return scores
+
+
+def top_k(candidates: list, scores: numpy.ndarray, k: int) -> [(int, object)]:
+    """
+    The k best scoring candidates.
+
+    Returns:
+        [(score, candidate)] : Best first. Equal scores keep the order the
+            candidates were given in.
+    """
+    count = len(candidates)
+    k = min(k, count)
+    if k <= 0:
+        return []
+    # Sort by score, best first, then by position in the candidate list.
+    best = numpy.lexsort((numpy.arange(count), -scores))[:k]
+    return [(int(scores[index]), candidates[index]) for index in best]
+
+
+def _bot_number(name: str) -> int:
+    number_part = name.split('-')[-1]
+    return int(number_part) if number_part.isnumeric() else None
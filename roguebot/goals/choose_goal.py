@@ -3,11 +3,9 @@ from enum import Enum
 from ..navigation.point import Point
 from ..brains.ibrain import IBrain
 from ..brains.item_handling_brain import ItemHandlingBrain
-from ..navigation.path_printer import PathPrinter
 from ..state.entity import Entity
 from ..state.state import State
 from ..action import Action, TakeAction, MoveAction, EatAction, WearAction, WieldAction
-from ..navigation.path import PathFinder
 from ..navigation.direction import Direction
 from ..goals.goal import Goal
 from ..state.item import Item
@@ -1,9 +1,9 @@
 
+import collections
 import random
 import logging
 from ..brains.ibrain import IBrain
 from ..navigation.point import Point
-from ..navigation.path_printer import PathPrinter
 from ..navigation.direction import Direction
 from ..state.entity import Entity, Entities
 from ..state.state import State
@@ -28,17 +28,21 @@ class ExploreGoal(Goal):
         Attributes:
             _turn_count (int): The number of turns this goal has had deciding what to do so far.
                 Starts at 0, goes up to TARGET_EXPLORE_TURN_COUNT
-            _places_visited (dict): The key is a Point, the value us the number of times that point
-                has been visited so far.
+            _places_visited (dict): The key is a dungeon level, the value is an OrderedDict
+                where the key is a Point, and the value is the number of times that point
+                has been visited so far. Least recently visited first.
+            _level_visited_at (dict): The key is a dungeon level, the value is the
+                time, from the state's clock, we were last on that level.
 
         """
         super().__init__()
         self._turn_count = 0
 
-        # A dict of places we have visited.
+        # A dict of places we have visited, for each level of the dungeon.
         # The key is the point, the value is the number of times we've been there.
         # So we can try going somewhere newer if there is a choice.
         self._places_visited = {}
+        self._level_visited_at = {}
 
     def decide_actions(self, me: Entity, state: State, goals: [Goal]) -> [Action]:
         """Move at random, preferrably away from where we have been before.
@@ -56,7 +60,8 @@ class ExploreGoal(Goal):
         actions = super().decide_actions(me, state, goals)
 
         # For debugging, output the map with our bot position marked.
-        self._logger.debug(self._path_printer.render_path(
+        # Only drawn if debug logging is on.
+        self._logger.debug("%s", state.navigation.lazy_render_path(
             state=state,
             only_show_floor=me.position.z,
             me_point=me.position))
@@ -65,7 +70,7 @@ class ExploreGoal(Goal):
                            me.armour_class, me.current_weapon, me.current_armour)
 
         # We have obviously visited this point, as we are here now...
-        self._remember_we_visited_this_point(me.position)
+        self._remember_we_visited_this_point(me.position, state.clock())
 
         # List the places we could move to immediately...
         possible_points = state.dungeon_map.get_neighbour_points(me.position)
@@ -129,7 +134,7 @@ class ExploreGoal(Goal):
 
             # Get the number of times we've visited this point before, or
             # 0 if we've not visited it before.
-            count_visited_before = self._places_visited.get(point, 0)
+            count_visited_before = self._visit_count(point)
 
             score = 1000 - count_visited_before
 
@@ -164,7 +169,7 @@ class ExploreGoal(Goal):
                 points_no_entities.append(point)
         return points_no_entities
 
-    def _remember_we_visited_this_point(self, point: Point) -> None:
+    def _remember_we_visited_this_point(self, point: Point, now: float) -> None:
         """Make a note that we just visited this point.
 
         Makes it slightly less likely that we'll want to visit the point in the future.
@@ -172,8 +177,64 @@ class ExploreGoal(Goal):
         Parameters:
             point (Point): The point we have just visited. 
             Bump the counter of this point up by one.
+            now (float): The time now, from the state's clock.
 
         """
-        visited_count = self._places_visited.get(point, 0)
+        places_on_level = self._places_visited.get(point.z)
+        if places_on_level is None:
+            places_on_level = collections.OrderedDict()
+            self._places_visited[point.z] = places_on_level
+        visited_count = places_on_level.pop(point, 0)
         visited_count += 1
-        self._places_visited[point] = visited_count
+        # Re-adding puts the point at the most recently visited end.
+        places_on_level[point] = visited_count
+        self._level_visited_at[point.z] = now
+
+    def _visit_count(self, point: Point) -> int:
+        """The number of times we've visited a point, or 0 if we never have.
+        """
+        places_on_level = self._places_visited.get(point.z)
+        if places_on_level is None:
+            return 0
+        return places_on_level.get(point, 0)
+
+    @property
+    def retained_size(self) -> int:
+        """The number of points we remember visiting.
+        """
+        return sum(len(places) for places in self._places_visited.values())
+
+    def compact(self, policy, current_floor: int, now: float) -> int:
+        """Forget the places we visited least recently.
+
+        Levels we left long ago are forgotten entirely, as are all but the
+        most recently visited levels. Then on each remaining level, only the
+        most recently visited points are remembered.
+
+        Returns:
+            int : The number of points forgotten.
+        """
+        levels = sorted((self._level_visited_at.get(level, now), level)
+                        for level in self._places_visited.keys()
+                        if level != current_floor)
+        levels_to_keep = policy.max_levels
+        if current_floor in self._places_visited:
+            levels_to_keep -= 1
+        forgotten_levels = [level for (visited_at, level) in levels
+                            if now - visited_at > policy.max_level_age_seconds]
+        recent_levels = [level for (visited_at, level) in levels
+                         if now - visited_at <= policy.max_level_age_seconds]
+        forgotten_levels.extend(
+            recent_levels[:max(len(recent_levels) - max(levels_to_keep, 0), 0)])
+
+        forgotten_count = 0
+        for level in forgotten_levels:
+            forgotten_count += len(self._places_visited.pop(level))
+            self._level_visited_at.pop(level, None)
+
+        for places_on_level in self._places_visited.values():
+            while len(places_on_level) > policy.max_places_per_level:
+                places_on_level.popitem(last=False)
+                forgotten_count += 1
+
+        return forgotten_count
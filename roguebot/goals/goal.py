@@ -8,7 +8,6 @@ import logging
 from ..state.entity import Entity
 from ..state.state import State
 from ..action import Action
-from ..navigation.path_printer import PathPrinter
 
 
 class Goal():
@@ -19,7 +18,8 @@ class Goal():
 
     def __init__(self):
         self._logger = logging.getLogger(__name__)
-        self._path_printer = PathPrinter()
+        self._max_moves_per_turn = 1
+        self._burst_safety = True
 
     def __str__(self):
         """
@@ -36,6 +36,66 @@ class Goal():
         """
         return []
 
+    @property
+    def max_moves_per_turn(self) -> int:
+        """
+        The most move actions this goal should decide on in one turn.
+        Set by the brain before it asks the goal what to do. Minimum 1.
+        """
+        return self._max_moves_per_turn
+
+    @max_moves_per_turn.setter
+    def max_moves_per_turn(self, max_moves: int) -> None:
+        self._max_moves_per_turn = max(int(max_moves), 1)
+
+    @property
+    def burst_safety(self) -> bool:
+        """
+        When making several moves in one turn, stop early at places where
+        something might change our plans. eg: next to other entities.
+        """
+        return self._burst_safety
+
+    @burst_safety.setter
+    def burst_safety(self, is_safe: bool) -> None:
+        self._burst_safety = bool(is_safe)
+
+    def decision_key(self, me: Entity, state: State):
+        """
+        What this goal's next decision depends on, besides where we are, what
+        we carry, the map and where entities are standing.
+
+        The brain can re-use this goal's last decision for as long as all
+        those things, and this key, stay the same.
+
+        Returns:
+            A hashable value, or None if the goal can't have its decisions
+            re-used. eg: because it chooses at random. None by default.
+        """
+        return None
+
+    @property
+    def retained_size(self) -> int:
+        """
+        How many things this goal is remembering, for goals which remember
+        things as they go. eg: places visited.
+        """
+        return 0
+
+    def compact(self, policy, current_floor: int, now: float) -> int:
+        """
+        Forget things this goal remembers, to stay within the retention policy.
+
+        Parameters:
+            policy (RetentionPolicy): The limits to keep within.
+            current_floor (int): The floor we are on, or None if not known.
+            now (float): The time.monotonic() to measure ages from.
+
+        Returns:
+            int : The number of things forgotten.
+        """
+        return 0
+
     def goal_completed(self, goals: list):
         """Remove ourselves from the stack of goals.
         """
@@ -8,7 +8,6 @@ from ..brains.item_handling_brain import ItemHandlingBrain
 from ..state.entity import Entity
 from ..state.state import State
 from ..action import Action, TakeAction, MoveAction, EatAction, WearAction, WieldAction
-from ..navigation.path import PathFinder
 from ..navigation.direction import Direction
 from .goal import Goal
 from ..state.item import Item
@@ -6,11 +6,11 @@ from ..brains.item_handling_brain import ItemHandlingBrain
 from ..state.entity import Entity
 from ..state.state import State
 from ..action import Action, TakeAction, MoveAction, EatAction, WearAction, WieldAction
-from ..navigation.path import PathFinder
 from ..navigation.direction import Direction
 from ..goals.goal import Goal
 from ..state.item import Item
 from ..goals.seek_point_goal import SeekPointGoal
+from . import candidate_scoring
 
 
 class SeekItemGoal(SeekPointGoal):
@@ -22,6 +22,10 @@ class SeekItemGoal(SeekPointGoal):
     def __str__(self):
         return "SeekItemGoal point: {} target-item: {}".format(self._target_point, self._target_item_name)
 
+    def decision_key(self, me: Entity, state: State):
+        """ Whether the item is still there depends on the items we know about. """
+        return (self._target_point, self._target_item_name, state.items.version)
+
     def acquire_target(self, me: Entity, state: State) -> bool:
         """Look at the state and create a seekItemGoal if there is anything
         we really want to go get.
@@ -40,17 +44,19 @@ class SeekItemGoal(SeekPointGoal):
         """
         self._logger.debug("trying to acquire an item as a target...")
 
-        all_known_items = state.items.get_as_list()
+        # Junk items always score zero, so don't bother looking at them.
+        useful_items = state.items.get_useful_items()
+
+        # Score them all at once, using one map of distances from where we are,
+        # rather than a path search for each item.
+        distance_map = state.navigation.distance_map(me.position, state)
+        scores = candidate_scoring.score_items(me, useful_items, distance_map)
 
         selected_item = None
         selected_item_score = 0
-
-        for item in all_known_items:
-            utility_score = self.score_item(me, item, state)
-            if utility_score > selected_item_score:
-                self._logger.debug("Item is best so far.")
-                selected_item = item
-                selected_item_score = utility_score
+        for (utility_score, item) in candidate_scoring.top_k(useful_items, scores, 1):
+            selected_item = item
+            selected_item_score = utility_score
 
         if selected_item_score <= 0 or selected_item is None:
             return False
@@ -102,7 +108,7 @@ class SeekItemGoal(SeekPointGoal):
             self._logger.debug(
                 "Examining %s ... in more detail...", item)
 
-            path = self._path_finder.find_path(from_point, to_point, state)
+            path = state.navigation.find_path(from_point, to_point, state)
             if path is None:
                 self._logger.debug(
                     "Can't find a route to item %s ...", item)
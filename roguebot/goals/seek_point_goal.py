@@ -6,15 +6,10 @@ from ..brains.item_handling_brain import ItemHandlingBrain
 from ..state.entity import Entity
 from ..state.state import State
 from ..action import Action, TakeAction, MoveAction, EatAction, WearAction, WieldAction
-from ..navigation.path import PathFinder
 from ..navigation.direction import Direction
 from ..goals.goal import Goal
 from ..state.item import Item
 from ..goals.advanced_goal import AdvancedGoal
-from ..navigation.path_printer import PathPrinter
-
-
-MAX_MOVES_TO_BURST_SEND_AT_ONCE = 1
 
 
 class SeekPointGoal(AdvancedGoal):
@@ -23,13 +18,16 @@ class SeekPointGoal(AdvancedGoal):
 
     def __init__(self, point=None):
         super().__init__()
-        # Allows us to find routes to points.
-        self._path_finder = PathFinder()
-        self._path_printer = PathPrinter()
 
         # The point we are trying to reach with this goal.
         self._target_point = point
 
+        # The path we planned last turn, so we can carry on along it
+        # without having to find the path again.
+        self._planned_path = None
+        self._planned_on_map = None
+        self._planned_on_map_revision = None
+
     def __str__(self):
         return "SeekPointGoal point:" + str(self._target_point)
 
@@ -40,6 +38,11 @@ class SeekPointGoal(AdvancedGoal):
     @target_point.setter
     def target_point(self, new_point: Point):
         self._target_point = new_point
+        self._planned_path = None
+
+    def decision_key(self, me: Entity, state: State):
+        """ The path we follow only depends on the point we are heading for. """
+        return self._target_point
 
     def decide_actions(self, me: Entity, state: State, goals) -> [Action]:
         """ move towards our target point """
@@ -48,60 +51,112 @@ class SeekPointGoal(AdvancedGoal):
         return actions
 
     def move_towards_point(self, state: State, me: Entity, actions: [Action], goals):
-
         if self._target_point is not None:
             # We have a target location.
             # There is still an item there.
-            # Use a path-finder to find a route to it.
-            path = self._path_finder.find_path(from_point=me.position,
-                                               to_point=self._target_point,
-                                               state=state)
+
+            # Carry on along the path we planned last time if we can.
+            # Otherwise use a path-finder to find a route to it.
+            path = self._continue_planned_path(me, state)
+            if path is None:
+                path = state.navigation.find_path(from_point=me.position,
+                                                  to_point=self._target_point,
+                                                  state=state)
 
             if path is None:
                 # Can't find a path to that point.
                 # Forget it and choose another.
+                self._planned_path = None
                 self.no_path_available(me, state, goals)
 
             else:
-
-                self._logger.debug(self._path_printer.render_path(
+                # Only drawn if debug logging is on.
+                self._logger.debug("%s", state.navigation.lazy_render_path(
                     state, path, me.position.z, me.position))
 
                 # There is a path to follow
                 path.pop(0)  # Ignore our current location.
 
                 # The first hop to our destination is...
-
                 if len(path) > 0:
+                    self._remember_planned_path(state, [me.position] + path)
                     self.move_along_path(state, path, me, actions)
-
                 else:
                     # We reached our destination
                     # Select another one.
+                    self._planned_path = None
                     self.destination_reached(goals)
 
-    def move_along_path(self, state: State, path: [Point], me: Entity, actions: [Action]):
+    def _remember_planned_path(self, state: State, planned_path: [Point]) -> None:
+        self._planned_path = planned_path
+        self._planned_on_map = state.dungeon_map
+        self._planned_on_map_revision = state.dungeon_map.revision
+
+    def _continue_planned_path(self, me: Entity, state: State) -> [Point]:
         """
-        Enqueue a number of 'move' commands on the action list from our chosen path.
+        The rest of the path we planned last time, from where we are now,
+        if we are still on it, the map hasn't changed, and nobody has stepped
+        onto it since. Otherwise None.
         """
-        from_point = me.position
+        planned_path = self._planned_path
+        if planned_path is None or \
+                self._planned_on_map is not state.dungeon_map or \
+                self._planned_on_map_revision != state.dungeon_map.revision:
+            return None
+        try:
+            where_we_are = planned_path.index(me.position)
+        except ValueError:
+            # We've wandered off the path. Or been pushed.
+            return None
+
+        path = planned_path[where_we_are:]
+        # The destination itself is allowed to have something on it.
+        for point in path[1:-1]:
+            if len(state.entities.get_by_position(point)) > 0:
+                return None
+        return path
+
+    def move_along_path(self, state: State, path: [Point], me: Entity, actions: [Action]) -> Point:
+        """
+        Enqueue a number of 'move' commands on the action list from our chosen path.
 
-        moves_to_enqueue = MAX_MOVES_TO_BURST_SEND_AT_ONCE
+        Up to max_moves_per_turn moves are made along the path. With burst
+        safety on, we stop early after stepping onto stairs, or next to
+        another entity, as we may want to change our plans when we get there.
 
+        Returns:
+            Point : Where we will be once the moves have been made.
+        """
+        from_point = me.position
+        moves_to_enqueue = self.max_moves_per_turn
         while moves_to_enqueue > 0 and len(path) > 0:
             moves_to_enqueue -= 1
-
             next_step_point = path.pop(0)
             # "Aiming move at {} from {}".format(next_step_point, me.position))
-
             direction = from_point.direction_of(
                 next_step_point)
-
             move_action = MoveAction(direction)
             actions.append(move_action)
-
             from_point = next_step_point
 
+            if self.burst_safety and self._is_place_to_pause(state, me, next_step_point):
+                break
+        return from_point
+
+    def _is_place_to_pause(self, state: State, me: Entity, point: Point) -> bool:
+        """
+        Is this point somewhere a burst of moves should stop ?
+        Stairs, or anywhere next to an entity which isn't us.
+        """
+        cell = state.dungeon_map.get_cell(point)
+        if cell is not None and cell.char in ('<', '>'):
+            return True
+        for nearby_point in [point] + point.neighbours_same_level:
+            for entity in state.entities.get_by_position(nearby_point):
+                if entity.entity_id != me.entity_id:
+                    return True
+        return False
+
     def destination_reached(self, goals):
         self._logger.debug(
             "Destination reached. %s", self._target_point)
@@ -26,6 +26,10 @@ class BotHttpServer():
         /       : Gives the status.
         /status : Gives the status.
 
+    The bot can be anything with is_ready and status_summary,
+    such as a whole Fleet of bots. Both are read on the server's thread,
+    so is_ready mustn't look at the live state. A Bot uses the last
+    snapshot it published.
     """
 
     def __init__(self, address: str = "127.0.0.1", port: int = 9088, bot=None):
@@ -156,7 +160,7 @@ class HTTPRequestHandler(BaseHTTPRequestHandler):
         is_ready = False
 
         if bot is not None:
-            is_ready = self.server.bot.got_enough_state_to_start()
+            is_ready = self.server.bot.is_ready
 
         if self.path == "/":
             self._complete_request(self._get_simple_status(is_ready))
@@ -43,6 +43,25 @@ class IEntityClient(ABC):
     async def wield_item(self, item_name: str):
         """ Tells the server to wield something from inventory """
 
+    async def submit_actions(self, actions: list):
+        """ Sends some actions to the server, in order.
+        By default each is sent before this returns.
+        """
+        for action in actions:
+            await action.do_action(self)
+
+    def add_move_listener(self, listener) -> None:
+        """ Asks to be told how our moves fare, by calling
+        listener.observe_move_rtt(seconds) when the server confirms a move
+        and listener.observe_moves_lost(count) when it doesn't do some.
+        Nobody is told by default.
+        """
+
+    @property
+    def status_summary(self) -> dict:
+        """ A summary of how the comms are going. Empty by default. """
+        return {}
+
     @property
     def state(self) -> State:
         """ Holds the state for other parts of the system to get"""
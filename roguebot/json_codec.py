@@ -0,0 +1,211 @@
+"""
+Turns socket.io packets into python objects and back, using the fastest
+json library which is installed.
+
+Run it to see how much faster each library is, on events recorded by the
+wire tracer, or on made up events if no trace file is given:
+
+    python -m roguebot.json_codec [wire-trace-file ...]
+
+Only events whose whole payload was recorded can be used, so trace with
+K_AND_K_BOT_WIRE_TRACE_PAYLOAD_BYTES set bigger than the biggest map.
+"""
+
+import json
+import logging
+import sys
+import time
+
+
+class JsonCodec:
+    """
+    Something socket.io can use in place of the json module.
+
+    python-socketio and python-engineio only ever call
+    `dumps(data, separators=...)` and `loads(text)`, and expect
+    `dumps` to return a str.
+    """
+
+    name = "json"
+
+    def dumps(self, data, **kwargs) -> str:
+        return json.dumps(data, **kwargs)
+
+    def loads(self, text):
+        return json.loads(text)
+
+    def __str__(self):
+        return self.name
+
+
+class OrjsonCodec(JsonCodec):
+    """ Uses orjson, which is written in rust. """
+
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+        self._options = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, data, **kwargs) -> str:
+        # orjson always writes compact json, so separators aren't needed.
+        return self._orjson.dumps(data, option=self._options).decode('utf-8')
+
+    def loads(self, text):
+        return self._orjson.loads(text)
+
+
+class UjsonCodec(JsonCodec):
+    """ Uses ujson, which is written in C. """
+
+    name = "ujson"
+
+    def __init__(self):
+        import ujson
+        self._ujson = ujson
+
+    def dumps(self, data, **kwargs) -> str:
+        return self._ujson.dumps(data, ensure_ascii=False)
+
+    def loads(self, text):
+        return self._ujson.loads(text)
+
+
+# Fastest first.
+CODECS = {
+    OrjsonCodec.name: OrjsonCodec,
+    UjsonCodec.name: UjsonCodec,
+    JsonCodec.name: JsonCodec
+}
+
+AUTO = "auto"
+
+
+def available_codecs() -> [JsonCodec]:
+    """
+    Returns:
+        [JsonCodec] : A codec for each json library which is installed,
+            fastest first. The standard json module is always there.
+    """
+    codecs = []
+    for codec_class in CODECS.values():
+        try:
+            codecs.append(codec_class())
+        except ImportError:
+            pass
+    return codecs
+
+
+def create_json_codec(name: str = AUTO) -> JsonCodec:
+    """
+    Parameters:
+        name (str): "auto" picks the fastest json library installed.
+            "orjson", "ujson" or "json" asks for that one. If it isn't
+            installed, the fastest one which is gets used instead.
+
+    Returns:
+        JsonCodec : The codec to use.
+    """
+    logger = logging.getLogger(__name__)
+    if name != AUTO:
+        codec_class = CODECS.get(name, None)
+        if codec_class is None:
+            logger.warning("Unknown json codec %s. Picking one instead.", name)
+        else:
+            try:
+                return codec_class()
+            except ImportError:
+                logger.warning("json codec %s is not installed. Picking one instead.",
+                               name)
+    codec = available_codecs()[0]
+    logger.debug("Using the %s json codec", codec.name)
+    return codec
+
+
+def read_trace_payloads(file_path: str) -> [str]:
+    """
+    Reads the payloads of events from a wire trace file, as json text.
+    Payloads which were cut short when they were recorded are left out.
+
+    Returns:
+        [str] : The payloads.
+    """
+    payloads = []
+    with open(file_path, encoding='utf-8') as trace_file:
+        for line in trace_file:
+            record = json.loads(line)
+            sample = record.get("sample", None)
+            if sample is not None and len(sample) == record["size"]:
+                payloads.append(sample)
+    return payloads
+
+
+def made_up_payloads(width: int = 200, height: int = 100, entity_count: int = 200) -> [str]:
+    """
+    Makes up a map event for a big cave, and an entities event for a crowd,
+    in the same shape as the server sends them.
+
+    Returns:
+        [str] : The payloads, as json text.
+    """
+    wall = {'char': '#', 'foreground': 'goldenrod', 'background': 'black',
+            'walkable': False, 'diggable': True, 'blocksLight': True,
+            'gateway': False, 'description': 'A cave wall'}
+    floor = {'char': '.', 'foreground': 'white', 'background': 'black',
+             'walkable': True, 'diggable': False, 'blocksLight': False,
+             'gateway': False, 'description': 'A cave floor'}
+    tiles = [[[dict(wall if (x * y) % 3 == 0 else floor) for y in range(height)]
+              for x in range(width)]]
+    map_data = {'width': width, 'height': height, 'depth': 1, 'tiles': tiles,
+                'entrance': {'x': 1, 'y': 1, 'z': 0}}
+
+    dagger = {'name': 'dagger', 'type': 'weapon', 'attackValue': 5, 'defenseValue': 0}
+    entities = [{'char': 'r', 'name': 'rat', 'id': 'rat-{}'.format(index),
+                 'pos': {'x': index % width, 'y': index // width, 'z': 0},
+                 'alive': True, 'hunger': 0, 'hp': 10, 'ac': 10,
+                 'inventory': [dagger], 'currentWeapon': dagger}
+                for index in range(entity_count)]
+    return [json.dumps(map_data, separators=(',', ':')),
+            json.dumps(entities, separators=(',', ':'))]
+
+
+def benchmark(payloads: [str], codecs: [JsonCodec], repeat: int = 5) -> dict:
+    """
+    Times how long each codec takes to decode all the payloads.
+
+    Returns:
+        dict : codec name -> the fastest time to decode them all, in seconds.
+    """
+    seconds = {}
+    for codec in codecs:
+        best = None
+        for _ in range(repeat):
+            started_at = time.perf_counter()
+            for payload in payloads:
+                codec.loads(payload)
+            taken = time.perf_counter() - started_at
+            if best is None or taken < best:
+                best = taken
+        seconds[codec.name] = best
+    return seconds
+
+
+def main(file_paths: [str]) -> None:
+    payloads = []
+    for file_path in file_paths:
+        payloads.extend(read_trace_payloads(file_path))
+    if len(payloads) == 0:
+        print("No whole payloads recorded. Using a made up map and entities.")
+        payloads = made_up_payloads()
+
+    total_bytes = sum(len(payload) for payload in payloads)
+    print("Decoding {} payloads, {} bytes in all.".format(len(payloads), total_bytes))
+    seconds = benchmark(payloads, available_codecs())
+    baseline = seconds[JsonCodec.name]
+    for (name, taken) in seconds.items():
+        print("{:8} {:9.6f}s {:5.1f}x".format(name, taken, baseline / taken))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
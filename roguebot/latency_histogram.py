@@ -0,0 +1,123 @@
+"""
+A histogram of latencies, in the style of an HDR histogram.
+"""
+
+import math
+
+
+class LatencyHistogram:
+    """
+    Counts latencies in buckets which get wider as latencies get longer,
+    so every latency is held to within a few percent, whatever its size,
+    in a fixed amount of memory.
+
+    Each power of two (from lowest_seconds up to highest_seconds) is split
+    into sub_bucket_count equal buckets. With 16 sub-buckets, a latency is
+    held to within 1/16th (about 6%) of its value. Longer latencies than
+    highest_seconds are counted in the last bucket. The true minimum and
+    maximum are remembered as well.
+    """
+
+    DEFAULT_LOWEST_SECONDS = 1e-6
+    DEFAULT_HIGHEST_SECONDS = 3600.0
+    DEFAULT_SUB_BUCKET_COUNT = 16
+
+    def __init__(self,
+                 lowest_seconds: float = DEFAULT_LOWEST_SECONDS,
+                 highest_seconds: float = DEFAULT_HIGHEST_SECONDS,
+                 sub_bucket_count: int = DEFAULT_SUB_BUCKET_COUNT):
+        self._lowest_seconds = lowest_seconds
+        self._sub_bucket_count = max(sub_bucket_count, 1)
+        self._magnitude_count = math.ceil(
+            math.log2(highest_seconds / lowest_seconds)) + 1
+        self._counts = [0] * (self._magnitude_count * self._sub_bucket_count)
+        self._count = 0
+        self._total_seconds = 0.0
+        self._min_seconds = None
+        self._max_seconds = None
+
+    def _index_of(self, seconds: float) -> int:
+        units = max(seconds / self._lowest_seconds, 1.0)
+        (mantissa, exponent) = math.frexp(units)
+        # units = mantissa * 2**exponent, with mantissa in [0.5, 1)
+        magnitude = exponent - 1
+        if magnitude >= self._magnitude_count:
+            return len(self._counts) - 1
+        sub_bucket = int((mantissa * 2 - 1) * self._sub_bucket_count)
+        return magnitude * self._sub_bucket_count + min(sub_bucket, self._sub_bucket_count - 1)
+
+    def _highest_in_bucket(self, index: int) -> float:
+        (magnitude, sub_bucket) = divmod(index, self._sub_bucket_count)
+        return self._lowest_seconds * (2 ** magnitude) * \
+            (1 + (sub_bucket + 1) / self._sub_bucket_count)
+
+    def record(self, seconds: float) -> None:
+        """ Counts one latency. """
+        self._counts[self._index_of(seconds)] += 1
+        self._count += 1
+        self._total_seconds += seconds
+        if self._min_seconds is None or seconds < self._min_seconds:
+            self._min_seconds = seconds
+        if self._max_seconds is None or seconds > self._max_seconds:
+            self._max_seconds = seconds
+
+    def clear(self) -> None:
+        self._counts = [0] * len(self._counts)
+        self._count = 0
+        self._total_seconds = 0.0
+        self._min_seconds = None
+        self._max_seconds = None
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def min_seconds(self) -> float:
+        return self._min_seconds
+
+    @property
+    def max_seconds(self) -> float:
+        return self._max_seconds
+
+    @property
+    def mean_seconds(self) -> float:
+        if self._count == 0:
+            return None
+        return self._total_seconds / self._count
+
+    def percentile(self, percent: float) -> float:
+        """
+        Parameters:
+            percent (float): 0-100
+
+        Returns:
+            float : The latency which percent of the latencies are no longer than,
+                or None if nothing has been recorded.
+        """
+        if self._count == 0:
+            return None
+        wanted = max(math.ceil(self._count * percent / 100.0), 1)
+        seen = 0
+        for (index, bucket_count) in enumerate(self._counts):
+            seen += bucket_count
+            if seen >= wanted:
+                if index == len(self._counts) - 1:
+                    # The last bucket holds everything too long to bucket.
+                    return self._max_seconds
+                return min(max(self._highest_in_bucket(index), self._min_seconds),
+                           self._max_seconds)
+        return self._max_seconds
+
+    def summary(self) -> dict:
+        def rounded(seconds):
+            return None if seconds is None else round(seconds, 6)
+        return {
+            "count": self._count,
+            "min": rounded(self._min_seconds),
+            "mean": rounded(self.mean_seconds),
+            "p50": rounded(self.percentile(50)),
+            "p90": rounded(self.percentile(90)),
+            "p99": rounded(self.percentile(99)),
+            "max": rounded(self._max_seconds)
+        }
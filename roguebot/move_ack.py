@@ -0,0 +1,184 @@
+"""
+Matches the moves we send with the server telling us where we are, so we
+know how long moves take, and which ones go missing.
+"""
+
+import collections
+import logging
+import time
+from .latency_histogram import LatencyHistogram
+from .navigation.direction import Direction
+from .navigation.point import Point
+
+
+class MoveAckTracker:
+    """
+    Tags each move sent with a sequence number and the point we expect it to
+    take us to, then waits for the server to say we are there.
+
+    The server does moves in the order they are sent, so when a position
+    arrives for us:
+
+    - The oldest move waiting which expected us at that point is acknowledged,
+      and the time it took is recorded.
+    - Moves sent before it which are still waiting weren't done. eg: we
+      bumped into a wall or another entity. They are counted as rejected.
+    - If no move was expecting that point, the position is counted as unmatched.
+      eg: we were moved by something else.
+
+    Moves not acknowledged within timeout_seconds are counted as lost.
+
+    Listeners are told how long each acknowledged move took, and how many
+    moves were rejected or lost.
+    """
+
+    DEFAULT_TIMEOUT_SECONDS = 2.0
+
+    def __init__(self, timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS,
+                 clock=time.monotonic):
+        """
+        Parameters:
+            timeout_seconds (float): How long to wait for a move to be
+                acknowledged before counting it as lost.
+            clock : Gives the time in seconds. Defaults to time.monotonic
+        """
+        self._logger = logging.getLogger(__name__)
+        self._timeout_seconds = timeout_seconds
+        self._clock = clock
+
+        # (sequence number, expected point, time sent), oldest first.
+        self._waiting = collections.deque()
+        self._next_sequence_number = 0
+        self._listeners = []
+
+        self._rtt_histogram = LatencyHistogram()
+        self._sent_count = 0
+        self._acknowledged_count = 0
+        self._rejected_count = 0
+        self._lost_count = 0
+        self._unmatched_count = 0
+
+    @property
+    def rtt_histogram(self) -> LatencyHistogram:
+        return self._rtt_histogram
+
+    @property
+    def sent_count(self) -> int:
+        return self._sent_count
+
+    @property
+    def acknowledged_count(self) -> int:
+        return self._acknowledged_count
+
+    @property
+    def rejected_count(self) -> int:
+        return self._rejected_count
+
+    @property
+    def lost_count(self) -> int:
+        return self._lost_count
+
+    @property
+    def unmatched_count(self) -> int:
+        return self._unmatched_count
+
+    @property
+    def waiting_count(self) -> int:
+        return len(self._waiting)
+
+    def add_listener(self, listener) -> None:
+        """
+        Parameters:
+            listener : Has observe_move_rtt(seconds) and observe_moves_lost(count)
+                methods, which are called as moves are acknowledged or lost.
+        """
+        self._listeners.append(listener)
+
+    def clear(self) -> None:
+        """
+        Stops waiting for any moves. eg: because we are in a new cave.
+        """
+        self._waiting.clear()
+
+    def move_sent(self, from_point: Point, direction: Direction) -> int:
+        """
+        A move has been sent.
+
+        Parameters:
+            from_point (Point): Where we expect to be when the server does the move.
+            direction (Direction): The direction of the move.
+
+        Returns:
+            int : The sequence number the move was tagged with.
+        """
+        sequence_number = self._next_sequence_number
+        self._next_sequence_number += 1
+        self._sent_count += 1
+        expected_point = None
+        if from_point is not None:
+            expected_point = from_point.get_neighbour(direction)
+        self._waiting.append((sequence_number, expected_point, self._clock()))
+        return sequence_number
+
+    def position_received(self, point: Point) -> int:
+        """
+        The server says we are at a point.
+
+        Returns:
+            int : The sequence number of the move acknowledged, or None.
+        """
+        self.expire()
+        matched_index = None
+        for (index, (_, expected_point, _)) in enumerate(self._waiting):
+            if expected_point == point:
+                matched_index = index
+                break
+
+        if matched_index is None:
+            self._unmatched_count += 1
+            return None
+
+        rejected = matched_index
+        for _ in range(rejected):
+            self._waiting.popleft()
+        (sequence_number, _, sent_at) = self._waiting.popleft()
+        rtt_seconds = self._clock() - sent_at
+
+        self._acknowledged_count += 1
+        self._rtt_histogram.record(rtt_seconds)
+        self._rejected_count += rejected
+        for listener in self._listeners:
+            if rejected > 0:
+                listener.observe_moves_lost(rejected)
+            listener.observe_move_rtt(rtt_seconds)
+        return sequence_number
+
+    def expire(self) -> int:
+        """
+        Gives up on moves which have waited too long.
+
+        Returns:
+            int : The number of moves given up on.
+        """
+        now = self._clock()
+        lost = 0
+        while len(self._waiting) > 0 and now - self._waiting[0][2] > self._timeout_seconds:
+            self._waiting.popleft()
+            lost += 1
+        if lost > 0:
+            self._lost_count += lost
+            self._logger.debug("%s moves were never acknowledged", lost)
+            for listener in self._listeners:
+                listener.observe_moves_lost(lost)
+        return lost
+
+    def summary(self) -> dict:
+        return {
+            "sent": self._sent_count,
+            "acknowledged": self._acknowledged_count,
+            "rejected": self._rejected_count,
+            "lost": self._lost_count,
+            "unmatched": self._unmatched_count,
+            "waiting": len(self._waiting),
+            "rtt_seconds": self._rtt_histogram.summary()
+        }
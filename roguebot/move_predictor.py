@@ -0,0 +1,187 @@
+"""
+Moves the bot in its own state as soon as a move is sent, rather than
+waiting for the server to say where it is.
+"""
+
+import collections
+import logging
+import time
+from .navigation.direction import Direction
+from .navigation.point import Point
+from .state.state import State
+
+
+class MovePredictor:
+    """
+    Predicts where the bot will be after each move it sends, and puts it
+    there in the state straight away. So the brain plans from where the bot
+    will be, not from where it was before its last few moves.
+
+    When the server says where the bot is, the predictions are checked:
+
+    - If the server has the bot where one of the predictions put it,
+      that prediction and those before it are confirmed, and the bot is
+      put back where the latest prediction says.
+    - If the server still has the bot where it was before the moves
+      being waited on, nothing is known yet, unless the oldest of those
+      moves was sent more than timeout_seconds ago. Then the moves are
+      assumed lost, and the server is believed.
+    - Otherwise the prediction was wrong. The server is believed, and the
+      correction is counted.
+
+    A move is only predicted if the map says it can be made, and nobody
+    is standing in the way. Otherwise the server is left to say what happened.
+    """
+
+    DEFAULT_TIMEOUT_SECONDS = 2.0
+    DEFAULT_MAX_OUTSTANDING = 16
+
+    def __init__(self, timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS,
+                 max_outstanding: int = DEFAULT_MAX_OUTSTANDING,
+                 clock=time.monotonic):
+        """
+        Parameters:
+            timeout_seconds (float): How long to wait for the server to
+                confirm a move before giving up on it.
+            max_outstanding (int): The most moves predicted ahead of the
+                server. Moves sent after that aren't predicted.
+            clock : Gives the time in seconds. Defaults to time.monotonic
+        """
+        self._logger = logging.getLogger(__name__)
+        self._timeout_seconds = timeout_seconds
+        self._max_outstanding = max(max_outstanding, 1)
+        self._clock = clock
+
+        # (predicted point, time the move was sent), oldest first.
+        self._outstanding = collections.deque()
+        # Where the server last told us we were.
+        self._confirmed_position = None
+
+        self._predicted_count = 0
+        self._unpredicted_count = 0
+        self._confirmed_count = 0
+        self._corrected_count = 0
+        self._expired_count = 0
+
+    @property
+    def outstanding_count(self) -> int:
+        return len(self._outstanding)
+
+    @property
+    def predicted_count(self) -> int:
+        return self._predicted_count
+
+    @property
+    def confirmed_count(self) -> int:
+        return self._confirmed_count
+
+    @property
+    def corrected_count(self) -> int:
+        return self._corrected_count
+
+    @property
+    def expired_count(self) -> int:
+        return self._expired_count
+
+    def clear(self) -> None:
+        """
+        Forgets all predictions. eg: because we are in a new cave.
+        """
+        self._outstanding.clear()
+        self._confirmed_position = None
+
+    def predict(self, state: State, direction: Direction) -> Point:
+        """
+        A move has been sent. Moves the bot in the state to where it
+        should end up, if we can tell.
+
+        Returns:
+            Point : Where the bot is predicted to be, or None if the
+                move wasn't predicted.
+        """
+        me = state.find_my_entity()
+        if me is None or state.dungeon_map is None \
+                or len(self._outstanding) >= self._max_outstanding:
+            self._unpredicted_count += 1
+            return None
+
+        target = me.position.get_neighbour(direction)
+        if target is None \
+                or target not in state.dungeon_map.get_neighbour_points(me.position) \
+                or len(state.entities.get_by_position(target)) > 0:
+            self._unpredicted_count += 1
+            return None
+
+        if len(self._outstanding) == 0:
+            self._confirmed_position = me.position
+        self._outstanding.append((target, self._clock()))
+        self._predicted_count += 1
+        state.update_position(me.entity_id, target)
+        return target
+
+    def reconcile(self, state: State, server_position: Point) -> None:
+        """
+        Checks the predictions against where the server says we are,
+        once the server's news has been applied to the state.
+
+        Parameters:
+            state (State): The state, with the server's news applied.
+            server_position (Point): Where the server says the bot is now,
+                or None if the server hasn't said.
+        """
+        if len(self._outstanding) == 0:
+            if server_position is not None:
+                self._confirmed_position = server_position
+            return
+
+        me = state.find_my_entity()
+        if me is None:
+            # We're not there any more.
+            self.clear()
+            return
+
+        if server_position is not None and server_position != self._confirmed_position:
+            confirmed_up_to = None
+            for (index, (point, _)) in enumerate(self._outstanding):
+                if point == server_position:
+                    confirmed_up_to = index
+                    break
+
+            self._confirmed_position = server_position
+            if confirmed_up_to is None:
+                self._corrected_count += 1
+                self._logger.debug("Predicted %s but the server says %s",
+                                   self._outstanding[-1][0], server_position)
+                self._outstanding.clear()
+                self._move_to(state, me, server_position)
+                return
+
+            for _ in range(confirmed_up_to + 1):
+                self._outstanding.popleft()
+            self._confirmed_count += confirmed_up_to + 1
+
+        if len(self._outstanding) > 0:
+            (_, oldest_sent_at) = self._outstanding[0]
+            if self._clock() - oldest_sent_at > self._timeout_seconds:
+                self._expired_count += len(self._outstanding)
+                self._outstanding.clear()
+
+        if len(self._outstanding) > 0:
+            # Put us back where we expect to be.
+            self._move_to(state, me, self._outstanding[-1][0])
+        elif self._confirmed_position is not None:
+            self._move_to(state, me, self._confirmed_position)
+
+    def _move_to(self, state: State, me, point: Point) -> None:
+        if me.position != point:
+            state.update_position(me.entity_id, point)
+
+    def summary(self) -> dict:
+        return {
+            "predicted": self._predicted_count,
+            "not_predicted": self._unpredicted_count,
+            "confirmed": self._confirmed_count,
+            "corrected": self._corrected_count,
+            "expired": self._expired_count,
+            "outstanding": len(self._outstanding)
+        }
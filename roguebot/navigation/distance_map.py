@@ -0,0 +1,97 @@
+"""
+How many steps it takes to walk from one point to every other point.
+"""
+
+import collections
+import numpy
+from .point import Point
+
+
+class DistanceMap():
+    """
+    The number of steps from a start point to every point in the dungeon,
+    worked out with one breadth-first search.
+
+    The same rules as the PathFinder are used: we can't walk through
+    entities or gateways, but we can walk onto one if it is where we are
+    going. So every point gets a distance, even points with entities on
+    them, as long as we can get next to them.
+
+    Looking up many distances at once is a single numpy indexing operation.
+    """
+
+    UNREACHABLE = -1
+
+    def __init__(self, start: Point, state):
+        """
+        Parameters:
+            start (Point): Where all the distances are measured from.
+            state (State): The map, and the entities which block the way.
+        """
+        self._start = start
+        dungeon_map = state.dungeon_map
+        self._shape = (dungeon_map.depth, dungeon_map.height, dungeon_map.width)
+        self._steps = numpy.full(self._shape, DistanceMap.UNREACHABLE,
+                                 dtype=numpy.int32)
+        if self._is_inside(start):
+            self._search(start, state)
+
+    @property
+    def start(self) -> Point:
+        return self._start
+
+    def _is_inside(self, point: Point) -> bool:
+        (depth, height, width) = self._shape
+        return 0 <= point.z < depth and 0 <= point.y < height and 0 <= point.x < width
+
+    def _search(self, start: Point, state) -> None:
+        dungeon_map = state.dungeon_map
+        entities = state.entities
+        gateway_points = set(dungeon_map.gateway_points)
+        steps = self._steps
+
+        steps[start.z, start.y, start.x] = 0
+        frontier = collections.deque([start])
+        while len(frontier) > 0:
+            current = frontier.popleft()
+            next_steps = steps[current.z, current.y, current.x] + 1
+            for neighbour in dungeon_map.get_neighbour_points(current):
+                if not self._is_inside(neighbour) or \
+                        steps[neighbour.z, neighbour.y, neighbour.x] != DistanceMap.UNREACHABLE:
+                    continue
+                steps[neighbour.z, neighbour.y, neighbour.x] = next_steps
+
+                # We can stop on a blocked point, but not walk through it.
+                if neighbour in gateway_points or \
+                        len(entities.get_by_position(neighbour)) > 0:
+                    continue
+                frontier.append(neighbour)
+
+    def steps_to(self, point: Point) -> int:
+        """
+        The number of steps to a point, or None if it can't be reached.
+        """
+        if not self._is_inside(point):
+            return None
+        steps = int(self._steps[point.z, point.y, point.x])
+        return None if steps == DistanceMap.UNREACHABLE else steps
+
+    def steps_to_all(self, points: [Point]) -> numpy.ndarray:
+        """
+        The number of steps to each of a list of points.
+
+        Returns:
+            numpy.ndarray : One entry per point. UNREACHABLE (-1) for points
+                which can't be reached, or are outside the dungeon.
+        """
+        count = len(points)
+        xs = numpy.fromiter((point.x for point in points), dtype=numpy.intp, count=count)
+        ys = numpy.fromiter((point.y for point in points), dtype=numpy.intp, count=count)
+        zs = numpy.fromiter((point.z for point in points), dtype=numpy.intp, count=count)
+        (depth, height, width) = self._shape
+        inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height) & \
+            (zs >= 0) & (zs < depth)
+
+        result = numpy.full(count, DistanceMap.UNREACHABLE, dtype=numpy.int32)
+        result[inside] = self._steps[zs[inside], ys[inside], xs[inside]]
+        return result
@@ -0,0 +1,178 @@
+"""
+One place per State where path-finding and map rendering live, so goals
+can borrow them rather than each creating their own.
+"""
+
+import collections
+from .point import Point
+from .path import PathFinder
+from .path_printer import PathPrinter
+from .distance_map import DistanceMap
+
+
+class NavigationService():
+    """
+    Owns the path-finder, the path printer, a cache of recently found paths
+    and the distance map from where we last asked for one.
+
+    Goals come and go many times a minute, but the State (and so this
+    service) lives for as long as the bot is in the same game, so anything
+    cached here survives goal turnover.
+
+    Found paths and distances are only re-used while the map is the same
+    one. Entities block paths, and move about almost every tick, so when
+    any have moved a remembered path is only re-used if nothing is now
+    standing on it. It may no longer be the shortest, if something moved
+    out of the way of a shorter one, but it still gets there. Distances,
+    and finding there is no path at all, are worked out again.
+    """
+
+    DEFAULT_PATH_CACHE_SIZE = 128
+
+    def __init__(self, path_cache_size: int = DEFAULT_PATH_CACHE_SIZE):
+        """
+        Parameters:
+            path_cache_size (int): The most paths to remember. 0 turns the
+                cache off.
+        """
+        self._path_finder = PathFinder()
+        self._path_printer = PathPrinter()
+
+        self._path_cache_size = max(int(path_cache_size), 0)
+        # (from_point, to_point) -> (path, the entities version it was last
+        # known to be clear at), least recently used first.
+        self._path_cache = collections.OrderedDict()
+        # What the paths in the cache were found against.
+        self._cached_map = None
+        self._cached_entities = None
+        self._cached_entities_version = None
+        self._distance_map = None
+
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+    @property
+    def path_finder(self) -> PathFinder:
+        return self._path_finder
+
+    @property
+    def path_printer(self) -> PathPrinter:
+        return self._path_printer
+
+    @property
+    def cache_hits(self) -> int:
+        return self._cache_hits
+
+    @property
+    def cache_misses(self) -> int:
+        return self._cache_misses
+
+    def find_path(self, from_point: Point, to_point: Point, state) -> [Point]:
+        """
+        Finds a path between two points. See PathFinder.find_path
+
+        Returns:
+            ([Point]) : A list of points, from from_point to to_point, or None
+                if there is no way between them. The list is the caller's to
+                change as it likes.
+        """
+        if self._path_cache_size == 0:
+            return self._path_finder.find_path(from_point, to_point, state)
+
+        self._forget_paths_if_stale(state)
+
+        key = (from_point, to_point)
+        cached = self._still_clear(key, state.entities)
+        if cached is not None:
+            self._cache_hits += 1
+            path = cached[0]
+        else:
+            self._cache_misses += 1
+            path = self._path_finder.find_path(from_point, to_point, state)
+            self._path_cache[key] = (path, state.entities.version)
+            if len(self._path_cache) > self._path_cache_size:
+                self._path_cache.popitem(last=False)
+
+        if path is None:
+            return None
+        return list(path)
+
+    def distance_map(self, start: Point, state) -> DistanceMap:
+        """
+        The number of steps from the start point to everywhere else.
+        See DistanceMap
+
+        Worked out once, and then shared until we move, something else
+        moves, or the map changes.
+        """
+        self._forget_paths_if_stale(state)
+        if self._distance_map is None or self._distance_map.start != start:
+            self._distance_map = DistanceMap(start, state)
+        return self._distance_map
+
+    def render_path(self, state, path: [Point] = None,
+                    only_show_floor: int = None,
+                    me_point: Point = None) -> str:
+        """
+        Draws the map with a path on it. See PathPrinter.render_path
+        """
+        return self._path_printer.render_path(state, path, only_show_floor, me_point)
+
+    def lazy_render_path(self, state, path: [Point] = None,
+                         only_show_floor: int = None,
+                         me_point: Point = None):
+        """
+        A rendering of the map which is only drawn if it is logged.
+        See PathPrinter.lazy_render_path
+        """
+        return self._path_printer.lazy_render_path(state, path, only_show_floor, me_point)
+
+    def clear(self) -> None:
+        """
+        Forget all the paths and distances we remember.
+        """
+        self._path_cache.clear()
+        self._distance_map = None
+        self._cached_map = None
+        self._cached_entities = None
+        self._cached_entities_version = None
+
+    def _still_clear(self, key, entities) -> tuple:
+        """
+        The remembered (path, entities version) for key, if there is one and
+        nothing is standing on the path. One which is no longer clear is
+        forgotten, as is a remembered None once anything has moved.
+        """
+        cached = self._path_cache.get(key, None)
+        if cached is None:
+            return None
+        (path, clear_at_version) = cached
+        if clear_at_version != entities.version:
+            if path is None or not NavigationService._is_clear(path, entities):
+                del self._path_cache[key]
+                return None
+            cached = (path, entities.version)
+            self._path_cache[key] = cached
+        self._path_cache.move_to_end(key)
+        return cached
+
+    @staticmethod
+    def _is_clear(path: [Point], entities) -> bool:
+        # As with the path finder, where we start and where we are going
+        # may have entities on them.
+        for point in path[1:-1]:
+            if len(entities.get_by_position(point)) > 0:
+                return False
+        return True
+
+    def _forget_paths_if_stale(self, state) -> None:
+        entities = state.entities
+        if self._cached_map is not state.dungeon_map or \
+                self._cached_entities is not entities:
+            self._path_cache.clear()
+            self._distance_map = None
+        elif self._cached_entities_version != entities.version:
+            self._distance_map = None
+        self._cached_map = state.dungeon_map
+        self._cached_entities = entities
+        self._cached_entities_version = entities.version
@@ -12,6 +12,11 @@ from ..state.state import State
 
 # logging.basicConfig(level=logging.DEBUG)
 
+# Path-finding is very chatty, so only say important things.
+_logger = logging.getLogger(__name__)
+_logger.setLevel(level=logging.INFO)
+
+
 class PathFinder():
     """
     Something which finds paths between points.
@@ -38,8 +43,7 @@ class PathFinder():
     """
 
     def __init__(self):
-        self._logger = logging.getLogger(__name__)
-        self._logger.setLevel(level=logging.INFO)
+        self._logger = _logger
         self._attempt_limit = PathFinder.MAX_THINKING_POINTS_CONSIDERED
 
     @property
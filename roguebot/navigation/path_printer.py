@@ -1,6 +1,7 @@
 """Tool for displaying a dungeon and path to follow in debug logging
 """
 
+import numpy
 from ..state.dungeon_map import DungeonMap
 from ..state.entity import Entity
 from ..state.state import State
@@ -10,8 +11,20 @@ from .point import Point
 class PathPrinter():
     """ Convenience functions to display the dungeon with a path of
     points, showing items and entities on a map during debugging.
+
+    The walls, floors and gateways of each level don't change while we
+    are in the same map, so they are worked out once into a numpy array
+    of glyphs. Each render copies that, and stamps the entities, path,
+    items and our own position on top.
     """
 
+    def __init__(self):
+        # The map the static layers were drawn from, and its revision then.
+        self._static_map = None
+        self._static_revision = None
+        # z -> numpy array of glyphs, indexed [y, x]
+        self._static_layers = {}
+
     def render_path(self, state: State,
                     path: [Point] = None,
                     only_show_floor: bool = False,
@@ -63,48 +76,116 @@ class PathPrinter():
         if path is None:
             path = []
 
-        result = ''
+        dungeon_map = state.dungeon_map
+        separator = '-' * dungeon_map.width
 
-        separator = ''
-        for _ in range(state.dungeon_map.width):
-            separator = separator + '-'
-
-        result = result + "\n" + separator
-        for z in range(state.dungeon_map.depth):
+        lines = ["", separator]
+        for z in range(dungeon_map.depth):
             if (only_show_floor is None) or (only_show_floor == z):
-                for y in range(state.dungeon_map.height):
-                    line = ""
-                    for x in range(state.dungeon_map.width):
-                        p = Point(x, y, z)
+                glyphs = self._render_level(state, z, path, me_point)
+                for row in glyphs:
+                    lines.append(''.join(row.tolist()))
+                lines.append(separator)
+        return '\n'.join(lines) + '\n'
+
+    def lazy_render_path(self, state: State,
+                         path: [Point] = None,
+                         only_show_floor: bool = False,
+                         me_point: Point = None):
+        """The same as render_path, but the map is only drawn when the
+        returned object is turned into a string.
+
+        So it can be passed to a logger, and costs nothing unless the log
+        record is actually written. eg:
+            logger.debug("%s", path_printer.lazy_render_path(state, path))
+
+        Returns:
+            LazyPathRender : Something which renders the path when str() is called.
+        """
+        return LazyPathRender(self, state, path, only_show_floor, me_point)
 
-                        cell = state.dungeon_map.get_cell(p)
+    def _render_level(self, state: State, z: int, path: [Point],
+                      me_point: Point) -> numpy.ndarray:
+        dungeon_map = state.dungeon_map
+        glyphs = self._static_layer(dungeon_map, z).copy()
+        height = dungeon_map.height
+        width = dungeon_map.width
 
-                        glyph = cell.char
-                        if glyph == '.':
-                            # We want dots to indicate a path we are following.
-                            glyph = ' '
+        entity_points = [entity.position for entity in state.entities.get_by_level(z)]
+        (ys, xs) = PathPrinter._indexes_within(entity_points, z, height, width)
+        glyphs[ys, xs] = '@'
 
-                        if cell.is_gateway:
-                            glyph = 'O'
+        # Only blank floor shows the path. Not walls, gateways or entities.
+        (ys, xs) = PathPrinter._indexes_within(path, z, height, width)
+        blank = numpy.array([glyph == ' ' for glyph in glyphs[ys, xs]], dtype=bool)
+        glyphs[ys[blank], xs[blank]] = '.'
 
-                        entity_there = state.entities.get_by_position(p)
-                        if len(entity_there) > 0:
-                            glyph = "@"
+        item_points = [item.position for item in state.items.get_items_on_floor(z)]
+        (ys, xs) = PathPrinter._indexes_within(item_points, z, height, width)
+        glyphs[ys, xs] = '*'
 
-                        if path is not None and glyph == ' ':
-                            if p in path:
-                                glyph = "."
+        if me_point is not None and me_point.z == z and \
+                0 <= me_point.y < height and 0 <= me_point.x < width:
+            glyphs[me_point.y, me_point.x] = 'X'
 
-                        items_there = state.items.get_items_at_position(p)
-                        if len(items_there) > 0:
-                            glyph = '*'
+        return glyphs
+
+    def _static_layer(self, dungeon_map: DungeonMap, z: int) -> numpy.ndarray:
+        """
+        The glyphs for the walls, floors, stairs and gateways on one level.
+        Worked out once per map (and map revision), then remembered.
+        """
+        if self._static_map is not dungeon_map or \
+                self._static_revision != dungeon_map.revision:
+            self._static_map = dungeon_map
+            self._static_revision = dungeon_map.revision
+            self._static_layers = {}
+
+        layer = self._static_layers.get(z)
+        if layer is None:
+            layer = numpy.empty(
+                (dungeon_map.height, dungeon_map.width), dtype=object)
+            for y in range(dungeon_map.height):
+                for x in range(dungeon_map.width):
+                    cell = dungeon_map.get_cell(Point(x, y, z))
+                    glyph = cell.char
+                    if glyph == '.':
+                        # We want dots to indicate a path we are following.
+                        glyph = ' '
+                    if cell.is_gateway:
+                        glyph = 'O'
+                    layer[y, x] = glyph
+            self._static_layers[z] = layer
+        return layer
+
+    @staticmethod
+    def _indexes_within(points, z: int, height: int, width: int):
+        """
+        The (y indexes, x indexes) of the points which are on level z,
+        and inside the map, as numpy arrays.
+        """
+        ys = [point.y for point in points
+              if point.z == z and 0 <= point.y < height and 0 <= point.x < width]
+        xs = [point.x for point in points
+              if point.z == z and 0 <= point.y < height and 0 <= point.x < width]
+        return (numpy.array(ys, dtype=numpy.intp), numpy.array(xs, dtype=numpy.intp))
+
+
+class LazyPathRender():
+    """
+    A rendering of the map which is only drawn when it is turned into a string.
+    """
 
-                        if (me_point is not None) and (p == me_point):
-                            glyph = 'X'
+    __slots__ = ('_printer', '_state', '_path', '_only_show_floor', '_me_point')
 
-                        line = line + glyph
-                    result = result + '\n' + line
+    def __init__(self, printer: PathPrinter, state: State, path: [Point],
+                 only_show_floor, me_point: Point):
+        self._printer = printer
+        self._state = state
+        self._path = path
+        self._only_show_floor = only_show_floor
+        self._me_point = me_point
 
-                result = result + '\n' + separator
-        result = result + '\n'
-        return result
+    def __str__(self):
+        return self._printer.render_path(self._state, self._path,
+                                         self._only_show_floor, self._me_point)
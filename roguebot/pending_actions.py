@@ -0,0 +1,148 @@
+"""
+Remembers the item actions we've asked the server to do, but which it
+hasn't done yet, so the same request isn't sent over and over again.
+"""
+
+import logging
+import time
+from .action import Action, ActionCode
+
+
+class PendingActionTracker:
+    """
+    Sits between the brain and the client, dropping item actions which
+    are already on their way to the server.
+
+    The brain asks to eat, wear or wield things on every turn until the
+    server tells us our inventory has changed. Until then, sending the same
+    request again only makes work for the server.
+
+    A request stays pending until:
+    - our inventory, weapon or armour changes. ie: the server did something.
+    - or it has been pending for longer than the time-to-live. In case the
+      request was lost, or the server refused it.
+
+    Move actions are never held back.
+
+    Parameters:
+        ttl_seconds (float): How long to wait for the server before sending
+            the same request again.
+        clock: Where the time comes from. time.monotonic by default.
+    """
+
+    DEFAULT_TTL_SECONDS = 2.0
+
+    TRACKED_ACTION_CODES = frozenset(
+        {ActionCode.TAKE, ActionCode.EAT, ActionCode.WEAR, ActionCode.WIELD})
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 clock=time.monotonic):
+        self._logger = logging.getLogger(__name__)
+        self._ttl_seconds = max(float(ttl_seconds), 0)
+        self._clock = clock
+
+        # (action code, item name) -> time the request was sent.
+        self._pending = {}
+        # What we were carrying when the pending requests were sent.
+        self._signature = None
+
+        self._sent_count = 0
+        self._suppressed_count = 0
+        self._confirmed_count = 0
+        self._expired_count = 0
+
+    @property
+    def ttl_seconds(self) -> float:
+        return self._ttl_seconds
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    @property
+    def suppressed_count(self) -> int:
+        """ How many duplicate requests were not sent. """
+        return self._suppressed_count
+
+    @property
+    def confirmed_count(self) -> int:
+        """ How many requests were seen to be done by the server. """
+        return self._confirmed_count
+
+    @property
+    def expired_count(self) -> int:
+        """ How many requests we gave up waiting for. """
+        return self._expired_count
+
+    def should_send(self, action: Action, state) -> bool:
+        """
+        Should this action be sent to the server ?
+
+        If it should, it is remembered as pending.
+
+        Parameters:
+            action (Action): The action the brain wants doing.
+            state (State): Where we find out what we are carrying.
+
+        Returns:
+            bool : False if the same request is already on its way.
+        """
+        if action.action_code not in PendingActionTracker.TRACKED_ACTION_CODES:
+            return True
+
+        self._forget_confirmed(state)
+        now = self._clock()
+        self._forget_expired(now)
+
+        key = (action.action_code, action.item_name)
+        if key in self._pending:
+            self._suppressed_count += 1
+            self._logger.debug("Not sending %s again. Still waiting for it.", action)
+            return False
+
+        self._pending[key] = now
+        self._sent_count += 1
+        return True
+
+    def clear(self) -> None:
+        """ Forget all pending requests. eg: when we enter a new dungeon. """
+        self._pending.clear()
+        self._signature = None
+
+    def summary(self) -> dict:
+        return {
+            "sent": self._sent_count,
+            "pending": len(self._pending),
+            "suppressed": self._suppressed_count,
+            "confirmed": self._confirmed_count,
+            "expired": self._expired_count
+        }
+
+    def _forget_confirmed(self, state) -> None:
+        signature = PendingActionTracker._carrying_signature(state)
+        if signature != self._signature:
+            # Something we carry changed, so the server has acted on
+            # what we asked for. Let the brain ask for things afresh.
+            self._confirmed_count += len(self._pending)
+            self._pending.clear()
+            self._signature = signature
+
+    def _forget_expired(self, now: float) -> None:
+        expired = [key for (key, sent_at) in self._pending.items()
+                   if now - sent_at >= self._ttl_seconds]
+        for key in expired:
+            del self._pending[key]
+        self._expired_count += len(expired)
+
+    @staticmethod
+    def _carrying_signature(state) -> tuple:
+        me = None
+        if state is not None:
+            me = state.find_my_entity()
+        if me is None:
+            return None
+        weapon = me.current_weapon
+        armour = me.current_armour
+        return (tuple(item.name for item in me.inventory),
+                None if weapon is None else weapon.name,
+                None if armour is None else armour.name)
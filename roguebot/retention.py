@@ -0,0 +1,136 @@
+"""
+Limits on how much a bot remembers, so that a bot which runs for days
+doesn't slowly use up all its memory.
+"""
+
+import logging
+from .brains.goal_stack import GoalStack
+
+
+class RetentionPolicy:
+    """
+    Decides how much of what the bot has learned is worth keeping,
+    and periodically throws the rest away.
+
+    Every so many ticks, a compaction pass:
+    - forgets the items on floors we left long ago, or on all but the
+      most recently visited floors.
+    - asks the brain to trim its goal stack, and its goals to forget the
+      places they visited least recently.
+
+    The floor we are on is never forgotten. Ages are measured with the
+    state's clock, which is also what items and goals note times with.
+
+    Parameters:
+        max_levels (int): The most dungeon levels to remember things about,
+            including the one we are on. Minimum 1.
+        max_level_age_seconds (float): Forget about levels we left longer ago
+            than this.
+        max_places_per_level (int): The most visited points to remember on
+            each level.
+        max_goal_depth (int): The most goals to keep on the goal stack.
+            The oldest goals are dropped first.
+        compact_every_ticks (int): How often to run a compaction pass.
+    """
+
+    DEFAULT_MAX_LEVELS = 3
+    DEFAULT_MAX_LEVEL_AGE_SECONDS = 30 * 60
+    DEFAULT_MAX_PLACES_PER_LEVEL = 2000
+    DEFAULT_MAX_GOAL_DEPTH = GoalStack.DEFAULT_MAX_DEPTH
+    DEFAULT_COMPACT_EVERY_TICKS = 50
+
+    def __init__(self,
+                 max_levels: int = DEFAULT_MAX_LEVELS,
+                 max_level_age_seconds: float = DEFAULT_MAX_LEVEL_AGE_SECONDS,
+                 max_places_per_level: int = DEFAULT_MAX_PLACES_PER_LEVEL,
+                 max_goal_depth: int = DEFAULT_MAX_GOAL_DEPTH,
+                 compact_every_ticks: int = DEFAULT_COMPACT_EVERY_TICKS):
+        self._logger = logging.getLogger(__name__)
+        self._max_levels = max(int(max_levels), 1)
+        self._max_level_age_seconds = max(float(max_level_age_seconds), 0)
+        self._max_places_per_level = max(int(max_places_per_level), 1)
+        self._max_goal_depth = max(int(max_goal_depth), 1)
+        self._compact_every_ticks = max(int(compact_every_ticks), 1)
+
+        self._tick_count = 0
+        self._compaction_count = 0
+        self._item_floors_evicted = 0
+        self._last_report = {}
+
+    @property
+    def max_levels(self) -> int:
+        return self._max_levels
+
+    @property
+    def max_level_age_seconds(self) -> float:
+        return self._max_level_age_seconds
+
+    @property
+    def max_places_per_level(self) -> int:
+        return self._max_places_per_level
+
+    @property
+    def max_goal_depth(self) -> int:
+        return self._max_goal_depth
+
+    @property
+    def last_report(self) -> dict:
+        """
+        The sizes of everything being remembered, as of the last compaction
+        pass. Empty until the first pass has run.
+        """
+        return self._last_report
+
+    def on_tick(self, state, brain) -> bool:
+        """
+        Called every tick. Runs a compaction pass every so often.
+
+        Returns:
+            bool : True if a compaction pass was run.
+        """
+        self._tick_count += 1
+        if self._tick_count < self._compact_every_ticks:
+            return False
+        self._tick_count = 0
+        self.compact(state, brain)
+        return True
+
+    def compact(self, state, brain) -> dict:
+        """
+        Throws away whatever is over budget.
+
+        Parameters:
+            state (State): The state of the world.
+            brain (IBrain): The brain, which owns the goals.
+
+        Returns:
+            dict : The sizes of what is still remembered.
+        """
+        now = state.clock()
+
+        evicted_floors = state.evict_item_floors(
+            self._max_levels, self._max_level_age_seconds, now)
+        self._item_floors_evicted += len(evicted_floors)
+
+        me = state.find_my_entity()
+        current_floor = None if me is None else me.position.z
+        brain_report = brain.compact(self, current_floor, now)
+
+        self._compaction_count += 1
+        report = {
+            "compactions": self._compaction_count,
+            "items": len(state.items),
+            "item_floors": len(state.items.floors),
+            "item_floors_evicted": self._item_floors_evicted,
+            "messages": len(state.messages),
+            "message_bytes": state.messages.bytes_used,
+        }
+        report.update(brain_report)
+
+        if len(evicted_floors) > 0:
+            self._logger.debug("Forgot items on floors %s", evicted_floors)
+
+        # Replaced rather than changed, so other threads see all of one
+        # report or all of the next.
+        self._last_report = report
+        return report
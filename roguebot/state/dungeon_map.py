@@ -28,6 +28,8 @@ class DungeonMap:
         self._logger = logging.getLogger(__name__)
         self._neighbours = None
         self._gateway_points = None
+        # Goes up every time a cell is changed.
+        self._revision = 0
 
         if cells is None:
             self._cells = numpy.empty((depth, height, width), dtype=object)
@@ -126,11 +128,20 @@ class DungeonMap:
 
         if self.is_point_within_dungeon_dimenisons(point):
             self._cells[point.z, point.y, point.x] = cell
+            self._revision += 1
             self._do_map_calculations()
         else:
             self._logger.warning("%s %s %s Outside the dungeon of dimensions %s %s %s",
                                  point.x, point.y, point.z, self._width, self._height, self._depth)
 
+    @property
+    def revision(self) -> int:
+        """
+        A counter which goes up every time a cell is changed.
+        Anything worked out from the cells can be kept until this changes.
+        """
+        return self._revision
+
     @property
     def entrance(self):
         return self._entrance
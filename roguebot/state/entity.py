@@ -1,24 +1,44 @@
 import logging
 from ..navigation.point import Point
 from .item import Item
+from .spatial_grid import SpatialGrid
+from .entity_table import EntityTable
+from .fingerprint import add_key, remove_key
 
 
 class Entities:
     """ A collection of entity objects.
+
+    Entities are indexed by id, by exact position, and by a bucketed
+    spatial grid so that "who is near me ?" queries only look at
+    entities which are nearby.
+
+    Optionally, a columnar EntityTable of positions and numbers is kept
+    as well, so that crowded caves can be queried with numpy.
     """
 
-    def __init__(self):
+    def __init__(self, cell_size: int = SpatialGrid.DEFAULT_CELL_SIZE,
+                 columnar: bool = False):
         """Create a blank set of entities.
+
+        Parameters:
+            cell_size (int): The size of the spatial index grid cells.
+            columnar (bool): Also keep a columnar EntityTable up to date ?
         """
         self._entities_by_id = {}
         self._entities_by_position = {}
+        self._grid = SpatialGrid(cell_size)
+        self._table = EntityTable() if columnar else None
+        self._version = 0
+        # A Zobrist-style hash of which points have entities on them.
+        self._occupancy_hash = 0
         self._logger = logging.getLogger(__name__)
 
     @classmethod
-    def from_wire_format(cls, raw_entity_list_input):
+    def from_wire_format(cls, raw_entity_list_input, columnar: bool = False):
         """Create entities given the json from the network.
         """
-        entities = Entities()
+        entities = Entities(columnar=columnar)
         for raw_entity_input in raw_entity_list_input:
             entity = Entity.from_wire_format(raw_entity_input)
             entities.add(entity)
@@ -28,6 +48,12 @@ class Entities:
         if entity is not None:
             self._entities_by_id[entity.entity_id] = entity
             self._add_entity_to_position(entity, entity.position)
+            self._occupancy_hash = add_key(
+                self._occupancy_hash, entity.position)
+            self._grid.insert(entity.entity_id, entity, entity.position)
+            if self._table is not None:
+                self._table.upsert(entity)
+            self._version += 1
 
     def delete(self, entity):
         self._logger.debug("Entity to delete: %s", entity)
@@ -37,11 +63,20 @@ class Entities:
             entities_at_same_position = self._entities_by_position.get(
                 position, [])
 
-            for entity_to_delete in entities_at_same_position:
-                if entity_to_delete.entity_id == identifier:
-                    self._entities_by_position.pop(position)
+            # Only remove this entity. Others may share the same spot.
+            remaining = [other for other in entities_at_same_position
+                         if other.entity_id != identifier]
+            if len(remaining) > 0:
+                self._entities_by_position[position] = remaining
+            else:
+                self._entities_by_position.pop(position, None)
 
             self._entities_by_id.pop(identifier)
+            self._occupancy_hash = remove_key(self._occupancy_hash, position)
+            self._grid.remove(identifier)
+            if self._table is not None:
+                self._table.remove(identifier)
+            self._version += 1
 
     def update(self, entity):
         """An entity needs to be replaced with a different version of
@@ -57,11 +92,16 @@ class Entities:
     def delete_at_position(self, position: Point):
         """Delete whatever entity is currently at a specific position.
         """
-        entities_at_same_position = self._entities_by_position.get(
+        entities_at_same_position = self._entities_by_position.pop(
             position, [])
         for entity_to_delete in entities_at_same_position:
-            self._entities_by_position.pop(position)
-            self._entities_by_id.pop(entity_to_delete.entity_id)
+            self._entities_by_id.pop(entity_to_delete.entity_id, None)
+            self._occupancy_hash = remove_key(self._occupancy_hash, position)
+            self._grid.remove(entity_to_delete.entity_id)
+            if self._table is not None:
+                self._table.remove(entity_to_delete.entity_id)
+        if len(entities_at_same_position) > 0:
+            self._version += 1
 
     def delete_by_id(self, identifier: str) -> None:
         """Delete the entity with the specified identifier."
@@ -81,7 +121,10 @@ class Entities:
         entities_at_same_position = self._entities_by_position.get(
             position, [])
         entities_at_same_position.remove(entity)
-        self._entities_by_position[position] = entities_at_same_position
+        if len(entities_at_same_position) > 0:
+            self._entities_by_position[position] = entities_at_same_position
+        else:
+            self._entities_by_position.pop(position, None)
 
     def __str__(self):
         result = "Entities("
@@ -109,8 +152,105 @@ class Entities:
         entity_to_update = self.get_by_id(identifier)
         self._remove_entity_from_position(
             entity_to_update, entity_to_update.position)
+        self._occupancy_hash = remove_key(
+            self._occupancy_hash, entity_to_update.position)
         entity_to_update.position = new_position
         self._add_entity_to_position(entity_to_update, new_position)
+        self._occupancy_hash = add_key(self._occupancy_hash, new_position)
+        self._grid.move(identifier, entity_to_update, new_position)
+        if self._table is not None:
+            self._table.move(identifier, new_position)
+        self._version += 1
+
+    @property
+    def version(self) -> int:
+        """A counter which goes up every time this collection changes.
+
+        Two reads which see the same version saw the same entities.
+        """
+        return self._version
+
+    @property
+    def occupancy_hash(self) -> int:
+        """A fingerprint of where entities are standing.
+
+        Kept up to date as entities come, go and move. Two reads which see
+        the same hash almost certainly saw entities on the same points, even
+        if they weren't the same entities, or other things about them changed.
+        """
+        return self._occupancy_hash
+
+    @property
+    def is_columnar(self) -> bool:
+        """Is a columnar EntityTable being kept as well ?
+        """
+        return self._table is not None
+
+    @property
+    def table(self) -> EntityTable:
+        """The columnar copy of entity numbers, or None if we aren't keeping one.
+        """
+        return self._table
+
+    def living_non_allies_within(self, point: Point, distance: int,
+                                 ally_prefix: str = None, exclude_id=None) -> list:
+        """Finds living entities near a point which aren't one of our own bots.
+
+        Uses the columnar table if we have one, otherwise the spatial index.
+
+        Parameters:
+            point (Point): Where to search from.
+            distance (int): The manhattan distance to search within.
+            ally_prefix (str): Entities whose name starts with this prefix
+                (up to the first '-') are allies, so are left out.
+            exclude_id (str): An entity to leave out. Normally ourselves.
+
+        Returns:
+            [Entity] : The matching entities, nearest first.
+        """
+        if self._table is not None:
+            identifiers = self._table.living_non_allies_within(
+                point, distance, ally_prefix, exclude_id)
+            return [self._entities_by_id[identifier] for identifier in identifiers]
+
+        found = []
+        for entity in self.within_manhattan(point, distance):
+            if entity.entity_id == exclude_id or not entity.alive:
+                continue
+            if ally_prefix is not None and \
+                    EntityTable.name_prefix_of(entity.name) == ally_prefix:
+                continue
+            found.append(entity)
+        return found
+
+    def within_manhattan(self, point: Point, radius: int) -> list:
+        """Finds the entities within a manhattan distance of a point.
+
+        Only the spatial grid cells overlapping the search area are visited.
+        Going up or down one level of the dungeon counts as a distance of 1.
+
+        Parameters:
+            point (Point): Where to search from.
+            radius (int): How far away from the point to look.
+
+        Returns:
+            [Entity] : The entities in range, nearest first.
+        """
+        return [entity for (_, entity) in self._grid.within_manhattan(point, radius)]
+
+    def k_nearest(self, point: Point, k: int) -> list:
+        """Finds the k entities nearest to a point, on the same dungeon level.
+
+        Returns:
+            [Entity] : At most k entities, nearest first.
+        """
+        return [entity for (_, entity) in self._grid.k_nearest(point, k)]
+
+    def get_by_level(self, z: int):
+        """Iterates over the entities on one level of the dungeon.
+        """
+        for (_, entity, _) in self._grid.iterate_level(z):
+            yield entity
 
 
 class Entity:
@@ -0,0 +1,189 @@
+"""
+A columnar (struct-of-arrays) copy of the numbers we know about entities.
+
+When the cave is crowded, questions like "which living non-allied entities
+are within 5 steps of me ?" can be answered with one numpy expression over
+whole columns, rather than by visiting each Entity object in turn.
+"""
+
+import numpy
+from ..navigation.point import Point
+
+
+class EntityTable:
+    """
+    Holds x, y, z, hp, ac, hunger and alive for each entity in numpy arrays,
+    one row per entity, with a map from entity id to row.
+
+    Rows of entities which have gone are recycled. The arrays double in size
+    when they fill up.
+
+    The Entity objects stay the place to look for names, inventories and
+    so on. This table only mirrors the numbers, and is kept in step by the
+    Entities collection which owns it.
+    """
+
+    INITIAL_CAPACITY = 64
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        capacity = max(int(capacity), 1)
+        self._x = numpy.zeros(capacity, dtype=numpy.int32)
+        self._y = numpy.zeros(capacity, dtype=numpy.int32)
+        self._z = numpy.zeros(capacity, dtype=numpy.int32)
+        self._hp = numpy.zeros(capacity, dtype=numpy.int32)
+        self._ac = numpy.zeros(capacity, dtype=numpy.int32)
+        self._hunger = numpy.zeros(capacity, dtype=numpy.int32)
+        self._alive = numpy.zeros(capacity, dtype=bool)
+        self._in_use = numpy.zeros(capacity, dtype=bool)
+
+        # A small integer for the first part of each entity name, so
+        # "is it one of our bots ?" can be asked of a whole column.
+        self._name_prefix = numpy.full(capacity, -1, dtype=numpy.int32)
+        self._prefix_codes = {}
+
+        self._row_by_id = {}
+        self._id_by_row = [None] * capacity
+        self._free_rows = []
+        self._next_unused_row = 0
+
+    def __len__(self) -> int:
+        return len(self._row_by_id)
+
+    @property
+    def capacity(self) -> int:
+        return len(self._x)
+
+    @staticmethod
+    def name_prefix_of(name: str) -> str:
+        """
+        Bot names look like 'assassin-123'. The prefix is the 'assassin' part.
+        """
+        return name.split('-')[0]
+
+    def _prefix_code(self, prefix: str) -> int:
+        code = self._prefix_codes.get(prefix)
+        if code is None:
+            code = len(self._prefix_codes)
+            self._prefix_codes[prefix] = code
+        return code
+
+    def _allocate_row(self) -> int:
+        if len(self._free_rows) > 0:
+            return self._free_rows.pop()
+        if self._next_unused_row == self.capacity:
+            self._grow()
+        row = self._next_unused_row
+        self._next_unused_row += 1
+        return row
+
+    def _grow(self) -> None:
+        old_capacity = self.capacity
+        new_capacity = old_capacity * 2
+        for column_name in ('_x', '_y', '_z', '_hp', '_ac', '_hunger', '_alive', '_in_use'):
+            old_column = getattr(self, column_name)
+            new_column = numpy.zeros(new_capacity, dtype=old_column.dtype)
+            new_column[:old_capacity] = old_column
+            setattr(self, column_name, new_column)
+        new_prefix = numpy.full(new_capacity, -1, dtype=numpy.int32)
+        new_prefix[:old_capacity] = self._name_prefix
+        self._name_prefix = new_prefix
+        self._id_by_row.extend([None] * (new_capacity - old_capacity))
+
+    def upsert(self, entity) -> None:
+        """
+        Add an entity's numbers to the table, or refresh them if it's already there.
+        """
+        identifier = entity.entity_id
+        row = self._row_by_id.get(identifier)
+        if row is None:
+            row = self._allocate_row()
+            self._row_by_id[identifier] = row
+            self._id_by_row[row] = identifier
+
+        position = entity.position
+        self._x[row] = position.x
+        self._y[row] = position.y
+        self._z[row] = position.z
+        self._hp[row] = entity.hit_points
+        self._ac[row] = entity.armour_class
+        self._hunger[row] = entity.hunger
+        self._alive[row] = bool(entity.alive)
+        self._in_use[row] = True
+        self._name_prefix[row] = self._prefix_code(
+            EntityTable.name_prefix_of(entity.name))
+
+    def move(self, identifier, point: Point) -> None:
+        row = self._row_by_id.get(identifier)
+        if row is not None:
+            self._x[row] = point.x
+            self._y[row] = point.y
+            self._z[row] = point.z
+
+    def remove(self, identifier) -> None:
+        row = self._row_by_id.pop(identifier, None)
+        if row is not None:
+            self._in_use[row] = False
+            self._alive[row] = False
+            self._id_by_row[row] = None
+            self._free_rows.append(row)
+
+    def clear(self) -> None:
+        self._in_use[:] = False
+        self._alive[:] = False
+        self._row_by_id = {}
+        self._id_by_row = [None] * self.capacity
+        self._free_rows = []
+        self._next_unused_row = 0
+
+    def row_of(self, identifier) -> int:
+        return self._row_by_id.get(identifier, None)
+
+    def row_values(self, identifier) -> dict:
+        """
+        The numbers held for one entity, or None if we don't know about it.
+        """
+        row = self._row_by_id.get(identifier)
+        if row is None:
+            return None
+        return {
+            "x": int(self._x[row]), "y": int(self._y[row]), "z": int(self._z[row]),
+            "hp": int(self._hp[row]), "ac": int(self._ac[row]),
+            "hunger": int(self._hunger[row]), "alive": bool(self._alive[row])
+        }
+
+    def living_non_allies_within(self, point: Point, distance: int,
+                                 ally_prefix: str = None,
+                                 exclude_id=None) -> [object]:
+        """
+        All the living entities within a manhattan distance of a point,
+        which don't share our name prefix.
+
+        Going up or down one level of the dungeon counts as a distance of 1,
+        the same as the spatial index.
+
+        Returns:
+            [identifier] : The ids of the matching entities, nearest first.
+        """
+        used = self._next_unused_row
+        if used == 0:
+            return []
+
+        distances = numpy.abs(self._x[:used] - point.x) + \
+            numpy.abs(self._y[:used] - point.y) + \
+            numpy.abs(self._z[:used] - point.z)
+        mask = self._in_use[:used] & self._alive[:used] & (
+            distances <= distance)
+
+        if ally_prefix is not None:
+            ally_code = self._prefix_codes.get(ally_prefix)
+            if ally_code is not None:
+                mask &= self._name_prefix[:used] != ally_code
+
+        if exclude_id is not None:
+            excluded_row = self._row_by_id.get(exclude_id)
+            if excluded_row is not None:
+                mask[excluded_row] = False
+
+        rows = numpy.flatnonzero(mask)
+        rows = rows[numpy.argsort(distances[rows], kind='stable')]
+        return [self._id_by_row[row] for row in rows]
@@ -0,0 +1,38 @@
+"""
+Zobrist-style hashing, so a fingerprint of lots of things can be kept up to
+date one change at a time, rather than worked out from scratch.
+"""
+
+_MASK = 0xFFFFFFFFFFFFFFFF
+
+
+def zobrist_key(value) -> int:
+    """
+    A well-mixed 64 bit number for any hashable value.
+
+    The same value always gets the same key while the bot runs. Different
+    values are very unlikely to share one.
+    """
+    # splitmix64, which spreads similar inputs (like neighbouring points)
+    # all over the 64 bit range.
+    z = (hash(value) + 0x9E3779B97F4A7C15) & _MASK
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK
+    return z ^ (z >> 31)
+
+
+def add_key(fingerprint: int, value) -> int:
+    """
+    The fingerprint with one more of the value in it.
+
+    Keys are added rather than xor-ed, so two entities standing on the
+    same spot don't cancel each other out.
+    """
+    return (fingerprint + zobrist_key(value)) & _MASK
+
+
+def remove_key(fingerprint: int, value) -> int:
+    """
+    The fingerprint with one of the value taken out of it. See add_key
+    """
+    return (fingerprint - zobrist_key(value)) & _MASK
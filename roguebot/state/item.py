@@ -4,6 +4,7 @@ Items are useful, some more than others.
 
 Take them, put them into your inventory, wield them, eat them, wear them or drop them.
 """
+import time
 from ..navigation.point import Point
 
 
@@ -92,6 +93,12 @@ class Item:
     def wearable(self) -> bool:
         return self._wearable
 
+    @property
+    def is_useful(self) -> bool:
+        """Can it be eaten, worn or wielded ? Anything else is junk.
+        """
+        return self._edible or self._wearable or self._wieldable
+
     @ property
     def position(self) -> Point:
         """Where is it ?
@@ -108,30 +115,71 @@ class Items:
     All the items we know about are stored here.
 
     The main query we get is `are there items at point x,y,z`
-    So we order items into a dictionary.
+    So we order items into a dictionary for each level of the dungeon.
     The key is the point the item(s) are at.
     The value is a list of items which are at that point.
 
     Sometimes we are told to update_items, which means removing all the items
     we know about on that dungeon level, and adding-in the new item list.
+    Keeping each level in its' own bucket means that only costs as much as
+    the number of items on that level.
+
+    Counts, and indexes of the edible, wearable and wieldable items are kept
+    up to date as items come and go, so questions like "how many useful
+    items are there ?" don't need to look at every item.
     """
 
-    def __init__(self):
+    def __init__(self, clock=time.monotonic):
         """
         Create an empty collection of items.
+
+        Parameters:
+            clock : Gives the time in seconds, for when we last heard about
+                each floor. Defaults to time.monotonic
         """
-        self._items_by_position = {}
+        self._clock = clock
+        # level -> { Point: [Item] }
+        self._items_by_level = {}
+
+        # level -> number of items on that level
+        self._count_by_level = {}
+        self._count = 0
+
+        # Secondary indexes. id(item) -> item, in the order they were added.
+        self._edible_items = {}
+        self._wearable_items = {}
+        self._wieldable_items = {}
+        self._useful_items = {}
+
+        # What the server last told us about each floor, so that repeats
+        # of the same items payload don't have to be parsed again.
+        # level -> { payload key: (a copy of the raw list, [Item]) }
+        self._positions_by_level = {}
+        # The levels whose items exactly match the last payload we got.
+        self._floors_in_sync = set()
+
+        # Goes up every time an item is added or removed.
+        self._version = 0
+
+        # level -> the clock's time when we last heard about that floor.
+        self._floor_touched_at = {}
 
     def __str__(self):
-        return str(self._items_by_position)
+        items_by_position = {}
+        for items_on_level in self._items_by_level.values():
+            items_by_position.update(items_on_level)
+        return str(items_by_position)
 
-    def update_items(self, raw_items_data: dict, my_position: Point):
+    def update_items(self, raw_items_data: dict, my_position: Point = None,
+                     level: int = None):
         """
         Every time we go up/down stairs, or when the status of items change,
         we get an update of all the items on this floor.
 
         Parameters:
             my_position (Point): tells us which floor we are on.
+            level (int): Optional. The floor the items are on, if it
+                isn't the one my_position is on.
             raw_items_data (dict): A batch of items might look like this:
 
                 <PRE>
@@ -158,37 +206,98 @@ class Items:
                 Each value dict has a 'pos' attribute amongst other things...etc.
 
         Note: Multiple items can exist at the same point.
-        """
-        # So before we do anything else, delete all the items on this floor.
-        self._delete_all_items_on_floor(my_position.z)
 
-        # Now we can extract entity definitions from the wire form.
-        items_to_add = []
-        for key in raw_items_data.keys():
-            items_at_this_location_raw_data = raw_items_data[key]
+        Returns:
+            bool : True if the items on this floor changed, False if the
+                server just sent us what we already knew.
+
+        The raw item list at each position is compared with the one from the
+        last update. Positions whose list is unchanged keep their existing Item
+        objects. Only new or changed positions are parsed again. If most of the
+        floor changed, the whole floor is parsed again, which is quicker.
+        The raw item dicts are kept for comparing with, so mustn't be changed
+        after they are passed in.
+        """
+        if level is None:
+            level = my_position.z
+        self._floor_touched_at[level] = self._clock()
+
+        old_positions = {}
+        unchanged = {}
+        changed_count = 0
+        if level in self._floors_in_sync:
+            old_positions = dict(self._positions_by_level.get(level, {}))
+            for (key, raw_items_at_key) in raw_items_data.items():
+                old_position = old_positions.get(key, None)
+                if old_position is not None and old_position[0] == raw_items_at_key:
+                    unchanged[key] = old_position
+                else:
+                    changed_count += 1
+                    if changed_count * 2 > len(old_positions):
+                        # No need to look any further.
+                        break
+
+            if changed_count == 0 and len(raw_items_data) == len(old_positions):
+                # Exactly the same as last time.
+                return False
+
+        if changed_count * 2 > len(old_positions) or level not in self._floors_in_sync:
+            # Either most of the floor changed, and starting again is quicker
+            # than picking out what changed, or someone changed this floor
+            # behind our back, so we can't trust what we remember.
+            self._delete_all_items_on_floor(level)
+            old_positions = {}
+            unchanged = {}
+
+        new_positions = {}
+        for (key, items_at_this_location_raw_data) in raw_items_data.items():
+            old_position = old_positions.pop(key, None)
+            if key in unchanged:
+                # Nothing changed at this position. Keep the items we have.
+                new_positions[key] = old_position
+                continue
+
+            if old_position is not None:
+                for item in old_position[1]:
+                    self._remove(item)
+
+            items_added = []
             for raw_item_data in items_at_this_location_raw_data:
-                # print("raw_item_data:{}".format(raw_item_data))
                 item = Item.from_wire_format(raw_item_data)
-                items_to_add.append(item)
+                self._insert(item, item.position)
+                items_added.append(item)
+            new_positions[key] = (list(items_at_this_location_raw_data), items_added)
 
-        for item in items_to_add:
-            point = item.position
-            self.add_item_to_position(item, point)
+        # Whatever positions are left over have nothing at them any more.
+        for (_, items_removed) in old_positions.values():
+            for item in items_removed:
+                self._remove(item)
+
+        self._positions_by_level[level] = new_positions
+        self._floors_in_sync.add(level)
+        return True
 
     def _delete_all_items_on_floor(self, level: int):
         """
-        Remove all the items on the specific floor by just leaving them
-        in the old dictionary whcih gets discarded.
+        Remove all the items on the specific floor by dropping that floor's
+        bucket of items.
 
         Parameters:
             level (int): The level of the dungeon we need to delete all the 
                 items on, so they can be replaced.
         """
-        surviving_items = {}
-        for point in self._items_by_position.keys():
-            if point.z != level:
-                surviving_items[point] = self._items_by_position[point]
-        self._items_by_position = surviving_items
+        items_on_level = self._items_by_level.pop(level, {})
+        for items_at_point in items_on_level.values():
+            for item in items_at_point:
+                self._unindex(item)
+        self._count -= self._count_by_level.pop(level, 0)
+        self._forget_floor_payload(level)
+        if len(items_on_level) > 0:
+            self._version += 1
+
+    def _forget_floor_payload(self, level: int) -> None:
+        self._floors_in_sync.discard(level)
+        self._positions_by_level.pop(level, None)
 
     def add(self, item: Item):
         """
@@ -201,8 +310,29 @@ class Items:
         self.add_item_to_position(item, item.position)
 
     def delete(self, item: Item):
-        items_at_point = self._items_by_position.get(item.position, [])
+        self._forget_floor_payload(item.position.z)
+        self._remove(item)
+
+    def _remove(self, item: Item):
+        level = item.position.z
+        items_on_level = self._items_by_level.get(level, {})
+        items_at_point = items_on_level.get(item.position, [])
+        if item not in items_at_point:
+            # Already gone.
+            return
         items_at_point.remove(item)
+        if len(items_at_point) == 0:
+            items_on_level.pop(item.position, None)
+
+        self._unindex(item)
+        self._count -= 1
+        self._version += 1
+        remaining = self._count_by_level.get(level, 0) - 1
+        if remaining > 0:
+            self._count_by_level[level] = remaining
+        else:
+            self._count_by_level.pop(level, None)
+            self._items_by_level.pop(level, None)
 
     def add_item_to_position(self, item: Item, point: Point):
         """
@@ -210,16 +340,103 @@ class Items:
 
         Note: The item's position is also updated by this operation.
         """
-        items_at_point = self._items_by_position.get(point, [])
-        items_at_point.append(item)
+        self._forget_floor_payload(point.z)
+        self._insert(item, point)
 
-        # print("Adding item to position {} gives us list at this point {}".format(
-        #   point, items_at_point))
-        self._items_by_position[point] = items_at_point
+    def _insert(self, item: Item, point: Point):
+        items_on_level = self._items_by_level.setdefault(point.z, {})
+        items_at_point = items_on_level.setdefault(point, [])
+        items_at_point.append(item)
 
         # Let the item know it has been moved.
         item.position = point
 
+        self._index(item)
+        self._count += 1
+        self._version += 1
+        self._count_by_level[point.z] = self._count_by_level.get(
+            point.z, 0) + 1
+
+    @property
+    def version(self) -> int:
+        """
+        A counter which goes up every time an item is added or removed.
+        """
+        return self._version
+
+    def floor_touched_at(self, level: int) -> float:
+        """
+        When we last heard about the items on a floor, from the clock,
+        or None if we never have.
+        """
+        return self._floor_touched_at.get(level, None)
+
+    def evict_floors(self, keep_floor: int, max_floors: int,
+                     max_age_seconds: float, now: float = None) -> [int]:
+        """
+        Forgets the items on floors we haven't heard about for a while.
+
+        Floors older than max_age_seconds are forgotten first. Then, if more
+        than max_floors floors are still remembered, the ones we heard about
+        least recently are forgotten too.
+
+        Parameters:
+            keep_floor (int): The floor we are on. Never forgotten. May be None.
+            max_floors (int): The most floors to remember, including keep_floor.
+            max_age_seconds (float): Forget floors we haven't heard about
+                for longer than this.
+            now (float): Optional. The clock's time to measure ages from.
+
+        Returns:
+            [int] : The floors which were forgotten.
+        """
+        if now is None:
+            now = self._clock()
+
+        # Floors we have items for, least recently heard about first.
+        # Floors with items added some other way count as just heard about.
+        candidates = []
+        for level in list(self._items_by_level.keys()):
+            if level == keep_floor:
+                continue
+            touched_at = self._floor_touched_at.setdefault(level, now)
+            candidates.append((touched_at, level))
+        candidates.sort()
+
+        evicted = [level for (touched_at, level) in candidates
+                   if now - touched_at > max_age_seconds]
+        remaining = [level for (touched_at, level) in candidates
+                     if now - touched_at <= max_age_seconds]
+
+        kept_count = 0 if keep_floor is None or \
+            keep_floor not in self._items_by_level else 1
+        excess = len(remaining) + kept_count - max(int(max_floors), 1)
+        if excess > 0:
+            evicted.extend(remaining[:excess])
+
+        for level in evicted:
+            self._delete_all_items_on_floor(level)
+            self._floor_touched_at.pop(level, None)
+        return evicted
+
+    def _index(self, item: Item) -> None:
+        key = id(item)
+        if item.edible:
+            self._edible_items[key] = item
+        if item.wearable:
+            self._wearable_items[key] = item
+        if item.wieldable:
+            self._wieldable_items[key] = item
+        if item.is_useful:
+            self._useful_items[key] = item
+
+    def _unindex(self, item: Item) -> None:
+        key = id(item)
+        self._edible_items.pop(key, None)
+        self._wearable_items.pop(key, None)
+        self._wieldable_items.pop(key, None)
+        self._useful_items.pop(key, None)
+
     def get_items_at_position(self, point: Point) -> [Item]:
         """
         Gets the list of items at a specific point.
@@ -228,7 +445,29 @@ class Items:
             items ([Item]): the list of items at a position, or 
                 an empty list if there's nothing there.
         """
-        return self._items_by_position.get(point, [])
+        return self._items_by_level.get(point.z, {}).get(point, [])
+
+    def get_items_on_floor(self, level: int) -> [Item]:
+        """
+        Gets all the items on one level of the dungeon.
+        """
+        total = []
+        for items_at_a_point in self._items_by_level.get(level, {}).values():
+            total.extend(items_at_a_point)
+        return total
+
+    def count_on_floor(self, level: int) -> int:
+        """
+        How many items do we know about on a level of the dungeon ?
+        """
+        return self._count_by_level.get(level, 0)
+
+    @property
+    def floors(self) -> [int]:
+        """
+        The levels of the dungeon we know of items on.
+        """
+        return list(self._items_by_level.keys())
 
     def get_as_list(self) -> [Item]:
         """
@@ -238,14 +477,55 @@ class Items:
             item_list ([item]): The list of items. No real sort order.
         """
         total = []
-        for key in self._items_by_position.keys():
-            #print("key {}".format(key))
-            items_at_a_point = self._items_by_position[key]
-            #print("items: {}".format(items_at_a_point))
-            for item in items_at_a_point:
-                total.append(item)
+        for items_on_level in self._items_by_level.values():
+            for items_at_a_point in items_on_level.values():
+                total.extend(items_at_a_point)
         return total
 
+    def get_useful_items(self) -> [Item]:
+        """
+        The items which can be eaten, worn or wielded. Other items are junk.
+        """
+        return list(self._useful_items.values())
+
+    @property
+    def useful_count(self) -> int:
+        """
+        How many items can be eaten, worn or wielded ?
+        """
+        return len(self._useful_items)
+
+    def get_edible_items(self) -> [Item]:
+        return list(self._edible_items.values())
+
+    def get_wearable_items(self) -> [Item]:
+        return list(self._wearable_items.values())
+
+    def get_wieldable_items(self) -> [Item]:
+        return list(self._wieldable_items.values())
+
+    def best_by_damage(self) -> Item:
+        """
+        The wieldable item which does the most damage, or None if there are
+        no weapons lying around.
+        """
+        best_item = None
+        for item in self._wieldable_items.values():
+            if best_item is None or item.damage > best_item.damage:
+                best_item = item
+        return best_item
+
+    def best_by_armour_class(self) -> Item:
+        """
+        The wearable item with the lowest (best) armour class, or None if
+        there is nothing to wear lying around.
+        """
+        best_item = None
+        for item in self._wearable_items.values():
+            if best_item is None or item.armour_class < best_item.armour_class:
+                best_item = item
+        return best_item
+
     def __len__(self) -> int:
         """
         How many items do we know about ?
@@ -253,5 +533,4 @@ class Items:
         Returns:
             length (int): The number of items we know about.
         """
-        all_items = self.get_as_list()
-        return len(all_items)
+        return self._count
@@ -0,0 +1,78 @@
+"""
+Shares dungeon maps between bots which are in the same cave.
+"""
+
+import hashlib
+import json
+import logging
+import weakref
+from .dungeon_map import DungeonMap
+
+
+class MapCache:
+    """
+    Builds each distinct dungeon map once, however many bots are given it.
+
+    Bots in the same process which are in the same cave get the same
+    DungeonMap object, so the cells, the neighbour lists and the gateway
+    points are held once rather than once per bot. The bots never change
+    the map after it arrives, so sharing it is safe.
+
+    Maps are only held weakly. When no bot is using a map any longer,
+    it is forgotten.
+    """
+
+    def __init__(self):
+        self._logger = logging.getLogger(__name__)
+        self._maps = weakref.WeakValueDictionary()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def key_of(map_raw_data) -> str:
+        """
+        A digest of the map as it came over the network, so the same cave
+        gets the same key.
+        """
+        content = json.dumps(map_raw_data, sort_keys=True,
+                             separators=(',', ':'))
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+    def get_or_build(self, map_raw_data) -> DungeonMap:
+        """
+        The dungeon map for some map data from the server.
+
+        Parameters:
+            map_raw_data (dict): The map, in the network serialisation format.
+
+        Returns:
+            DungeonMap : A map shared with any other bot given the same data.
+        """
+        key = MapCache.key_of(map_raw_data)
+        dungeon_map = self._maps.get(key)
+        if dungeon_map is None:
+            self._misses += 1
+            dungeon_map = DungeonMap.from_wire_format(map_raw_data)
+            self._maps[key] = dungeon_map
+            self._logger.debug("Built map %s", key)
+        else:
+            self._hits += 1
+        return dungeon_map
+
+    def __len__(self) -> int:
+        return len(self._maps)
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    def summary(self) -> dict:
+        return {
+            "maps": len(self._maps),
+            "hits": self._hits,
+            "misses": self._misses
+        }
@@ -0,0 +1,222 @@
+"""
+A bounded store of the messages the server sends us.
+
+Messages arrive all game long. Keeping every one of them would slowly use
+up all our memory, so only the most recent ones are kept.
+"""
+import collections
+import re
+
+
+class MessageLog:
+    """
+    A fixed-capacity ring of messages, which also keeps within a byte budget.
+
+    Every message gets the next sequence number as it arrives, so readers
+    can remember the last sequence number they saw and ask for only the
+    messages which arrived since.
+
+    Patterns can be registered, and a count of the messages matching each
+    pattern is kept up to date as messages arrive, so nobody has to scan
+    back through the history.
+
+    For compatibility with code written when messages were a plain list,
+    append, pop, len, indexing and iteration all work.
+    """
+
+    DEFAULT_CAPACITY = 500
+    """ The most messages we keep. """
+
+    DEFAULT_MAX_BYTES = 64 * 1024
+    """ The most bytes of message text we keep. """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY,
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 patterns: dict = None):
+        """
+        Create an empty message log.
+
+        Parameters:
+            capacity (int): The maximum number of messages kept. Minimum 1.
+            max_bytes (int): The maximum number of bytes of message text kept.
+                The most recent message is always kept, however big it is.
+            patterns (dict): Optional. name -> regular expression. Messages
+                matching each expression are counted.
+        """
+        self._capacity = max(int(capacity), 1)
+        self._max_bytes = max(int(max_bytes), 1)
+
+        # (sequence, message, size in bytes), oldest first.
+        self._entries = collections.deque()
+        self._bytes = 0
+        self._sequence = 0
+        self._version = 0
+        self._evicted_count = 0
+
+        self._patterns = {}
+        self._pattern_counts = {}
+        if patterns is not None:
+            for (name, pattern) in patterns.items():
+                self.add_pattern(name, pattern)
+
+    def add_pattern(self, name: str, pattern: str) -> None:
+        """
+        Start counting the messages which match a regular expression.
+        Only messages arriving from now on are counted.
+        """
+        self._patterns[name] = re.compile(pattern, re.IGNORECASE)
+        self._pattern_counts.setdefault(name, 0)
+
+    def pattern_count(self, name: str) -> int:
+        """
+        How many messages have matched a pattern. 0 for unknown patterns.
+        """
+        return self._pattern_counts.get(name, 0)
+
+    @property
+    def pattern_counts(self) -> dict:
+        return dict(self._pattern_counts)
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    @property
+    def bytes_used(self) -> int:
+        return self._bytes
+
+    @property
+    def sequence(self) -> int:
+        """
+        The sequence number of the latest message. 0 if none have arrived.
+        """
+        return self._sequence
+
+    @property
+    def first_sequence(self) -> int:
+        """
+        The sequence number of the oldest message still kept, or None if empty.
+        """
+        if len(self._entries) == 0:
+            return None
+        return self._entries[0][0]
+
+    @property
+    def version(self) -> int:
+        """
+        Goes up every time a message is added or removed.
+        """
+        return self._version
+
+    @property
+    def evicted_count(self) -> int:
+        """
+        How many messages have been thrown away to stay within budget.
+        """
+        return self._evicted_count
+
+    def append(self, message) -> int:
+        """
+        Adds a message, throwing away the oldest ones if we are over budget.
+
+        Returns:
+            int : The sequence number given to the message.
+        """
+        self._sequence += 1
+        self._version += 1
+        size = len(str(message).encode('utf-8'))
+        self._entries.append((self._sequence, message, size))
+        self._bytes += size
+
+        for (name, pattern) in self._patterns.items():
+            if pattern.search(str(message)) is not None:
+                self._pattern_counts[name] += 1
+
+        while len(self._entries) > 1 and \
+                (len(self._entries) > self._capacity or self._bytes > self._max_bytes):
+            (_, _, evicted_size) = self._entries.popleft()
+            self._bytes -= evicted_size
+            self._evicted_count += 1
+
+        return self._sequence
+
+    def pop(self, index: int = -1):
+        """
+        Removes and returns a message, like list.pop()
+        Popping the oldest (0) or newest (-1) message is cheap.
+        """
+        if len(self._entries) == 0:
+            raise IndexError("pop from empty MessageLog")
+        if index == 0:
+            entry = self._entries.popleft()
+        elif index == -1:
+            entry = self._entries.pop()
+        else:
+            entry = self._entries[index]
+            del self._entries[index]
+        self._bytes -= entry[2]
+        self._version += 1
+        return entry[1]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+        self._version += 1
+
+    def since(self, sequence: int) -> [str]:
+        """
+        The messages which arrived after a sequence number, oldest first.
+
+        Only looks at the messages being returned, not the whole history.
+        Messages which have already been thrown away are not returned.
+        """
+        newer = []
+        for (entry_sequence, message, _) in reversed(self._entries):
+            if entry_sequence <= sequence:
+                break
+            newer.append(message)
+        newer.reverse()
+        return newer
+
+    def copy(self):
+        """
+        A copy of the log, which later changes to this one won't affect.
+        """
+        duplicate = MessageLog(self._capacity, self._max_bytes)
+        duplicate._entries = collections.deque(self._entries)
+        duplicate._bytes = self._bytes
+        duplicate._sequence = self._sequence
+        duplicate._version = self._version
+        duplicate._evicted_count = self._evicted_count
+        duplicate._patterns = dict(self._patterns)
+        duplicate._pattern_counts = dict(self._pattern_counts)
+        return duplicate
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self):
+        for (_, message, _) in self._entries:
+            yield message
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        return self._entries[index][1]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (MessageLog, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __str__(self):
+        return str(list(self))
+
+    def __repr__(self):
+        return "MessageLog(" + str(self) + ")"
@@ -0,0 +1,239 @@
+"""
+A bucketed spatial index, so we can ask "what is near this point ?" without
+looking at everything we know about.
+"""
+
+import heapq
+from ..navigation.point import Point
+
+
+class SpatialGrid:
+    """
+    Buckets objects by position into square grid cells, one grid per dungeon level.
+
+    Each bucket is keyed by (z, cell_x, cell_y) and holds a dict of
+    identifier -> object. Proximity queries only visit the buckets which
+    overlap the area being searched, so they cost roughly O(nearby objects)
+    rather than O(all objects).
+
+    Distances are manhattan distances. A change of dungeon level counts as
+    one step, as stairs link the same x,y on neighbouring levels.
+    """
+
+    DEFAULT_CELL_SIZE = 8
+    """
+    The width and height of each grid cell, in dungeon squares.
+    """
+
+    def __init__(self, cell_size: int = DEFAULT_CELL_SIZE):
+        """
+        Create an empty grid.
+
+        Parameters:
+            cell_size (int): The width and height of each bucket. Minimum 1.
+        """
+        self._cell_size = max(int(cell_size), 1)
+
+        # (z, cell_x, cell_y) -> { identifier: object }
+        self._buckets = {}
+
+        # z -> set of (cell_x, cell_y) which have at least one object in them.
+        self._cells_by_level = {}
+
+        # z -> number of objects on that level.
+        self._count_by_level = {}
+
+        # identifier -> Point the object was indexed at.
+        self._positions = {}
+
+    @property
+    def cell_size(self) -> int:
+        return self._cell_size
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def _cell_of(self, point: Point) -> (int, int, int):
+        return (point.z, point.x // self._cell_size, point.y // self._cell_size)
+
+    def insert(self, identifier, thing, point: Point) -> None:
+        """
+        Index something at a point. If the identifier is already indexed,
+        it is moved to the new point.
+        """
+        if identifier in self._positions:
+            self.remove(identifier)
+
+        key = self._cell_of(point)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = {}
+            self._buckets[key] = bucket
+            self._cells_by_level.setdefault(key[0], set()).add(key[1:])
+        bucket[identifier] = thing
+
+        self._positions[identifier] = point
+        self._count_by_level[point.z] = self._count_by_level.get(
+            point.z, 0) + 1
+
+    def remove(self, identifier) -> None:
+        """
+        Stop indexing something. Unknown identifiers are ignored.
+        """
+        point = self._positions.pop(identifier, None)
+        if point is None:
+            return
+
+        key = self._cell_of(point)
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            bucket.pop(identifier, None)
+            if len(bucket) == 0:
+                del self._buckets[key]
+                cells = self._cells_by_level[key[0]]
+                cells.discard(key[1:])
+                if len(cells) == 0:
+                    del self._cells_by_level[key[0]]
+
+        remaining = self._count_by_level.get(point.z, 0) - 1
+        if remaining > 0:
+            self._count_by_level[point.z] = remaining
+        else:
+            self._count_by_level.pop(point.z, None)
+
+    def move(self, identifier, thing, new_point: Point) -> None:
+        """
+        Something we index has moved. Only touches the buckets if the
+        grid cell has changed.
+        """
+        old_point = self._positions.get(identifier)
+        if old_point is not None and \
+                self._cell_of(old_point) == self._cell_of(new_point):
+            self._positions[identifier] = new_point
+            self._buckets[self._cell_of(new_point)][identifier] = thing
+        else:
+            self.insert(identifier, thing, new_point)
+
+    def clear(self) -> None:
+        self._buckets = {}
+        self._cells_by_level = {}
+        self._count_by_level = {}
+        self._positions = {}
+
+    def position_of(self, identifier) -> Point:
+        return self._positions.get(identifier, None)
+
+    def count_on_level(self, z: int) -> int:
+        return self._count_by_level.get(z, 0)
+
+    def levels(self) -> [int]:
+        """
+        The dungeon levels which have something indexed on them.
+        """
+        return list(self._count_by_level.keys())
+
+    def iterate_level(self, z: int):
+        """
+        Yields (identifier, thing, point) for everything on one dungeon level.
+        """
+        for (cell_x, cell_y) in list(self._cells_by_level.get(z, ())):
+            bucket = self._buckets.get((z, cell_x, cell_y), {})
+            for identifier, thing in bucket.items():
+                yield (identifier, thing, self._positions[identifier])
+
+    def within_manhattan(self, point: Point, radius: int) -> [(int, object)]:
+        """
+        Finds everything within a manhattan distance of a point.
+
+        Parameters:
+            point (Point): The centre of the search.
+            radius (int): The maximum distance. Changing level costs 1.
+
+        Returns:
+            [(distance, thing)] : Everything in range, nearest first.
+        """
+        found = []
+        size = self._cell_size
+        for z in range(point.z - radius, point.z + radius + 1):
+            if self._count_by_level.get(z, 0) == 0:
+                continue
+            level_radius = radius - abs(z - point.z)
+            min_cell_x = (point.x - level_radius) // size
+            max_cell_x = (point.x + level_radius) // size
+            min_cell_y = (point.y - level_radius) // size
+            max_cell_y = (point.y + level_radius) // size
+            for cell_x in range(min_cell_x, max_cell_x + 1):
+                for cell_y in range(min_cell_y, max_cell_y + 1):
+                    bucket = self._buckets.get((z, cell_x, cell_y))
+                    if bucket is None:
+                        continue
+                    for identifier, thing in bucket.items():
+                        other = self._positions[identifier]
+                        distance = abs(other.x - point.x) + \
+                            abs(other.y - point.y) + abs(other.z - point.z)
+                        if distance <= radius:
+                            found.append((distance, thing))
+
+        found.sort(key=lambda pair: pair[0])
+        return found
+
+    def k_nearest(self, point: Point, k: int) -> [(int, object)]:
+        """
+        Finds the k nearest things on the same dungeon level as the point.
+
+        Searches rings of grid cells outwards from the point, stopping as soon
+        as nothing in an unvisited ring could be nearer than what we already have.
+
+        Returns:
+            [(distance, thing)] : At most k entries, nearest first.
+        """
+        level_total = self._count_by_level.get(point.z, 0)
+        if k <= 0 or level_total == 0:
+            return []
+
+        size = self._cell_size
+        (z, centre_x, centre_y) = self._cell_of(point)
+        candidates = []
+        seen = 0
+        ring = 0
+        while seen < level_total:
+            for (cell_x, cell_y) in self._ring_cells(centre_x, centre_y, ring):
+                bucket = self._buckets.get((z, cell_x, cell_y))
+                if bucket is None:
+                    continue
+                for identifier, thing in bucket.items():
+                    seen += 1
+                    other = self._positions[identifier]
+                    distance = abs(other.x - point.x) + abs(other.y - point.y)
+                    candidates.append((distance, seen, thing))
+
+            # Anything outside the rings searched so far is at least this far away.
+            nearest_unsearched = min(
+                point.x - (centre_x - ring) * size,
+                (centre_x + ring + 1) * size - point.x,
+                point.y - (centre_y - ring) * size,
+                (centre_y + ring + 1) * size - point.y)
+            if len(candidates) >= k:
+                kth_distance = heapq.nsmallest(k, candidates)[-1][0]
+                if kth_distance <= nearest_unsearched:
+                    break
+            ring += 1
+
+        nearest = heapq.nsmallest(k, candidates)
+        return [(distance, thing) for (distance, _, thing) in nearest]
+
+    @staticmethod
+    def _ring_cells(centre_x: int, centre_y: int, ring: int):
+        """
+        Yields the grid cells which are exactly 'ring' cells away from the centre
+        (chebyshev distance), ie: the outline of a square.
+        """
+        if ring == 0:
+            yield (centre_x, centre_y)
+            return
+        for cell_x in range(centre_x - ring, centre_x + ring + 1):
+            yield (cell_x, centre_y - ring)
+            yield (cell_x, centre_y + ring)
+        for cell_y in range(centre_y - ring + 1, centre_y + ring):
+            yield (centre_x - ring, cell_y)
+            yield (centre_x + ring, cell_y)
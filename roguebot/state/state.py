@@ -8,11 +8,14 @@ Note:
 """
 import json
 import logging
+import time
 
 from ..navigation.point import Point
 from .entity import Entities, Entity
 from .item import Items
 from .dungeon_map import DungeonMap
+from .state_changes import ChangeJournal, StateTopic
+from .message_log import MessageLog
 
 
 class State():
@@ -25,7 +28,8 @@ class State():
                  dungeon_map: DungeonMap = None,
                  entities: Entities = None,
                  items: Items = None,
-                 my_entity_id: str = None):
+                 my_entity_id: str = None,
+                 clock=time.monotonic):
         """
         Construct a state.
 
@@ -40,6 +44,9 @@ class State():
                 or an empty Items object if not specified or None.
             my_identity_id (str): The unique identity of the bot's own entity,
                 which also should appear in the Entities object collection.
+            clock : Gives the time in seconds. Everything which remembers
+                when something happened, or measures how long ago it was,
+                uses this. Defaults to time.monotonic
 
         """
         self._character_name = name
@@ -49,15 +56,45 @@ class State():
         else:
             self._entities = entities
 
+        self._clock = clock
         if items is None:
-            self._items = Items()
+            self._items = Items(clock=clock)
         else:
             self._items = items
 
         self._my_entity_id = my_entity_id
-        self._messages = list()
+        self._messages = MessageLog()
+        self._changes = ChangeJournal()
+        self._navigation = None
         self._logger = logging.getLogger(__name__)
 
+    @property
+    def clock(self):
+        """
+        Gives the time in seconds. See the constructor.
+        """
+        return self._clock
+
+    @property
+    def changes(self) -> ChangeJournal:
+        """
+        The journal of what has changed in this state.
+        Subscribe to it, or watch it, to find out when things change.
+        """
+        return self._changes
+
+    @property
+    def navigation(self):
+        """
+        The NavigationService for finding paths around this state's dungeon.
+        Created the first time it is asked for, then shared by all the goals.
+        """
+        if self._navigation is None:
+            # Imported here, as the navigation package needs to import State.
+            from ..navigation.navigation_service import NavigationService
+            self._navigation = NavigationService()
+        return self._navigation
+
     def find_my_entity(self) -> Entity:
         """
         Use the my_entity_id property within the state to find the
@@ -67,7 +104,10 @@ class State():
         return me
 
     @property
-    def messages(self):
+    def messages(self) -> MessageLog:
+        """
+        The most recent messages from the server, oldest first.
+        """
         return self._messages
 
     @property
@@ -77,6 +117,7 @@ class State():
     @items.setter
     def items(self, new_items):
         self._items = new_items
+        self._changes.record(StateTopic.ITEMS_CHANGED)
 
     @property
     def my_entity_id(self):
@@ -99,6 +140,7 @@ class State():
         """
         self._logger.debug("My entity id is now set to %s", entity_id)
         self._my_entity_id = entity_id
+        self._changes.record(StateTopic.MY_ENTITY_CHANGED, entity_id=entity_id)
 
     @property
     def dungeon_map(self):
@@ -107,6 +149,7 @@ class State():
     @dungeon_map.setter
     def dungeon_map(self, new_map):
         self._dungeon_map = new_map
+        self._changes.record(StateTopic.MAP_REPLACED)
 
     @property
     def entities(self):
@@ -115,19 +158,109 @@ class State():
     @entities.setter
     def entities(self, entities):
         self._entities = entities
+        self._changes.record(StateTopic.ENTITIES_REPLACED)
 
-    def update_items(self, items_data):
+    def update_items(self, items_data, level: int = None):
         """
         Information about items has just arrived
+
+        Parameters:
+            items_data (dict): Every item on one floor.
+            level (int): Optional. The floor they are on. Defaults to
+                the floor we are on now.
+
+        Returns:
+            bool : True if the items on that floor changed.
+        """
+        if level is None:
+            # Find myself in the list of entities.
+            # As we want to delete every item from our current dungeon level
+            # and have them replaced.
+            me = self.find_my_entity()
+            if me is None:
+                # We don't know which floor they are on.
+                self._logger.debug("Items ignored, as we aren't in the cave")
+                return False
+            changed = self._items.update_items(items_data, me.position)
+            level = me.position.z
+        else:
+            changed = self._items.update_items(items_data, level=level)
+        if changed:
+            self._changes.record(StateTopic.ITEMS_CHANGED, floor=level)
+        return changed
+
+    def evict_item_floors(self, max_floors: int, max_age_seconds: float,
+                          now: float = None) -> [int]:
         """
-        # Find myself in the list of entities.
-        # As we want to delete every item from our current dungeon level
-        # and have them replaced.
+        Forgets about items on floors we left a while ago.
+        The floor we are on is always kept.
+
+        Returns:
+            [int] : The floors whose items were forgotten.
+        """
+        if now is None:
+            now = self._clock()
         me = self.find_my_entity()
-        self._items.update_items(items_data, me.position)
+        current_floor = None if me is None else me.position.z
+        evicted = self._items.evict_floors(
+            current_floor, max_floors, max_age_seconds, now)
+        for level in evicted:
+            self._changes.record(StateTopic.ITEMS_CHANGED, floor=level)
+        return evicted
 
     def update_position(self, identifier: str, position: Point):
         """
         Updates the position of the entity who's id is specifed.
         """
         self._entities.update_position(identifier, position)
+        self._changes.record(StateTopic.ENTITY_MOVED,
+                             entity_id=identifier, detail=position)
+        self._record_if_me(identifier)
+
+    def update_entity(self, entity: Entity):
+        """
+        A new version of an entity has arrived. Replaces the one we have,
+        or adds it if we didn't know about it before.
+        """
+        identifier = entity.entity_id
+        if self._entities.get_by_id(identifier) is None:
+            topic = StateTopic.ENTITY_ADDED
+        else:
+            topic = StateTopic.ENTITY_UPDATED
+        self._entities.update(entity)
+        self._changes.record(topic, entity_id=identifier)
+        self._record_if_me(identifier)
+
+    def delete_entity_by_id(self, identifier: str):
+        """
+        Forgets about the entity with the specified identifier.
+        """
+        if self._entities.get_by_id(identifier) is not None:
+            self._entities.delete_by_id(identifier)
+            self._changes.record(StateTopic.ENTITY_REMOVED,
+                                 entity_id=identifier)
+            self._record_if_me(identifier)
+
+    def delete_entity_at_position(self, position: Point):
+        """
+        Forgets about whichever entities are at a position.
+        """
+        identifiers = [entity.entity_id
+                       for entity in self._entities.get_by_position(position)]
+        self._entities.delete_at_position(position)
+        for identifier in identifiers:
+            self._changes.record(StateTopic.ENTITY_REMOVED,
+                                 entity_id=identifier, detail=position)
+            self._record_if_me(identifier)
+
+    def add_message(self, message: str):
+        """
+        Remembers a message sent to us by the server.
+        """
+        self._messages.append(message)
+        self._changes.record(StateTopic.MESSAGE_ADDED, detail=message)
+
+    def _record_if_me(self, identifier: str):
+        if identifier is not None and identifier == self._my_entity_id:
+            self._changes.record(StateTopic.MY_ENTITY_CHANGED,
+                                 entity_id=identifier)
@@ -0,0 +1,247 @@
+"""
+A journal of what has changed in the State, so brains, goals and caches can
+avoid doing work when nothing they depend upon has changed.
+
+Note:
+    The `State` records a change here whenever it is changed by the `Client`.
+    Interested parties either subscribe to the topics they care about, or
+    use a `ChangeWatcher` to ask "has anything I care about changed since I
+    last looked ?"
+"""
+import collections
+import logging
+from enum import Enum
+
+
+class StateTopic(Enum):
+    """
+    The kinds of change which can happen to the state.
+    """
+    MAP_REPLACED = "map_replaced"
+    ENTITIES_REPLACED = "entities_replaced"
+    ENTITY_ADDED = "entity_added"
+    ENTITY_REMOVED = "entity_removed"
+    ENTITY_MOVED = "entity_moved"
+    ENTITY_UPDATED = "entity_updated"
+    ITEMS_CHANGED = "items_changed"
+    MY_ENTITY_CHANGED = "my_entity_changed"
+    MESSAGE_ADDED = "message_added"
+
+
+ENTITY_TOPICS = frozenset([
+    StateTopic.ENTITIES_REPLACED,
+    StateTopic.ENTITY_ADDED,
+    StateTopic.ENTITY_REMOVED,
+    StateTopic.ENTITY_MOVED,
+    StateTopic.ENTITY_UPDATED,
+    StateTopic.MY_ENTITY_CHANGED
+])
+"""
+Every topic which says something about the entities changed.
+"""
+
+
+class StateChange:
+    """
+    One change to the state.
+    """
+
+    __slots__ = ('_sequence', '_topic', '_entity_id', '_floor', '_detail')
+
+    def __init__(self, sequence: int, topic: StateTopic,
+                 entity_id: str = None, floor: int = None, detail=None):
+        self._sequence = sequence
+        self._topic = topic
+        self._entity_id = entity_id
+        self._floor = floor
+        self._detail = detail
+
+    @property
+    def sequence(self) -> int:
+        """
+        Each change gets the next number in sequence, starting at 1.
+        """
+        return self._sequence
+
+    @property
+    def topic(self) -> StateTopic:
+        return self._topic
+
+    @property
+    def entity_id(self) -> str:
+        """
+        Which entity changed, for the entity topics. Otherwise None.
+        """
+        return self._entity_id
+
+    @property
+    def floor(self) -> int:
+        """
+        Which dungeon level the items changed on, or None if we don't know.
+        """
+        return self._floor
+
+    @property
+    def detail(self):
+        """
+        Anything else worth knowing. eg: The new position of an entity,
+        or the text of a message.
+        """
+        return self._detail
+
+    def __str__(self):
+        return "StateChange(sequence=%s topic=%s entity_id=%s floor=%s detail=%s)" % (
+            self._sequence, self._topic.name, self._entity_id, self._floor, self._detail)
+
+    def __repr__(self):
+        return str(self)
+
+
+class ChangeJournal:
+    """
+    Records the most recent changes to the state, and tells subscribers
+    about each change as it happens.
+
+    Only the most recent changes are kept, so the journal doesn't grow
+    forever. The sequence number of the latest change for each topic is
+    always kept, so "has this topic changed since ?" can always be answered.
+    """
+
+    DEFAULT_CAPACITY = 256
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        """
+        Parameters:
+            capacity (int): How many recent changes to remember.
+        """
+        self._logger = logging.getLogger(__name__)
+        self._recent_changes = collections.deque(maxlen=max(int(capacity), 1))
+        self._sequence = 0
+        self._last_sequence_by_topic = {}
+
+        # subscription token -> (callback, frozenset of topics or None for all)
+        self._subscribers = {}
+        self._next_token = 1
+
+    @property
+    def sequence(self) -> int:
+        """
+        The sequence number of the latest change. 0 if nothing has changed yet.
+        """
+        return self._sequence
+
+    def last_sequence_of(self, topics) -> int:
+        """
+        The sequence number of the latest change to any of the topics.
+
+        Parameters:
+            topics ([StateTopic]): The topics we are interested in.
+
+        Returns:
+            int : 0 if none of the topics have ever changed.
+        """
+        latest = 0
+        for topic in topics:
+            sequence = self._last_sequence_by_topic.get(topic, 0)
+            if sequence > latest:
+                latest = sequence
+        return latest
+
+    def record(self, topic: StateTopic, entity_id: str = None,
+               floor: int = None, detail=None) -> StateChange:
+        """
+        Something in the state has changed. Tell everyone who is interested.
+        """
+        self._sequence += 1
+        change = StateChange(self._sequence, topic,
+                             entity_id=entity_id, floor=floor, detail=detail)
+        self._recent_changes.append(change)
+        self._last_sequence_by_topic[topic] = self._sequence
+
+        for (callback, topics) in list(self._subscribers.values()):
+            if topics is None or topic in topics:
+                try:
+                    callback(change)
+                except Exception:
+                    self._logger.exception(
+                        "Subscriber failed to handle %s", change)
+        return change
+
+    def subscribe(self, callback, topics=None) -> int:
+        """
+        Ask to be told about changes as they happen.
+
+        Parameters:
+            callback (function): Called with each StateChange.
+            topics ([StateTopic]): Optional. Only these topics are passed
+                to the callback. All topics if None.
+
+        Returns:
+            int : A token to pass to `unsubscribe`.
+        """
+        token = self._next_token
+        self._next_token += 1
+        wanted = None if topics is None else frozenset(topics)
+        self._subscribers[token] = (callback, wanted)
+        return token
+
+    def unsubscribe(self, token: int) -> None:
+        self._subscribers.pop(token, None)
+
+    def changes_since(self, sequence: int, topics=None) -> [StateChange]:
+        """
+        The changes which happened after a sequence number.
+
+        Parameters:
+            sequence (int): The last sequence number already seen.
+            topics ([StateTopic]): Optional. Only return changes to these topics.
+
+        Returns:
+            [StateChange] : Oldest first. Or None if some of the changes
+                asked for have already been forgotten, in which case
+                the caller should assume everything has changed.
+        """
+        if sequence >= self._sequence:
+            return []
+        if len(self._recent_changes) == 0 or \
+                self._recent_changes[0].sequence > sequence + 1:
+            return None
+        wanted = None if topics is None else frozenset(topics)
+        return [change for change in self._recent_changes
+                if change.sequence > sequence and
+                (wanted is None or change.topic in wanted)]
+
+
+class ChangeWatcher:
+    """
+    A dirty flag over a set of topics.
+
+    Ask `is_dirty(journal)` before doing some work, and call
+    `mark_clean(journal)` after doing it. Looking at a different
+    journal (ie: a different State) always counts as dirty.
+    """
+
+    def __init__(self, topics):
+        """
+        Parameters:
+            topics ([StateTopic]): The topics the work depends upon.
+        """
+        self._topics = frozenset(topics)
+        self._journal = None
+        self._seen_sequence = 0
+
+    def is_dirty(self, journal: ChangeJournal) -> bool:
+        if journal is not self._journal:
+            return True
+        return journal.last_sequence_of(self._topics) > self._seen_sequence
+
+    def mark_clean(self, journal: ChangeJournal) -> None:
+        self._journal = journal
+        self._seen_sequence = journal.sequence
+
+    def reset(self) -> None:
+        """
+        Forget what we have seen, so the next check is dirty.
+        """
+        self._journal = None
+        self._seen_sequence = 0
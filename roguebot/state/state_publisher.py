@@ -0,0 +1,145 @@
+"""
+Publishes small read-only records of the State, so that other threads
+(like the HTTP server's) can see how far the bot has got without locks,
+and without touching the live state.
+
+Note:
+    The `Client` changes the live `State` on the event loop thread.
+    Each time it acts, the `Bot` publishes a snapshot of it here.
+    A snapshot holds version numbers and a few facts about the bot,
+    never copies of the entities, items or messages, so publishing one
+    costs the same however big the state gets.
+    Readers call `current` to get the latest snapshot, which never changes
+    after it has been published.
+"""
+import logging
+import time
+
+from ..navigation.point import Point
+from .state import State
+
+
+class StateSnapshot:
+    """
+    One published version of the state.
+
+    Nobody changes it after it is published, so it can be read from any
+    thread.
+    """
+
+    __slots__ = ('_version', '_published_at', '_my_position',
+                 '_entity_count', '_item_count')
+
+    def __init__(self, version: int, published_at: float,
+                 my_position: Point = None, entity_count: int = 0,
+                 item_count: int = 0):
+        self._version = version
+        self._published_at = published_at
+        self._my_position = my_position
+        self._entity_count = entity_count
+        self._item_count = item_count
+
+    @property
+    def version(self) -> int:
+        """
+        Goes up by one every time a different state is published.
+        Zero means nothing has been published yet.
+        """
+        return self._version
+
+    @property
+    def published_at(self) -> float:
+        """
+        When this snapshot was published, from time.monotonic()
+        """
+        return self._published_at
+
+    @property
+    def my_position(self) -> Point:
+        """
+        Where the bot was, or None if it wasn't among the entities.
+        """
+        return self._my_position
+
+    @property
+    def entity_count(self) -> int:
+        return self._entity_count
+
+    @property
+    def item_count(self) -> int:
+        return self._item_count
+
+    def summary(self) -> dict:
+        return {
+            "version": self._version,
+            "position": None if self._my_position is None else str(self._my_position),
+            "entities": self._entity_count,
+            "items": self._item_count
+        }
+
+
+class StatePublisher:
+    """
+    Publishes a new StateSnapshot whenever the live State has changed.
+
+    Changes are spotted from the version numbers of the entities, items and
+    messages, and from which map and entity id the state holds. If nothing
+    has changed at all, no new version is published.
+
+    Publishing is done by swapping a single reference, so readers on other
+    threads always see either the old snapshot or the new one, never half
+    of each.
+    """
+
+    def __init__(self):
+        self._logger = logging.getLogger(__name__)
+        self._current = StateSnapshot(0, time.monotonic())
+        self._parts_seen = None
+        self._versions_seen = None
+
+    @property
+    def current(self) -> StateSnapshot:
+        """
+        The latest snapshot. Safe to call from any thread.
+        """
+        return self._current
+
+    @property
+    def version(self) -> int:
+        return self._current.version
+
+    def publish(self, state: State) -> StateSnapshot:
+        """
+        Publishes a snapshot of the live state, if it has changed.
+
+        Must be called from the thread which changes the live state.
+
+        Parameters:
+            state (State): The live state.
+
+        Returns:
+            StateSnapshot : The snapshot which is now current.
+        """
+        parts = (state.entities, state.items, state.messages,
+                 state.dungeon_map)
+        versions = (state.entities.version, state.items.version,
+                    state.messages.version, state.my_entity_id)
+        if self._parts_seen is not None \
+                and all(seen is now for (seen, now) in zip(self._parts_seen, parts)) \
+                and self._versions_seen == versions:
+            # Nothing has changed.
+            return self._current
+        # The parts themselves are remembered as well as their versions, as
+        # the client can replace one with a new one at the same version.
+        self._parts_seen = parts
+        self._versions_seen = versions
+
+        me = state.find_my_entity()
+        version = self._current.version + 1
+        self._current = StateSnapshot(
+            version, time.monotonic(),
+            my_position=None if me is None else me.position,
+            entity_count=len(state.entities),
+            item_count=len(state.items))
+        self._logger.debug("Published state version %s", version)
+        return self._current
@@ -0,0 +1,239 @@
+"""
+Decides which server 'ping' ticks the bot acts on, and how many moves
+it makes each time it acts.
+"""
+
+import math
+from abc import ABC, abstractmethod
+
+
+class TickScheduler(ABC):
+    """
+    Told about every tick, how long deciding takes, and how moves fare,
+    and decides when the bot acts.
+
+    Move outcomes arrive from the client as the server confirms or loses moves.
+    """
+
+    def observe_tick(self, now: float) -> None:
+        """ A ping has arrived from the server at time 'now' (seconds). """
+
+    def observe_decision(self, seconds: float) -> None:
+        """ The brain took this long to decide what to do. """
+
+    def observe_move_rtt(self, seconds: float) -> None:
+        """ The server confirmed a move this long after it was sent. """
+
+    def observe_moves_lost(self, count: int) -> None:
+        """ The server didn't do some moves we sent. """
+
+    @abstractmethod
+    def should_act(self) -> bool:
+        """
+        Called once per tick, after observe_tick.
+
+        Returns:
+            bool : True if the bot should act on this tick.
+        """
+
+    @property
+    @abstractmethod
+    def moves_per_act(self) -> int:
+        """ The most moves to make each time the bot acts. """
+
+    @abstractmethod
+    def summary(self) -> dict:
+        """ What the scheduler is doing, for the bot's status.
+        Includes "acts", the number of times the bot has acted.
+        """
+
+
+class FixedTickScheduler(TickScheduler):
+    """
+    Acts once every 11-speed ticks, making up to actions_per_turn moves each time.
+    """
+
+    def __init__(self, speed: int = 5, actions_per_turn: int = 1):
+        self._ignore_ticks_before_act = 11 - speed
+        self._moves_per_act = max(actions_per_turn, 1)
+        self._tick_count = 0
+        self._acts_count = 0
+
+    def should_act(self) -> bool:
+        is_acting = self._tick_count >= self._ignore_ticks_before_act
+        if is_acting:
+            self._tick_count = 0
+            self._acts_count += 1
+        self._tick_count += 1
+        return is_acting
+
+    @property
+    def moves_per_act(self) -> int:
+        return self._moves_per_act
+
+    def summary(self) -> dict:
+        return {
+            "mode": "fixed",
+            "act_every_ticks": self._ignore_ticks_before_act,
+            "moves_per_act": self._moves_per_act,
+            "acts": self._acts_count
+        }
+
+
+class AdaptiveTickScheduler(TickScheduler):
+    """
+    Chooses how often to act, and how many moves to make each time, from
+    what it measures:
+
+    - Deciding what to do shouldn't take more than cpu_budget of the time
+      between pings, so the bot acts less often if deciding is slow.
+    - Moves sent but not yet confirmed shouldn't exceed max_moves_in_flight.
+      By Little's law, that's (moves per act / time between acts) * round trip
+      time, so the bot acts less often when the server is slow to confirm moves.
+    - The number of moves per act grows by one after every
+      increase_after_confirmed moves the server confirms, and halves
+      whenever moves are lost. (Additive increase, multiplicative decrease.)
+
+    Everything is kept within the bounds given.
+    """
+
+    DEFAULT_CPU_BUDGET = 0.5
+    DEFAULT_MAX_MOVES_IN_FLIGHT = 8
+    DEFAULT_INCREASE_AFTER_CONFIRMED = 8
+    SMOOTHING = 0.2
+
+    def __init__(self,
+                 min_act_every_ticks: int = 1,
+                 max_act_every_ticks: int = 10,
+                 min_moves_per_act: int = 1,
+                 max_moves_per_act: int = 1,
+                 cpu_budget: float = DEFAULT_CPU_BUDGET,
+                 max_moves_in_flight: int = DEFAULT_MAX_MOVES_IN_FLIGHT,
+                 increase_after_confirmed: int = DEFAULT_INCREASE_AFTER_CONFIRMED):
+        """
+        Parameters:
+            min_act_every_ticks (int): The most often the bot may act.
+                1 means on every tick.
+            max_act_every_ticks (int): The least often the bot acts.
+            min_moves_per_act (int): The fewest moves per act.
+            max_moves_per_act (int): The most moves per act.
+            cpu_budget (float): The fraction of the time between pings
+                which may be spent deciding.
+            max_moves_in_flight (int): The most moves we'd like waiting to be
+                confirmed by the server.
+            increase_after_confirmed (int): How many confirmed moves it takes
+                to add one to the moves per act.
+        """
+        self._min_act_every_ticks = max(min_act_every_ticks, 1)
+        self._max_act_every_ticks = max(max_act_every_ticks, self._min_act_every_ticks)
+        self._min_moves_per_act = max(min_moves_per_act, 1)
+        self._max_moves_per_act = max(max_moves_per_act, self._min_moves_per_act)
+        self._cpu_budget = cpu_budget
+        self._max_moves_in_flight = max(max_moves_in_flight, 1)
+        self._increase_after_confirmed = max(increase_after_confirmed, 1)
+
+        # Smoothed measurements, in seconds. None until measured.
+        self._last_tick_at = None
+        self._tick_interval = None
+        self._decision_seconds = None
+        self._move_rtt = None
+
+        self._act_every_ticks = self._min_act_every_ticks
+        self._moves_per_act = self._min_moves_per_act
+        self._confirmed_since_increase = 0
+        self._ticks_since_act = None
+        self._acts_count = 0
+
+    @staticmethod
+    def _smooth(average: float, sample: float) -> float:
+        if average is None:
+            return sample
+        return average + AdaptiveTickScheduler.SMOOTHING * (sample - average)
+
+    def observe_tick(self, now: float) -> None:
+        if self._last_tick_at is not None and now > self._last_tick_at:
+            self._tick_interval = self._smooth(
+                self._tick_interval, now - self._last_tick_at)
+        self._last_tick_at = now
+
+    def observe_decision(self, seconds: float) -> None:
+        self._decision_seconds = self._smooth(self._decision_seconds, seconds)
+
+    def observe_move_rtt(self, seconds: float) -> None:
+        self._move_rtt = self._smooth(self._move_rtt, seconds)
+        self._confirmed_since_increase += 1
+        if self._confirmed_since_increase >= self._increase_after_confirmed:
+            self._confirmed_since_increase = 0
+            self._moves_per_act = min(self._moves_per_act + 1,
+                                      self._max_moves_per_act)
+
+    def observe_moves_lost(self, count: int) -> None:
+        if count > 0:
+            self._confirmed_since_increase = 0
+            self._moves_per_act = max(self._moves_per_act // 2,
+                                      self._min_moves_per_act)
+
+    def _choose_act_every_ticks(self) -> int:
+        if self._tick_interval is None:
+            return self._act_every_ticks
+        ticks = self._min_act_every_ticks
+        if self._decision_seconds is not None:
+            ticks = max(ticks, math.ceil(
+                self._decision_seconds / (self._cpu_budget * self._tick_interval)))
+        if self._move_rtt is not None:
+            ticks = max(ticks, math.ceil(
+                self._moves_per_act * self._move_rtt /
+                (self._max_moves_in_flight * self._tick_interval)))
+        return min(ticks, self._max_act_every_ticks)
+
+    def should_act(self) -> bool:
+        self._act_every_ticks = self._choose_act_every_ticks()
+        if self._ticks_since_act is not None:
+            self._ticks_since_act += 1
+            if self._ticks_since_act < self._act_every_ticks:
+                return False
+        self._ticks_since_act = 0
+        self._acts_count += 1
+        return True
+
+    @property
+    def act_every_ticks(self) -> int:
+        return self._act_every_ticks
+
+    @property
+    def moves_per_act(self) -> int:
+        return self._moves_per_act
+
+    def summary(self) -> dict:
+        return {
+            "mode": "adaptive",
+            "act_every_ticks": self._act_every_ticks,
+            "moves_per_act": self._moves_per_act,
+            "acts": self._acts_count,
+            "tick_interval_seconds": self._tick_interval,
+            "decision_seconds": self._decision_seconds,
+            "move_rtt_seconds": self._move_rtt
+        }
+
+
+def create_tick_scheduler(mode: str, speed: int, actions_per_turn: int) -> TickScheduler:
+    """
+    Creates the scheduler asked for by name.
+
+    Parameters:
+        mode (str): "fixed" acts every 11-speed ticks, making up to
+            actions_per_turn moves each time. "adaptive" chooses for itself,
+            but never acts more often than every 11-speed ticks, and makes
+            between 1 and actions_per_turn moves each time.
+        speed (int): 1-10. 10 is the fastest.
+        actions_per_turn (int): The most moves to make each time the bot acts.
+
+    Returns:
+        TickScheduler : The scheduler.
+    """
+    if mode == "fixed":
+        return FixedTickScheduler(speed, actions_per_turn)
+    # The speed still says how fast the bot may go, so anyone slowing it
+    # down to watch it still can.
+    return AdaptiveTickScheduler(min_act_every_ticks=11 - speed,
+                                 max_moves_per_act=actions_per_turn)
@@ -0,0 +1,136 @@
+"""
+Records the events which arrive from the server, so odd behaviour can be
+looked into afterwards, without slowing the bot down when it's turned off.
+"""
+
+import json
+import logging
+import logging.handlers
+import random
+import time
+
+
+class WireTracer:
+    """
+    Writes one line of json per event received from the server, to a file
+    which is rolled over when it gets too big.
+
+    Each line holds the event name, a time.monotonic() timestamp, the size
+    of the payload, and optionally the start of the payload itself.
+
+    Busy events can be sampled, so only a fraction of them are written.
+    Payloads are only turned into json when a line is going to be written.
+
+    When there is no file to write to, the tracer is disabled. Callers
+    should check `enabled` before calling `trace`, so nothing at all is
+    done with the event data:
+
+        if tracer.enabled:
+            tracer.trace('update', data)
+
+    Parameters:
+        file_path (str): The file to write to. None disables tracing.
+        sample_rates (dict): Event name -> the fraction (0.0-1.0) of those
+            events to write. Events not mentioned use default_sample_rate.
+        default_sample_rate (float): The fraction of other events to write.
+        payload_bytes (int): How much of each payload to write. 0 writes
+            no payload, only its size.
+        max_bytes (int): The size the file can get to before it is rolled over.
+        backup_count (int): How many rolled-over files to keep.
+    """
+
+    DEFAULT_PAYLOAD_BYTES = 256
+    DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+    DEFAULT_BACKUP_COUNT = 3
+
+    def __init__(self,
+                 file_path: str = None,
+                 sample_rates: dict = None,
+                 default_sample_rate: float = 1.0,
+                 payload_bytes: int = DEFAULT_PAYLOAD_BYTES,
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 backup_count: int = DEFAULT_BACKUP_COUNT,
+                 clock=time.monotonic,
+                 rng=random.random):
+        self._file_path = file_path
+        self._sample_rates = dict(sample_rates or {})
+        self._default_sample_rate = default_sample_rate
+        self._payload_bytes = max(int(payload_bytes), 0)
+        self._clock = clock
+        self._rng = rng
+
+        self._written_count = 0
+        self._skipped_count = 0
+
+        self._handler = None
+        self._trace_logger = None
+        if file_path is not None:
+            self._handler = logging.handlers.RotatingFileHandler(
+                file_path, maxBytes=max_bytes, backupCount=backup_count,
+                encoding='utf-8', delay=True)
+            self._handler.setFormatter(logging.Formatter("%(message)s"))
+            # A logger of our own, rather than one from logging.getLogger(),
+            # so trace lines never end up in the normal log as well.
+            self._trace_logger = logging.Logger(__name__, logging.INFO)
+            self._trace_logger.addHandler(self._handler)
+
+    @property
+    def enabled(self) -> bool:
+        return self._trace_logger is not None
+
+    @property
+    def written_count(self) -> int:
+        return self._written_count
+
+    @property
+    def skipped_count(self) -> int:
+        """ How many events were left out by sampling. """
+        return self._skipped_count
+
+    @staticmethod
+    def parse_sample_rates(raw_rates: str) -> dict:
+        """
+        Turns "update=0.1,position=0.01" into {"update": 0.1, "position": 0.01}
+        """
+        rates = {}
+        if raw_rates is None:
+            return rates
+        for part in raw_rates.split(','):
+            part = part.strip()
+            if len(part) == 0:
+                continue
+            (event_name, _, raw_rate) = part.partition('=')
+            rates[event_name.strip()] = min(max(float(raw_rate), 0.0), 1.0)
+        return rates
+
+    def trace(self, event_name: str, data=None) -> bool:
+        """
+        Writes a line for this event, unless it is sampled out.
+
+        Returns:
+            bool : True if a line was written.
+        """
+        if self._trace_logger is None:
+            return False
+
+        rate = self._sample_rates.get(event_name, self._default_sample_rate)
+        if rate < 1.0 and (rate <= 0.0 or self._rng() >= rate):
+            self._skipped_count += 1
+            return False
+
+        payload = json.dumps(data, separators=(',', ':'), default=str)
+        record = {
+            "event": event_name,
+            "t": self._clock(),
+            "size": len(payload)
+        }
+        if self._payload_bytes > 0:
+            record["sample"] = payload[:self._payload_bytes]
+
+        self._trace_logger.info(json.dumps(record, separators=(',', ':')))
+        self._written_count += 1
+        return True
+
+    def close(self) -> None:
+        if self._handler is not None:
+            self._handler.close()
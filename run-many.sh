@@ -1,26 +1,26 @@
 #!/usr/bin/env bash
 
-export ROGUELIKE_SERVER_URL="http://localhost:3000"
-#export ROGUELIKE_SERVER_URL="http://cave1-roguelike.apps.kaverns.cp.fyre.ibm.com/"
+export K_AND_K_SERVER_URL="http://localhost:3000"
+#export K_AND_K_SERVER_URL="http://cave1-roguelike.apps.kaverns.cp.fyre.ibm.com/"
 
 # Pick up some environment settings which are shared with other ways of running the bot.
 . ./runtime-env-settings.sh
 
-# Invoke the roguebot python package. In effect, this calls the `__main__.py` module in the `roguebot` package.
-export players=2
-export ROGUELIKE_DEBUG="False"
+# How many bots to play, and how many processes to spread them over.
+# 0 workers means one process per CPU core.
+export K_AND_K_BOT_FLEET_SIZE=2
+export K_AND_K_BOT_FLEET_WORKERS=0
+export K_AND_K_BOT_DEBUG="False"
 
-for ((i=0; i<$players; i++)) 
-do 
-    echo "ROGUELIKE_BOT_HTTP_SERVER_PORT : ${ROGUELIKE_BOT_HTTP_SERVER_PORT}"
-    python -m roguebot 2>&1 & 
-    export ROGUELIKE_BOT_HTTP_SERVER_PORT=$((${ROGUELIKE_BOT_HTTP_SERVER_PORT}+1))
-done
+# Invoke the fleet supervisor. It starts the worker processes, restarts any which crash,
+# and reports on all the bots through one HTTP server on K_AND_K_BOT_HTTP_SERVER_PORT.
+echo "K_AND_K_BOT_HTTP_SERVER_PORT : ${K_AND_K_BOT_HTTP_SERVER_PORT}"
+python -m roguebot.fleet 2>&1 &
+supervisor_pid=$!
 
 echo "Hit enter to stop things"
 read var1
 
-for ((i = 0; i < $players; i++)) 
-do 
-    kill $i ; 
-done
+# The supervisor stops its workers when it is told to stop.
+kill $supervisor_pid
+wait $supervisor_pid
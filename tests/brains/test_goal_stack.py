@@ -0,0 +1,94 @@
+import pytest
+from assertpy import assert_that
+from roguebot.brains.goal_stack import GoalStack
+from roguebot.goals.goal import Goal
+from roguebot.goals.attack_goal import AttackEntity
+from roguebot.goals.seek_point_goal import SeekPointGoal
+from roguebot.goals.choose_goal import ChooseGoalGoal
+
+
+def test_behaves_like_a_list():
+    first = Goal()
+    second = Goal()
+    goals = GoalStack()
+    goals.append(first)
+    goals.append(second)
+
+    assert_that(goals).is_length(2)
+    assert_that(goals[-1]).is_same_as(second)
+    assert_that(goals == [first, second]).is_true()
+    assert_that(goals.pop()).is_same_as(second)
+    assert_that(list(goals)).is_equal_to([first])
+
+
+def test_pushing_a_goal_twice_moves_it_to_the_top():
+    first = Goal()
+    second = Goal()
+    goals = GoalStack([first, second])
+
+    goals.append(first)
+
+    assert_that(list(goals)).is_equal_to([second, first])
+
+
+def test_oldest_goals_are_dropped_beyond_max_depth():
+    oldest = Goal()
+    goals = GoalStack([oldest], max_depth=3)
+    for _ in range(3):
+        goals.append(Goal())
+
+    assert_that(goals).is_length(3).does_not_contain(oldest)
+    assert_that(goals.dropped_count).is_equal_to(1)
+
+
+def test_contains_type_includes_subclasses():
+    goals = GoalStack()
+    attack = AttackEntity()
+    goals.append(attack)
+
+    assert_that(goals.contains_type(SeekPointGoal)).is_true()
+    assert_that(goals.contains_type(ChooseGoalGoal)).is_false()
+
+    goals.remove(attack)
+    assert_that(goals.contains_type(SeekPointGoal)).is_false()
+
+
+def test_normal_goals_never_go_above_urgent_ones():
+    attack = AttackEntity()
+    choose = ChooseGoalGoal()
+    goals = GoalStack()
+    goals.push(attack, GoalStack.URGENT)
+
+    goals.push(choose)
+    assert_that(goals[-1]).is_same_as(attack)
+
+    # Sub-goals pushed by the urgent goal run before it resumes.
+    sub_goal = Goal()
+    goals.append(sub_goal)
+    assert_that(goals[-1]).is_same_as(sub_goal)
+
+
+def test_push_unless_active_promotes_the_existing_goal():
+    existing = AttackEntity()
+    goals = GoalStack([existing, ChooseGoalGoal()])
+
+    on_top = goals.push_unless_active(AttackEntity())
+
+    assert_that(on_top).is_same_as(existing)
+    assert_that(goals).is_length(2)
+    assert_that(goals[-1]).is_same_as(existing)
+
+
+def test_push_replacing_leaves_only_the_new_goal_of_that_class():
+    goals = GoalStack([ChooseGoalGoal(), Goal(), ChooseGoalGoal()])
+    newest = ChooseGoalGoal()
+
+    goals.push_replacing(newest)
+
+    assert_that(goals).is_length(2)
+    assert_that(goals[-1]).is_same_as(newest)
+
+
+def test_pop_from_empty_stack_fails():
+    with pytest.raises(IndexError):
+        GoalStack().pop()
@@ -17,6 +17,9 @@ from tests.state.dungeon_draw import *
 from roguebot.state.state import State
 from roguebot.action import Action, MoveAction, TakeAction
 from roguebot.brains.megabrain import MegaBrain
+from roguebot.goals.choose_goal import ChooseGoalGoal
+from roguebot.goals.explore_goal import ExploreGoal
+from roguebot.goals.seek_point_goal import SeekPointGoal
 
 
 @pytest.fixture
@@ -74,3 +77,111 @@ def test_monitor_items_adds_goals_if_item_count_changes(empty_brain: MegaBrain,
 
     after_goal_count = len(brain._goals)
     assert_that(after_goal_count).is_equal_to(initial_goal_count+2)
+
+
+@pytest.fixture
+def armed_me_in_a_room(dagger) -> State:
+    picture = """
+    ----------- level z=0 :
+    #######
+    #     #
+    #     #
+    #######
+    -----------
+    """
+    state = State()
+    state.dungeon_map = get_dungeon_from_picture(picture)
+    me = Entity(char='@', name='assassin-12', position=Point(1, 1, 0),
+                identifier='myId', inventory=[dagger], current_weapon=dagger)
+    state.entities.add(me)
+    state.my_entity_id = 'myId'
+    return state
+
+
+def test_detect_local_enemies_attacks_nearby_enemy(empty_brain: MegaBrain, armed_me_in_a_room: State) -> None:
+    state = armed_me_in_a_room
+    state.entities.add(Entity(char='G', name='goblin',
+                              position=Point(3, 2, 0), identifier='gob'))
+
+    empty_brain._detect_local_enemies(state.find_my_entity(), state)
+
+    assert_that(str(empty_brain._goals[-1])).contains("AttackEntity")
+
+
+def test_detect_local_enemies_ignores_brother_bots_and_far_enemies(empty_brain: MegaBrain, armed_me_in_a_room: State) -> None:
+    state = armed_me_in_a_room
+    state.entities.add(Entity(char='@', name='assassin-99',
+                              position=Point(2, 1, 0), identifier='bro'))
+    state.entities.add(Entity(char='G', name='goblin',
+                              position=Point(5, 2, 0), identifier='gob'))
+
+    empty_brain._detect_local_enemies(state.find_my_entity(), state)
+
+    assert_that(empty_brain._goals).is_empty()
+
+
+def test_detect_local_enemies_only_looks_again_when_entities_change(empty_brain: MegaBrain, armed_me_in_a_room: State) -> None:
+    state = armed_me_in_a_room
+    calls = []
+    original = empty_brain._are_enemies_near
+
+    def counting(state):
+        calls.append(state)
+        return original(state)
+    empty_brain._are_enemies_near = counting
+
+    empty_brain._detect_local_enemies(state.find_my_entity(), state)
+    empty_brain._detect_local_enemies(state.find_my_entity(), state)
+    assert_that(calls).is_length(1)
+    assert_that(empty_brain._goals).is_empty()
+
+    state.update_entity(Entity(char='G', name='goblin',
+                               position=Point(3, 2, 0), identifier='gob'))
+    empty_brain._detect_local_enemies(state.find_my_entity(), state)
+
+    assert_that(calls).is_length(2)
+    assert_that(str(empty_brain._goals[-1])).contains("AttackEntity")
+
+
+def test_detect_local_enemies_doesnt_stack_up_attack_goals(empty_brain: MegaBrain, armed_me_in_a_room: State) -> None:
+    state = armed_me_in_a_room
+    state.update_entity(Entity(char='G', name='goblin',
+                               position=Point(3, 2, 0), identifier='gob'))
+
+    for _ in range(5):
+        empty_brain._detect_local_enemies(state.find_my_entity(), state)
+        empty_brain._goals.push(ChooseGoalGoal())
+
+    assert_that(empty_brain._goals).is_length(6)
+    assert_that(str(empty_brain._goals[-1])).contains("AttackEntity")
+
+
+def test_decision_is_reused_while_nothing_it_depends_on_changes(empty_brain: MegaBrain, armed_me_in_a_room: State) -> None:
+    state = armed_me_in_a_room
+    empty_brain._goals.append(SeekPointGoal(Point(5, 1, 0)))
+
+    first = empty_brain.decide_actions(state)
+    second = empty_brain.decide_actions(state)
+
+    assert_that([str(action) for action in second]).is_equal_to(
+        [str(action) for action in first])
+    assert_that(empty_brain.decision_cache_misses).is_equal_to(1)
+    assert_that(empty_brain.decision_cache_hits).is_equal_to(1)
+    assert_that(empty_brain.status_summary["decision_cache_hits"]).is_equal_to(1)
+
+    # Something moves into our way, so think again.
+    state.update_entity(Entity(char='G', name='goblin',
+                               position=Point(5, 2, 0), identifier='gob'))
+    empty_brain.decide_actions(state)
+
+    assert_that(empty_brain.decision_cache_misses).is_equal_to(2)
+
+
+def test_decisions_made_at_random_are_never_reused(empty_brain: MegaBrain, armed_me_in_a_room: State) -> None:
+    state = armed_me_in_a_room
+    empty_brain._goals.append(ExploreGoal())
+
+    empty_brain.decide_actions(state)
+    empty_brain.decide_actions(state)
+
+    assert_that(empty_brain.decision_cache_hits).is_equal_to(0)
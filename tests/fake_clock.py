@@ -0,0 +1,10 @@
+class FakeClock():
+    """
+    Stands in for time.monotonic, so tests can say what time it is.
+    """
+
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
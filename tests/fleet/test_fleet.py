@@ -0,0 +1,94 @@
+import sys
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import Mock
+from assertpy import assert_that
+from roguebot.bot import Bot
+from roguebot.env_vars import EnvVarExtractor
+from roguebot.fleet.fleet import Fleet
+from roguebot.fleet.builder import build_fleet
+from tests.state.test_map_cache import wire_map_data
+
+
+class FakeClient():
+    """ Plays until told to stop, or fails straight away """
+
+    def __init__(self, log: list, name: str, fails: bool = False):
+        self.log = log
+        self.name = name
+        self.fails = fails
+
+    async def run_comms(self):
+        self.log.append(self.name)
+        if self.fails:
+            raise RuntimeError("lost the plot")
+
+
+def mock_bot(is_ready: bool) -> Mock:
+    bot = Mock(spec=Bot)
+    bot.is_ready = is_ready
+    bot.status_summary = {"goal": "ExploreGoal"}
+    return bot
+
+
+def test_fleet_is_ready_when_any_bot_is_ready() -> None:
+    fleet = Fleet()
+    fleet.add("a", mock_bot(False), None)
+    assert_that(fleet.is_ready).is_false()
+
+    fleet.add("b", mock_bot(True), None)
+    assert_that(fleet.is_ready).is_true()
+
+
+def test_fleet_status_lists_every_bot() -> None:
+    fleet = Fleet()
+    fleet.add("a", mock_bot(False), None)
+    fleet.add("b", mock_bot(True), None)
+
+    summary = fleet.status_summary
+
+    assert_that(summary["fleet"]["bots"]).is_equal_to(2)
+    assert_that(summary["fleet"]["ready"]).is_equal_to(1)
+    assert_that(summary["bots"]["a"]).is_equal_to({"status": "ALIVE"})
+    assert_that(summary["bots"]["b"]).is_equal_to(
+        {"status": "READY", "goal": "ExploreGoal"})
+
+
+def test_bot_names_must_be_unique() -> None:
+    fleet = Fleet()
+    fleet.add("a", mock_bot(False), None)
+
+    assert_that(fleet.add).raises(ValueError).when_called_with(
+        "a", mock_bot(False), None)
+
+
+def test_build_fleet_shares_maps_between_bots() -> None:
+    env = EnvVarExtractor({'K_AND_K_BOT_NAME': 'fred',
+                           'K_AND_K_BOT_ROLE': 'warrior',
+                           'K_AND_K_SERVER_URL': 'http://localhost:3000',
+                           'K_AND_K_BOT_FLEET_SIZE': '3'}, sys.version_info)
+
+    fleet = build_fleet(env, range(10, 10 + env.fleet_size))
+
+    assert_that(len(fleet)).is_equal_to(3)
+    assert_that(fleet.names).is_equal_to(
+        [env.character_name + '-' + str(index) for index in (10, 11, 12)])
+    maps = [fleet.map_cache.get_or_build(wire_map_data()) for _ in range(3)]
+    assert_that(maps[1]).is_same_as(maps[0])
+    assert_that(fleet.map_cache.misses).is_equal_to(1)
+
+
+class TestFleetRun(IsolatedAsyncioTestCase):
+
+    async def test_all_bots_play_even_if_one_fails(self):
+        log = []
+        fleet = Fleet(stagger_seconds=0)
+        fleet.add("a", mock_bot(True), FakeClient(log, "a"))
+        fleet.add("b", mock_bot(True), FakeClient(log, "b", fails=True))
+        fleet.add("c", mock_bot(True), FakeClient(log, "c"))
+
+        await fleet.run()
+
+        assert_that(log).is_equal_to(["a", "b", "c"])
+        fleet_summary = fleet.status_summary["fleet"]
+        assert_that(fleet_summary["crashed"]).is_equal_to(1)
+        assert_that(fleet_summary["playing"]).is_equal_to(0)
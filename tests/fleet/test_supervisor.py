@@ -0,0 +1,302 @@
+import asyncio
+import multiprocessing
+import pytest
+import queue
+import signal
+import sys
+import time
+from unittest import IsolatedAsyncioTestCase
+from assertpy import assert_that
+from roguebot.env_vars import EnvVarExtractor
+from roguebot.fleet import supervisor as supervisor_module
+from roguebot.fleet.supervisor import Supervisor, plan_shards, play_and_report, worker_context
+from tests.fake_clock import FakeClock
+
+
+class FakeProcess():
+    def __init__(self, target, args, daemon):
+        self.args = args
+        self.alive = False
+        self.exitcode = None
+        self.pid = 1000 + args[1]
+        self.is_terminated = False
+        self.is_killed = False
+        # Like a process with a SIGTERM handler of its own.
+        self.ignores_terminate = False
+
+    def start(self):
+        self.alive = True
+
+    def is_alive(self):
+        return self.alive
+
+    def terminate(self):
+        self.is_terminated = True
+        if not self.ignores_terminate:
+            self.alive = False
+
+    def kill(self):
+        self.is_killed = True
+        self.alive = False
+
+    def join(self, timeout=None):
+        pass
+
+    def exit(self, exitcode: int):
+        self.alive = False
+        self.exitcode = exitcode
+
+
+class FakeContext():
+    """ Creates fake processes, which don't run anything """
+
+    def __init__(self):
+        self.processes = []
+
+    def Queue(self):
+        return queue.Queue()
+
+    def Process(self, target, args, daemon):
+        process = FakeProcess(target, args, daemon)
+        self.processes.append(process)
+        return process
+
+
+def make_env(fleet_size: int = 4) -> EnvVarExtractor:
+    return EnvVarExtractor({'K_AND_K_BOT_NAME': 'fred',
+                            'K_AND_K_BOT_ROLE': 'warrior',
+                            'K_AND_K_SERVER_URL': 'http://localhost:3000',
+                            'K_AND_K_BOT_FLEET_SIZE': str(fleet_size)},
+                           sys.version_info)
+
+
+def make_supervisor(fleet_size: int = 4, worker_count: int = 2, **kwargs):
+    context = FakeContext()
+    clock = FakeClock()
+    supervisor = Supervisor(make_env(fleet_size), worker_count=worker_count,
+                            cpus=[0, 1], context=context, clock=clock, **kwargs)
+    return (supervisor, context, clock)
+
+
+def test_plan_shards_spreads_bots_evenly_when_costs_unknown() -> None:
+    shards = plan_shards([0, 1, 2, 3, 4], {}, 2)
+    assert_that(shards).is_equal_to([[0, 2, 4], [1, 3]])
+
+
+def test_plan_shards_puts_expensive_bots_apart() -> None:
+    costs = {0: 0.5, 1: 0.5, 2: 0.1, 3: 0.1}
+    shards = plan_shards([0, 1, 2, 3], costs, 2)
+    assert_that(shards).is_equal_to([[0, 2], [1, 3]])
+
+
+def test_plan_shards_balances_by_load_not_count() -> None:
+    costs = {0: 0.9, 1: 0.3, 2: 0.3, 3: 0.3}
+    shards = plan_shards([0, 1, 2, 3], costs, 2)
+    assert_that(shards).is_equal_to([[0], [1, 2, 3]])
+
+
+def test_workers_are_pinned_to_cpus_in_turn() -> None:
+    (supervisor, context, _) = make_supervisor(fleet_size=6, worker_count=3)
+    supervisor.start()
+
+    assert_that([worker.cpu for worker in supervisor.workers]).is_equal_to([0, 1, 0])
+    # args are (env, worker number, bot numbers, cpu, reports, interval)
+    assert_that([process.args[2] for process in context.processes]).is_equal_to(
+        [[0, 3], [1, 4], [2, 5]])
+
+
+def test_never_more_workers_than_bots() -> None:
+    (supervisor, _, _) = make_supervisor(fleet_size=1, worker_count=0)
+    assert_that(supervisor.workers).is_length(1)
+
+
+def test_crashed_worker_is_restarted_after_a_delay() -> None:
+    (supervisor, context, clock) = make_supervisor(restart_delay_seconds=1)
+    supervisor.start()
+    context.processes[0].exit(1)
+
+    supervisor.poll()
+    assert_that(context.processes).is_length(2)
+
+    clock.now = 1.0
+    supervisor.poll()
+    assert_that(context.processes).is_length(3)
+    assert_that(context.processes[2].args[2]).is_equal_to([0, 2])
+    assert_that(supervisor.status_summary["supervisor"]["restarts"]).is_equal_to(1)
+
+
+def test_worker_gives_up_after_too_many_crashes() -> None:
+    (supervisor, context, _) = make_supervisor(max_restarts=0)
+    supervisor.start()
+    context.processes[0].exit(1)
+
+    supervisor.poll()
+
+    assert_that(context.processes).is_length(2)
+    assert_that(supervisor.workers[0].is_finished).is_true()
+
+
+def test_supervisor_finishes_when_all_workers_finish() -> None:
+    (supervisor, context, _) = make_supervisor()
+    supervisor.start()
+    for process in context.processes:
+        process.exit(0)
+
+    supervisor.poll()
+
+    assert_that(supervisor.is_finished).is_true()
+    assert_that(context.processes).is_length(2)
+
+
+def test_unbalanced_workers_are_rebalanced() -> None:
+    (supervisor, context, clock) = make_supervisor(rebalance_interval_seconds=10)
+    supervisor.start()
+    # Worker 0 has bots 0 and 2, which are both busy.
+    supervisor.take_report({"worker": 0, "seconds": 10, "status": {},
+                            "cpu_seconds": {0: 5.0, 2: 5.0}})
+    supervisor.take_report({"worker": 1, "seconds": 10, "status": {},
+                            "cpu_seconds": {1: 1.0, 3: 1.0}})
+
+    clock.now = 10
+    supervisor.poll()
+
+    assert_that(supervisor.rebalance_count).is_equal_to(1)
+    assert_that(sorted(sorted(worker.indexes) for worker in supervisor.workers)).is_equal_to(
+        [[0, 1], [2, 3]])
+    assert_that(context.processes[0].is_terminated).is_true()
+    assert_that(context.processes).is_length(4)
+
+
+def test_rebalancing_can_be_turned_off() -> None:
+    (supervisor, context, clock) = make_supervisor(rebalance_interval_seconds=0)
+    supervisor.start()
+    supervisor.take_report({"worker": 0, "seconds": 10, "status": {},
+                            "cpu_seconds": {0: 5.0, 2: 5.0}})
+    supervisor.take_report({"worker": 1, "seconds": 10, "status": {},
+                            "cpu_seconds": {1: 1.0, 3: 1.0}})
+
+    clock.now = 1000
+    supervisor.poll()
+
+    assert_that(supervisor.rebalance_count).is_equal_to(0)
+    assert_that(context.processes).is_length(2)
+
+
+def test_workers_which_ignore_terminate_are_killed() -> None:
+    (supervisor, context, _) = make_supervisor()
+    supervisor.start()
+    context.processes[0].ignores_terminate = True
+
+    supervisor.stop()
+
+    assert_that(context.processes[0].is_killed).is_true()
+    assert_that(context.processes[1].is_killed).is_false()
+    assert_that([process.is_alive() for process in context.processes]).is_equal_to(
+        [False, False])
+
+
+def test_balanced_workers_are_left_alone() -> None:
+    (supervisor, context, clock) = make_supervisor(rebalance_interval_seconds=10)
+    supervisor.start()
+    supervisor.take_report({"worker": 0, "seconds": 10, "status": {},
+                            "cpu_seconds": {0: 1.0, 2: 1.0}})
+    supervisor.take_report({"worker": 1, "seconds": 10, "status": {},
+                            "cpu_seconds": {1: 1.0, 3: 1.1}})
+
+    clock.now = 10
+    supervisor.poll()
+
+    assert_that(supervisor.rebalance_count).is_equal_to(0)
+    assert_that(context.processes).is_length(2)
+
+
+def test_status_merges_bots_from_all_workers() -> None:
+    (supervisor, _, _) = make_supervisor()
+    supervisor.start()
+    assert_that(supervisor.is_ready).is_false()
+
+    supervisor.take_report({"worker": 0, "seconds": 1,
+                            "status": {"fleet": {"ready": 1}, "bots": {"a": {"status": "READY"}}},
+                            "cpu_seconds": {}})
+    supervisor.take_report({"worker": 1, "seconds": 1,
+                            "status": {"fleet": {"ready": 0}, "bots": {"b": {"status": "ALIVE"}}},
+                            "cpu_seconds": {}})
+
+    summary = supervisor.status_summary
+    assert_that(supervisor.is_ready).is_true()
+    assert_that(summary["bots"]).contains_key("a", "b")
+    assert_that(summary["workers"]["1"]["pid"]).is_equal_to(1001)
+    assert_that(summary["supervisor"]["bots"]).is_equal_to(4)
+
+
+class FakeFleet():
+    async def run(self):
+        pass
+
+    def decision_cpu_seconds(self) -> dict:
+        return {"fred-3": 0.25}
+
+    @property
+    def status_summary(self) -> dict:
+        return {"fleet": {"ready": 1}}
+
+
+class TestPlayAndReport(IsolatedAsyncioTestCase):
+
+    async def test_worker_reports_when_its_fleet_finishes(self):
+        reports = queue.Queue()
+
+        await play_and_report(FakeFleet(), 2, {"fred-3": 3}, reports, 5)
+
+        report = reports.get_nowait()
+        assert_that(report["worker"]).is_equal_to(2)
+        assert_that(report["cpu_seconds"]).is_equal_to({3: 0.25})
+        assert_that(report["status"]).is_equal_to({"fleet": {"ready": 1}})
+
+
+def test_workers_are_not_forked_from_the_supervisor() -> None:
+    # The supervisor's HTTP server thread is running when workers start.
+    assert_that(worker_context().get_start_method()).is_in("forkserver", "spawn")
+
+
+class NeverEndingFleet():
+    async def run(self):
+        await asyncio.sleep(3600)
+
+    def decision_cpu_seconds(self) -> dict:
+        return {}
+
+    @property
+    def status_summary(self) -> dict:
+        return {}
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(),
+                    reason="Needs forked worker processes")
+def test_real_worker_stops_despite_the_supervisors_sigterm_handler(monkeypatch) -> None:
+    # Forked workers see this in place of the real fleet.
+    monkeypatch.setattr(supervisor_module, "build_fleet",
+                        lambda env, indexes, with_http_server: NeverEndingFleet())
+    supervisor = Supervisor(make_env(1), worker_count=1, cpus=[0],
+                            context=multiprocessing.get_context("fork"),
+                            report_interval_seconds=60)
+    # As run() does, before it starts the workers.
+    previous_handler = signal.signal(
+        signal.SIGTERM, lambda signal_number, frame: supervisor.request_stop())
+    try:
+        supervisor.start()
+        process = supervisor.workers[0].process
+        # Give the worker time to get going.
+        time.sleep(0.5)
+        assert_that(process.is_alive()).is_true()
+
+        started_at = time.monotonic()
+        supervisor.stop()
+
+        assert_that(process.is_alive()).is_false()
+        # Stopped by being terminated, not by being killed after a wait.
+        assert_that(process.exitcode).is_equal_to(-signal.SIGTERM)
+        assert_that(time.monotonic() - started_at).is_less_than(
+            Supervisor.STOP_TIMEOUT_SECONDS)
+    finally:
+        signal.signal(signal.SIGTERM, previous_handler)
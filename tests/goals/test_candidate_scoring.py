@@ -0,0 +1,75 @@
+import numpy
+import pytest
+from assertpy import assert_that
+from roguebot.goals import candidate_scoring
+from roguebot.goals.attack_goal import AttackEntity
+from roguebot.goals.seek_item_goal import SeekItemGoal
+from roguebot.navigation.point import Point
+from roguebot.state.entity import Entity
+from roguebot.state.item import Item
+from roguebot.state.state import State
+from tests.state.dungeon_draw import *
+
+
+@pytest.fixture
+def me() -> Entity:
+    return Entity(char='@', name='assassin-50', position=Point(1, 1, 0), identifier='myId')
+
+
+@pytest.fixture
+def state(me) -> State:
+    picture = """
+    ----------- level z=0 :
+    ########
+    #      #
+    #      #
+    #      #
+    ########
+    -----------
+    """
+    state = State()
+    state.dungeon_map = get_dungeon_from_picture(picture)
+    state.entities.add(me)
+    state.my_entity_id = me.identifier
+    return state
+
+
+def test_item_scores_match_scoring_one_at_a_time(me, state):
+    items = [Item(position=Point(2, 3, 0), name='dust'),
+             Item(position=Point(2, 2, 0), name='banana', edible=True),
+             Item(position=Point(3, 2, 0), name='hat', wearable=True),
+             Item(position=Point(6, 3, 0), name='pike', wieldable=True, damage=5),
+             Item(position=Point(99, 99, 99), name="thor's hammer",
+                  wieldable=True, damage=10000)]
+    me.current_weapon = Item(name='scissors', wieldable=True, damage=1)
+
+    scores = candidate_scoring.score_items(
+        me, items, state.navigation.distance_map(me.position, state))
+
+    expected = [SeekItemGoal().score_item(me, item, state) for item in items]
+    assert_that(list(scores)).is_equal_to(expected)
+
+
+def test_enemy_scores_match_scoring_one_at_a_time(me, state):
+    enemies = [Entity(char='G', name='gobbo', position=Point(4, 2, 0), identifier='g'),
+               Entity(char='@', name='assassin-10', position=Point(6, 3, 0), identifier='a10'),
+               Entity(char='@', name='assassin-90', position=Point(2, 3, 0), identifier='a90'),
+               Entity(char='U', name='unicorn', position=Point(99, 99, 99), identifier='u')]
+    for enemy in enemies:
+        state.entities.add(enemy)
+
+    scores = candidate_scoring.score_enemies(
+        me, enemies, state.navigation.distance_map(me.position, state))
+
+    expected = [AttackEntity().score_enemy(enemy, me, state) for enemy in enemies]
+    assert_that(list(scores)).is_equal_to(expected)
+
+
+def test_top_k_is_best_first_keeping_order_of_equal_scores():
+    best = candidate_scoring.top_k(['a', 'b', 'c', 'd', 'e'],
+                                   numpy.array([5, 9, 5, 1, 9]), 3)
+    assert_that(best).is_equal_to([(9, 'b'), (9, 'e'), (5, 'a')])
+
+
+def test_top_k_of_nothing_is_empty():
+    assert_that(candidate_scoring.top_k([], numpy.array([]), 1)).is_empty()
@@ -0,0 +1,125 @@
+import pytest
+from assertpy import assert_that
+from roguebot.action import MoveAction
+from roguebot.brains.brain import GoalDrivenBrain
+from roguebot.goals.seek_point_goal import SeekPointGoal
+from roguebot.navigation.direction import Direction
+from roguebot.navigation.point import Point
+from roguebot.state.entity import Entity
+from roguebot.state.state import State
+from tests.state.dungeon_draw import *
+
+
+@pytest.fixture
+def me() -> Entity:
+    return Entity(char='@', name='me', position=Point(1, 1, 0), identifier='myId')
+
+
+@pytest.fixture
+def corridor_state(me) -> State:
+    picture = """
+    ----------- level z=0 :
+    ##########
+    #        #
+    ##########
+    -----------
+    """
+    state = State()
+    state.dungeon_map = get_dungeon_from_picture(picture)
+    state.entities.add(me)
+    state.my_entity_id = me.identifier
+    return state
+
+
+def directions_of(actions) -> list:
+    return [action.direction for action in actions]
+
+
+def test_only_one_move_per_turn_by_default(me, corridor_state):
+    goal = SeekPointGoal(Point(8, 1, 0))
+    actions = goal.decide_actions(me, corridor_state, [goal])
+    assert_that(directions_of(actions)).is_equal_to([Direction.EAST])
+
+
+def test_bursts_several_moves_when_allowed(me, corridor_state):
+    goal = SeekPointGoal(Point(8, 1, 0))
+    goal.max_moves_per_turn = 3
+
+    actions = goal.decide_actions(me, corridor_state, [goal])
+
+    assert_that(directions_of(actions)).is_equal_to([Direction.EAST] * 3)
+
+
+def test_burst_stops_next_to_other_entities(me, corridor_state):
+    corridor_state.entities.add(Entity(char='G', name='goblin',
+                                       position=Point(8, 1, 0), identifier='gob'))
+    goal = SeekPointGoal(Point(8, 1, 0))
+    goal.max_moves_per_turn = 10
+
+    actions = goal.decide_actions(me, corridor_state, [goal])
+    assert_that(actions).is_length(6)
+
+    goal = SeekPointGoal(Point(8, 1, 0))
+    goal.max_moves_per_turn = 10
+    goal.burst_safety = False
+    actions = goal.decide_actions(me, corridor_state, [goal])
+    assert_that(actions).is_length(7)
+
+
+def test_burst_stops_on_stairs():
+    state = State()
+    state.dungeon_map = get_dungeon_from_picture("""
+    ----------- level z=0 :
+    #######
+    #  >  #
+    #######
+    ----------- level z=1 :
+    #######
+    #  <  #
+    #######
+    -----------
+    """)
+    me = Entity(char='@', name='me', position=Point(1, 1, 0), identifier='myId')
+    state.entities.add(me)
+    goal = SeekPointGoal(Point(5, 1, 1))
+    goal.max_moves_per_turn = 10
+
+    actions = goal.decide_actions(me, state, [goal])
+
+    assert_that(directions_of(actions)).is_equal_to([Direction.EAST] * 2)
+
+
+def test_carries_on_along_the_planned_path_without_finding_it_again(me, corridor_state):
+    goal = SeekPointGoal(Point(8, 1, 0))
+    goal.max_moves_per_turn = 2
+    goal.decide_actions(me, corridor_state, [goal])
+    misses = corridor_state.navigation.cache_misses
+
+    corridor_state.update_position('myId', Point(3, 1, 0))
+    actions = goal.decide_actions(me, corridor_state, [goal])
+
+    assert_that(directions_of(actions)).is_equal_to([Direction.EAST] * 2)
+    assert_that(corridor_state.navigation.cache_misses).is_equal_to(misses)
+
+
+def test_finds_the_path_again_when_someone_steps_onto_it(me, corridor_state):
+    goal = SeekPointGoal(Point(8, 1, 0))
+    goal.decide_actions(me, corridor_state, [goal])
+
+    corridor_state.entities.add(Entity(char='G', name='goblin',
+                                       position=Point(5, 1, 0), identifier='gob'))
+    goals = [goal]
+    actions = goal.decide_actions(me, corridor_state, goals)
+
+    assert_that(actions).is_empty()
+    assert_that(goals).is_empty()
+
+
+def test_brain_tells_the_goal_how_many_moves_it_can_make(me, corridor_state):
+    brain = GoalDrivenBrain()
+    brain.max_actions_per_turn = 4
+    brain._goals.append(SeekPointGoal(Point(8, 1, 0)))
+
+    actions = brain.decide_actions(corridor_state)
+
+    assert_that(directions_of(actions)).is_equal_to([Direction.EAST] * 4)
@@ -48,7 +48,7 @@ class HttpServerUrlTest(unittest.TestCase):
         HttpServerUrlTest.server.stop()
 
     def test_can_get_404_if_url_is_bad(self) -> None:
-        HttpServerUrlTest.bot.got_enough_state_to_start.return_value = True
+        HttpServerUrlTest.bot.is_ready = True
         HttpServerUrlTest.bot.status_summary = {}
         url = "http://localhost:{}/unknown".format(HttpServerUrlTest.port)
 
@@ -58,7 +58,7 @@ class HttpServerUrlTest(unittest.TestCase):
         assert_that(status_code).is_equal_to(404)
 
     def test_can_get_complex_status_when_ready(self) -> None:
-        HttpServerUrlTest.bot.got_enough_state_to_start.return_value = True
+        HttpServerUrlTest.bot.is_ready = True
         HttpServerUrlTest.bot.status_summary = {}
         url = "http://localhost:{}/status".format(HttpServerUrlTest.port)
 
@@ -69,7 +69,7 @@ class HttpServerUrlTest(unittest.TestCase):
         assert_that(status).is_equal_to("READY")
 
     def test_can_get_complex_status_when_not_ready(self) -> None:
-        HttpServerUrlTest.bot.got_enough_state_to_start.return_value = False
+        HttpServerUrlTest.bot.is_ready = False
         url = "http://localhost:{}/status".format(HttpServerUrlTest.port)
 
         response = requests.get(url)
@@ -79,7 +79,7 @@ class HttpServerUrlTest(unittest.TestCase):
         assert_that(status).is_equal_to("ALIVE")
 
     def test_can_get_simple_status_when_ready(self) -> None:
-        HttpServerUrlTest.bot.got_enough_state_to_start.return_value = True
+        HttpServerUrlTest.bot.is_ready = True
         url = "http://localhost:{}/".format(HttpServerUrlTest.port)
 
         response = requests.get(url)
@@ -89,7 +89,7 @@ class HttpServerUrlTest(unittest.TestCase):
         assert_that(status).is_equal_to("READY")
 
     def test_can_get_simple_status_when_not_ready_yet(self) -> None:
-        HttpServerUrlTest.bot.got_enough_state_to_start.return_value = False
+        HttpServerUrlTest.bot.is_ready = False
         url = "http://localhost:{}/".format(HttpServerUrlTest.port)
 
         response = requests.get(url)
@@ -106,7 +106,7 @@ class HttpServerUrlTest(unittest.TestCase):
         assert_that(is_ok).is_false()
 
     def test_can_get_ready_url_when_not_ready_yet_gives_503_error(self) -> None:
-        HttpServerUrlTest.bot.got_enough_state_to_start.return_value = False
+        HttpServerUrlTest.bot.is_ready = False
         url = "http://localhost:{}/ready".format(HttpServerUrlTest.port)
 
         response = requests.get(url)
@@ -114,7 +114,7 @@ class HttpServerUrlTest(unittest.TestCase):
         assert_that(response.status_code).is_equal_to(503)
 
     def test_can_get_ready_url_when_ready_gives_200_ok(self) -> None:
-        HttpServerUrlTest.bot.got_enough_state_to_start.return_value = True
+        HttpServerUrlTest.bot.is_ready = True
         url = "http://localhost:{}/ready".format(HttpServerUrlTest.port)
 
         response = requests.get(url)
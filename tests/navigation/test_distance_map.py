@@ -0,0 +1,62 @@
+import pytest
+from assertpy import assert_that
+from roguebot.navigation.distance_map import DistanceMap
+from roguebot.navigation.navigation_service import NavigationService
+from roguebot.navigation.point import Point
+from roguebot.state.entity import Entity
+from roguebot.state.state import State
+from tests.state.dungeon_draw import *
+
+
+@pytest.fixture
+def room_state() -> State:
+    picture = """
+    ----------- level z=0 :
+    #######
+    #     #
+    #     #
+    #######
+    -----------
+    """
+    state = State()
+    state.dungeon_map = get_dungeon_from_picture(picture)
+    return state
+
+
+def test_distances_agree_with_path_lengths(room_state):
+    distance_map = DistanceMap(Point(1, 1, 0), room_state)
+    for target in [Point(1, 1, 0), Point(5, 1, 0), Point(5, 2, 0), Point(2, 2, 0)]:
+        path = room_state.navigation.find_path(Point(1, 1, 0), target, room_state)
+        assert_that(distance_map.steps_to(target)).is_equal_to(len(path) - 1)
+
+
+def test_walls_and_points_outside_the_dungeon_are_unreachable(room_state):
+    distance_map = DistanceMap(Point(1, 1, 0), room_state)
+    assert_that(distance_map.steps_to(Point(0, 0, 0))).is_none()
+    assert_that(distance_map.steps_to(Point(99, 99, 99))).is_none()
+    assert_that(list(distance_map.steps_to_all(
+        [Point(0, 0, 0), Point(99, 99, 99), Point(2, 1, 0)]))).is_equal_to([-1, -1, 1])
+
+
+def test_can_reach_an_entity_but_not_walk_through_it(room_state):
+    room_state.entities.add(Entity(char='G', name='goblin',
+                                   position=Point(2, 1, 0), identifier='gob'))
+    room_state.entities.add(Entity(char='G', name='goblin',
+                                   position=Point(2, 2, 0), identifier='gob2'))
+
+    distance_map = DistanceMap(Point(1, 1, 0), room_state)
+
+    assert_that(distance_map.steps_to(Point(2, 1, 0))).is_equal_to(1)
+    assert_that(distance_map.steps_to(Point(3, 1, 0))).is_none()
+
+
+def test_navigation_shares_a_distance_map_until_something_moves(room_state):
+    navigation = NavigationService()
+    first = navigation.distance_map(Point(1, 1, 0), room_state)
+    assert_that(navigation.distance_map(Point(1, 1, 0), room_state)).is_same_as(first)
+
+    room_state.entities.add(Entity(char='G', name='goblin',
+                                   position=Point(3, 1, 0), identifier='gob'))
+
+    assert_that(navigation.distance_map(
+        Point(1, 1, 0), room_state)).is_not_same_as(first)
@@ -0,0 +1,91 @@
+import pytest
+from assertpy import assert_that
+from roguebot.navigation.navigation_service import NavigationService
+from roguebot.navigation.point import Point
+from roguebot.state.entity import Entity
+from roguebot.state.state import State
+from tests.state.dungeon_draw import *
+
+
+@pytest.fixture
+def corridor_state() -> State:
+    picture = """
+    ----------- level z=0 :
+    #######
+    #     #
+    #######
+    -----------
+    """
+    state = State()
+    state.dungeon_map = get_dungeon_from_picture(picture)
+    return state
+
+
+def test_state_shares_one_navigation_service(corridor_state):
+    assert_that(corridor_state.navigation).is_instance_of(NavigationService)
+    assert_that(corridor_state.navigation).is_same_as(
+        corridor_state.navigation)
+
+
+def test_same_path_is_served_from_the_cache(corridor_state):
+    navigation = NavigationService()
+
+    first = navigation.find_path(Point(1, 1, 0), Point(5, 1, 0), corridor_state)
+    first.pop(0)
+    second = navigation.find_path(Point(1, 1, 0), Point(5, 1, 0), corridor_state)
+
+    assert_that(second).is_length(5)
+    assert_that(navigation.cache_hits).is_equal_to(1)
+    assert_that(navigation.cache_misses).is_equal_to(1)
+
+
+def test_paths_are_found_again_when_entities_move(corridor_state):
+    navigation = NavigationService()
+    assert_that(navigation.find_path(
+        Point(1, 1, 0), Point(5, 1, 0), corridor_state)).is_not_none()
+
+    corridor_state.entities.add(Entity(char='G', name='goblin',
+                                       position=Point(3, 1, 0), identifier='gob'))
+
+    assert_that(navigation.find_path(
+        Point(1, 1, 0), Point(5, 1, 0), corridor_state)).is_none()
+    assert_that(navigation.cache_misses).is_equal_to(2)
+
+
+def test_cache_is_bounded(corridor_state):
+    navigation = NavigationService(path_cache_size=2)
+    for x in range(2, 6):
+        navigation.find_path(Point(1, 1, 0), Point(x, 1, 0), corridor_state)
+
+    navigation.find_path(Point(1, 1, 0), Point(2, 1, 0), corridor_state)
+
+    assert_that(navigation.cache_hits).is_equal_to(0)
+
+
+def test_paths_survive_unrelated_entities_moving(corridor_state):
+    corridor_state.entities.add(Entity(char='r', name='rat',
+                                       position=Point(1, 1, 0), identifier='rat'))
+    navigation = NavigationService()
+
+    for x in range(2, 6):
+        # Out of our way, at the start of the corridor.
+        corridor_state.update_position('rat', Point(1 + x % 2, 1, 0))
+        path = navigation.find_path(Point(3, 1, 0), Point(5, 1, 0), corridor_state)
+        assert_that(path).is_equal_to([Point(3, 1, 0), Point(4, 1, 0), Point(5, 1, 0)])
+
+    assert_that(navigation.cache_misses).is_equal_to(1)
+    assert_that(navigation.cache_hits).is_equal_to(3)
+
+
+def test_paths_are_found_again_when_entities_leave_the_way(corridor_state):
+    corridor_state.entities.add(Entity(char='G', name='goblin',
+                                       position=Point(3, 1, 0), identifier='gob'))
+    navigation = NavigationService()
+    assert_that(navigation.find_path(
+        Point(1, 1, 0), Point(5, 1, 0), corridor_state)).is_none()
+
+    corridor_state.entities.delete_at_position(Point(3, 1, 0))
+
+    assert_that(navigation.find_path(
+        Point(1, 1, 0), Point(5, 1, 0), corridor_state)).is_length(5)
+    assert_that(navigation.cache_misses).is_equal_to(2)
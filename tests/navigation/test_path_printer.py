@@ -96,3 +96,35 @@ def test_items_are_shown_as_splats(small_room, path_printer, dagger):
 
     # Only one path point given, so should only be one 'dot'
     assert_that(rendered_map.count('*')).is_equal_to(1)
+
+
+def test_lazy_render_only_draws_when_turned_into_a_string(small_room, path_printer):
+    state = State()
+    state.dungeon_map = small_room
+
+    lazy = path_printer.lazy_render_path(state, [Point(2, 2, 0)], 0, Point(1, 1, 0))
+
+    assert_that(str(lazy)).is_equal_to(path_printer.render_path(
+        state, [Point(2, 2, 0)], 0, Point(1, 1, 0)))
+
+
+def test_path_is_not_drawn_over_entities_or_walls(small_room, path_printer):
+    state = State()
+    state.dungeon_map = small_room
+    state.entities.add(Entity("g", "goblin", Point(2, 2, 0), "gob"))
+
+    rendered_map = path_printer.render_path(
+        state, [Point(2, 2, 0), Point(0, 0, 0), Point(3, 2, 0)], 0)
+
+    assert_that(rendered_map.count('.')).is_equal_to(1)
+    assert_that(rendered_map).contains("# @. #")
+
+
+def test_map_changes_are_drawn_after_the_map_was_drawn_once(small_room, path_printer):
+    state = State()
+    state.dungeon_map = small_room
+    path_printer.render_path(state)
+
+    small_room.set_cell(Point(2, 2, 0), Cell('<', is_walkable=True))
+
+    assert_that(path_printer.render_path(state)).contains('<')
@@ -0,0 +1,85 @@
+"""
+Times how long Items takes to take in items payloads from the server.
+
+    python -m tests.state.benchmark_items
+
+Every payload is decoded from json before the timing starts, so each
+update gets fresh objects, as it would from the wire.
+"""
+
+import json
+import time
+from roguebot.navigation.point import Point
+from roguebot.state.item import Items
+
+
+def raw_item(x: int, y: int, name: str) -> dict:
+    return {'char': 'o', 'foreground': 'green', 'background': 'black',
+            'alive': False, 'walkable': True,
+            'pos': {'x': x, 'y': y, 'z': 0},
+            'name': name, 'details': 'it looks edible',
+            'edible': True, 'wieldable': False, 'wearable': False,
+            'damage': 2, 'ac': 10}
+
+
+def payload(position_count: int, moved: int = 0) -> dict:
+    """
+    A floor with position_count positions holding items. The first `moved`
+    positions hold something different to the rest of the payloads.
+    """
+    raw_items = {}
+    for index in range(position_count):
+        (x, y) = (index % 80, index // 80)
+        name = 'rock' if index < moved else 'apple'
+        raw_items['({},{},0)'.format(x, y)] = [raw_item(x, y, name)]
+    return raw_items
+
+
+def time_updates(payloads: [dict], repeat: int = 5) -> float:
+    """
+    Returns:
+        float : The fastest time, in seconds, taken to apply all the payloads
+            in turn to a new Items.
+    """
+    me = Point(1, 1, 0)
+    best = None
+    for _ in range(repeat):
+        items = Items()
+        started_at = time.perf_counter()
+        for raw_items in payloads:
+            items.update_items(raw_items, me)
+        taken = time.perf_counter() - started_at
+        if best is None or taken < best:
+            best = taken
+    return best
+
+
+def decoded_copies(raw_items: dict, count: int) -> [dict]:
+    text = json.dumps(raw_items)
+    return [json.loads(text) for _ in range(count)]
+
+
+def main(position_count: int = 500, update_count: int = 200) -> None:
+    same = decoded_copies(payload(position_count), update_count)
+
+    one_changed = []
+    for update in range(update_count):
+        # A different position changes each time.
+        raw_items = payload(position_count)
+        key = list(raw_items.keys())[update % position_count]
+        raw_items[key][0]['name'] = 'rock'
+        one_changed.extend(decoded_copies(raw_items, 1))
+
+    all_changed = []
+    for update in range(update_count):
+        moved = update % 2 * position_count
+        all_changed.extend(decoded_copies(payload(position_count, moved=moved), 1))
+
+    print("{} updates of {} positions".format(update_count, position_count))
+    print("{:22} {:8.3f}s".format("unchanged", time_updates(same)))
+    print("{:22} {:8.3f}s".format("one position changed", time_updates(one_changed)))
+    print("{:22} {:8.3f}s".format("all positions changed", time_updates(all_changed)))
+
+
+if __name__ == '__main__':
+    main()
@@ -99,6 +99,29 @@ class TestEntities(unittest.TestCase):
         got_back = entities.get_by_id(identifier)
         assert_that(got_back.char).is_equal_to("P")
 
+    def test_occupancy_hash_follows_where_entities_stand(self):
+        entities = Entities()
+        empty_hash = entities.occupancy_hash
+        goblin = Entity(char='G', name='gob', position=Point(1, 1, 0), identifier='g')
+        troll = Entity(char='T', name='troll', position=Point(1, 1, 0), identifier='t')
+
+        entities.add(goblin)
+        one_goblin_hash = entities.occupancy_hash
+        assert_that(one_goblin_hash).is_not_equal_to(empty_hash)
+
+        # Two entities on one spot don't cancel each other out.
+        entities.add(troll)
+        assert_that(entities.occupancy_hash).is_not_equal_to(empty_hash)
+        assert_that(entities.occupancy_hash).is_not_equal_to(one_goblin_hash)
+
+        entities.update_position('t', Point(2, 1, 0))
+        entities.update_position('t', Point(1, 1, 0))
+        entities.delete_by_id('t')
+        assert_that(entities.occupancy_hash).is_equal_to(one_goblin_hash)
+
+        entities.delete_at_position(Point(1, 1, 0))
+        assert_that(entities.occupancy_hash).is_equal_to(empty_hash)
+
 
 class TestEntity(unittest.TestCase):
 
@@ -0,0 +1,83 @@
+import pytest
+from assertpy import assert_that
+from roguebot.navigation.point import Point
+from roguebot.state.entity import Entities, Entity
+from roguebot.state.entity_table import EntityTable
+
+
+@pytest.fixture
+def crowded_entities() -> Entities:
+    entities = Entities(columnar=True)
+    entities.add(Entity(char='@', name='assassin-1',
+                        position=Point(5, 5, 0), identifier='me'))
+    entities.add(Entity(char='@', name='assassin-2',
+                        position=Point(6, 5, 0), identifier='brother'))
+    entities.add(Entity(char='G', name='goblin',
+                        position=Point(7, 5, 0), identifier='gob'))
+    entities.add(Entity(char='O', name='orc',
+                        position=Point(5, 8, 0), identifier='orc'))
+    entities.add(Entity(char='Z', name='zombie', alive=False,
+                        position=Point(5, 6, 0), identifier='zed'))
+    entities.add(Entity(char='T', name='troll',
+                        position=Point(5, 5, 2), identifier='troll'))
+    return entities
+
+
+def test_living_non_allies_within_uses_the_table(crowded_entities):
+    found = crowded_entities.living_non_allies_within(
+        Point(5, 5, 0), 3, ally_prefix='assassin', exclude_id='me')
+
+    assert_that([entity.entity_id for entity in found]
+                ).is_equal_to(['gob', 'troll', 'orc'])
+
+
+def test_table_and_spatial_index_agree(crowded_entities):
+    plain = Entities()
+    for entity in crowded_entities.get_all():
+        plain.add(entity)
+
+    for distance in range(0, 5):
+        from_table = crowded_entities.living_non_allies_within(
+            Point(5, 5, 0), distance, ally_prefix='assassin', exclude_id='me')
+        from_grid = plain.living_non_allies_within(
+            Point(5, 5, 0), distance, ally_prefix='assassin', exclude_id='me')
+        assert_that(sorted(e.entity_id for e in from_table)).is_equal_to(
+            sorted(e.entity_id for e in from_grid))
+
+
+def test_table_follows_moves_and_deletes(crowded_entities):
+    crowded_entities.update_position('troll', Point(5, 4, 0))
+    crowded_entities.delete_by_id('gob')
+
+    found = crowded_entities.living_non_allies_within(
+        Point(5, 5, 0), 1, ally_prefix='assassin', exclude_id='me')
+
+    assert_that([entity.entity_id for entity in found]
+                ).is_equal_to(['troll'])
+    assert_that(crowded_entities.table.row_of('gob')).is_none()
+
+
+def test_table_grows_and_recycles_rows():
+    table = EntityTable(capacity=2)
+    for index in range(5):
+        table.upsert(Entity(char='G', name='goblin', hit_points=index,
+                            position=Point(index, 0, 0), identifier=str(index)))
+    assert_that(table.capacity).is_greater_than_or_equal_to(5)
+    assert_that(table.row_values('4')['hp']).is_equal_to(4)
+
+    row_of_first = table.row_of('0')
+    table.remove('0')
+    table.upsert(Entity(char='G', name='goblin',
+                        position=Point(9, 9, 0), identifier='new'))
+
+    assert_that(table.row_of('new')).is_equal_to(row_of_first)
+    assert_that(len(table)).is_equal_to(5)
+
+
+def test_columnar_mode_survives_wire_format_rebuilds():
+    raw = [{'char': 'G', 'name': 'goblin', 'pos': {'x': 1, 'y': 1, 'z': 0},
+            'id': 'gob', 'alive': True, 'hunger': 0}]
+    entities = Entities.from_wire_format(raw, columnar=True)
+
+    assert_that(entities.is_columnar).is_true()
+    assert_that(entities.table.row_values('gob')['x']).is_equal_to(1)
@@ -138,3 +138,114 @@ def test_adding_item_at_position_sets_item_position():
     items.add_item_to_position(item=sword, point=Point(3, 3, 0))
 
     assert_that(sword.position).is_equal_to(Point(3, 3, 0))
+
+
+def test_counts_are_kept_per_floor(raw_item_data, single_item_raw_data):
+    items = Items()
+    items.update_items(raw_item_data, Point(22, 16, 0))
+    items.update_items(single_item_raw_data, Point(22, 16, 1))
+
+    assert_that(items.count_on_floor(0)).is_equal_to(3)
+    assert_that(items.count_on_floor(1)).is_equal_to(1)
+    assert_that(items.floors).contains_only(0, 1)
+    assert_that(items.get_items_on_floor(1)[0].name).is_equal_to("apple")
+
+
+def test_replacing_a_floor_only_replaces_that_floor(raw_item_data, single_item_raw_data):
+    items = Items()
+    items.update_items(raw_item_data, Point(22, 16, 0))
+    items.update_items(single_item_raw_data, Point(22, 16, 1))
+
+    items.update_items({}, Point(1, 1, 0))
+
+    assert_that(len(items)).is_equal_to(1)
+    assert_that(items.useful_count).is_equal_to(1)
+    assert_that(items.get_wieldable_items()).is_empty()
+
+
+def test_category_indexes_follow_adds_and_deletes():
+    items = Items()
+    sword = Item(Point(1, 1, 0), name="sword", wieldable=True, damage=5)
+    knife = Item(Point(2, 1, 0), name="knife", wieldable=True, damage=2)
+    hat = Item(Point(1, 1, 0), name="hat", wearable=True, armour_class=8)
+    mail = Item(Point(3, 1, 0), name="mail", wearable=True, armour_class=4)
+    dust = Item(Point(3, 1, 0), name="dust")
+    for item in [sword, knife, hat, mail, dust]:
+        items.add(item)
+
+    assert_that(items.useful_count).is_equal_to(4)
+    assert_that(items.best_by_damage()).is_equal_to(sword)
+    assert_that(items.best_by_armour_class()).is_equal_to(mail)
+
+    items.delete(sword)
+    items.delete(mail)
+
+    assert_that(len(items)).is_equal_to(3)
+    assert_that(items.best_by_damage()).is_equal_to(knife)
+    assert_that(items.best_by_armour_class()).is_equal_to(hat)
+    assert_that(items.get_useful_items()).contains_only(knife, hat)
+
+
+def test_best_items_are_none_when_there_are_none():
+    items = Items()
+    items.add(Item(Point(1, 1, 0), name="apple", edible=True))
+
+    assert_that(items.best_by_damage()).is_none()
+    assert_that(items.best_by_armour_class()).is_none()
+    assert_that(items.get_edible_items()).is_length(1)
+
+
+def test_repeated_payload_is_not_parsed_again(raw_item_data):
+    items = Items()
+    assert_that(items.update_items(raw_item_data, Point(22, 16, 0))).is_true()
+    apple = items.get_items_at_position(Point(22, 16, 0))[0]
+
+    changed = items.update_items(raw_item_data, Point(22, 16, 0))
+
+    assert_that(changed).is_false()
+    assert_that(items.get_items_at_position(
+        Point(22, 16, 0))[0]).is_same_as(apple)
+    assert_that(len(items)).is_equal_to(3)
+
+
+def test_only_changed_positions_are_parsed_again(raw_item_data):
+    items = Items()
+    items.update_items(raw_item_data, Point(22, 16, 0))
+    apple = items.get_items_at_position(Point(22, 16, 0))[0]
+    old_rock = items.get_items_at_position(Point(28, 6, 0))[0]
+
+    # One of the rocks was taken.
+    raw_item_data['(28, 6,0)'].pop()
+    changed = items.update_items(raw_item_data, Point(22, 16, 0))
+
+    assert_that(changed).is_true()
+    assert_that(items.get_items_at_position(
+        Point(22, 16, 0))[0]).is_same_as(apple)
+    rocks = items.get_items_at_position(Point(28, 6, 0))
+    assert_that(rocks).is_length(1)
+    assert_that(rocks[0]).is_not_same_as(old_rock)
+    assert_that(len(items)).is_equal_to(2)
+    assert_that(items.useful_count).is_equal_to(2)
+
+
+def test_positions_missing_from_payload_are_emptied(raw_item_data):
+    items = Items()
+    items.update_items(raw_item_data, Point(22, 16, 0))
+
+    del raw_item_data['(22,16,0)']
+    items.update_items(raw_item_data, Point(22, 16, 0))
+
+    assert_that(items.get_items_at_position(Point(22, 16, 0))).is_empty()
+    assert_that(len(items)).is_equal_to(2)
+
+
+def test_local_changes_force_the_floor_to_be_parsed_again(raw_item_data):
+    items = Items()
+    items.update_items(raw_item_data, Point(22, 16, 0))
+    items.add(Item(Point(1, 1, 0), name="stray"))
+
+    changed = items.update_items(raw_item_data, Point(22, 16, 0))
+
+    assert_that(changed).is_true()
+    assert_that(len(items)).is_equal_to(3)
+    assert_that(items.get_items_at_position(Point(1, 1, 0))).is_empty()
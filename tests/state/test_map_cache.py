@@ -0,0 +1,52 @@
+from assertpy import assert_that
+from roguebot.state.map_cache import MapCache
+
+
+def wire_map_data(char: str = '#') -> dict:
+    return {
+        'width': 1, 'height': 1, 'depth': 1,
+        'tiles': [
+            [
+                [
+                    {'char': char, 'foreground': 'goldenrod', 'background': 'black',
+                     'walkable': False, 'diggable': True, 'blocksLight': True,
+                     'gateway': False, 'description': 'A cave wall'
+                     }
+                ]
+            ]
+        ],
+        'entrance': {'x': 0, 'y': 0, 'z': 0}
+    }
+
+
+def test_same_map_data_gives_the_same_map() -> None:
+    cache = MapCache()
+
+    map1 = cache.get_or_build(wire_map_data())
+    map2 = cache.get_or_build(wire_map_data())
+
+    assert_that(map2).is_same_as(map1)
+    assert_that(cache.hits).is_equal_to(1)
+    assert_that(cache.misses).is_equal_to(1)
+
+
+def test_different_map_data_gives_different_maps() -> None:
+    cache = MapCache()
+
+    map1 = cache.get_or_build(wire_map_data('#'))
+    map2 = cache.get_or_build(wire_map_data('.'))
+
+    assert_that(map2).is_not_same_as(map1)
+    assert_that(len(cache)).is_equal_to(2)
+
+
+def test_maps_nobody_uses_are_forgotten() -> None:
+    cache = MapCache()
+    dungeon_map = cache.get_or_build(wire_map_data())
+    assert_that(len(cache)).is_equal_to(1)
+
+    del dungeon_map
+
+    assert_that(len(cache)).is_equal_to(0)
+    assert_that(cache.summary()).is_equal_to(
+        {"maps": 0, "hits": 0, "misses": 1})
@@ -0,0 +1,70 @@
+import pytest
+from assertpy import assert_that
+from roguebot.state.message_log import MessageLog
+
+
+def test_oldest_messages_are_dropped_when_full():
+    log = MessageLog(capacity=3)
+    for message in ["a", "b", "c", "d"]:
+        log.append(message)
+
+    assert_that(list(log)).is_equal_to(["b", "c", "d"])
+    assert_that(log.first_sequence).is_equal_to(2)
+    assert_that(log.evicted_count).is_equal_to(1)
+
+
+def test_byte_budget_is_enforced_but_the_newest_message_is_kept():
+    log = MessageLog(capacity=10, max_bytes=5)
+    log.append("abc")
+    log.append("de")
+    assert_that(log.bytes_used).is_equal_to(5)
+
+    log.append("a very long message")
+
+    assert_that(list(log)).is_equal_to(["a very long message"])
+
+
+def test_since_returns_only_newer_messages():
+    log = MessageLog()
+    log.append("first")
+    seen = log.append("second")
+    log.append("third")
+
+    assert_that(log.since(seen)).is_equal_to(["third"])
+    assert_that(log.since(log.sequence)).is_empty()
+    assert_that(log.since(0)).is_equal_to(["first", "second", "third"])
+
+
+def test_pattern_counts_are_updated_on_append():
+    log = MessageLog(capacity=1, patterns={"hit": r"\bhits? you\b"})
+    log.append("The goblin hits you")
+    log.append("You hit the goblin")
+    log.append("The orc HITS YOU")
+
+    assert_that(log.pattern_count("hit")).is_equal_to(2)
+    assert_that(log.pattern_count("unknown")).is_equal_to(0)
+
+
+def test_behaves_like_a_list():
+    log = MessageLog()
+    log.append("first")
+    log.append("second")
+
+    assert_that(log).is_length(2)
+    assert_that(log[-1]).is_equal_to("second")
+    assert_that(log == ["first", "second"]).is_true()
+    assert_that(log.pop(0)).is_equal_to("first")
+    assert_that(log.pop()).is_equal_to("second")
+    with pytest.raises(IndexError):
+        log.pop()
+
+
+def test_copy_is_independent():
+    log = MessageLog()
+    log.append("first")
+    copied = log.copy()
+
+    log.append("second")
+
+    assert_that(list(copied)).is_equal_to(["first"])
+    assert_that(copied.sequence).is_equal_to(1)
@@ -0,0 +1,94 @@
+import pytest
+from assertpy import assert_that
+from roguebot.navigation.point import Point
+from roguebot.state.spatial_grid import SpatialGrid
+from roguebot.state.entity import Entities, Entity
+
+
+@pytest.fixture
+def grid() -> SpatialGrid:
+    grid = SpatialGrid(cell_size=4)
+    grid.insert("a", "A", Point(1, 1, 0))
+    grid.insert("b", "B", Point(3, 1, 0))
+    grid.insert("c", "C", Point(10, 10, 0))
+    grid.insert("d", "D", Point(1, 1, 1))
+    return grid
+
+
+def test_within_manhattan_finds_only_nearby_things(grid):
+    found = grid.within_manhattan(Point(1, 1, 0), 2)
+    assert_that(found).is_equal_to([(0, "A"), (1, "D"), (2, "B")])
+
+
+def test_within_manhattan_counts_level_changes_as_one_step(grid):
+    found = grid.within_manhattan(Point(1, 1, 0), 1)
+    assert_that(found).contains((1, "D")).does_not_contain((2, "B"))
+
+
+def test_k_nearest_stays_on_the_same_level(grid):
+    found = grid.k_nearest(Point(9, 9, 0), 2)
+    assert_that(found).is_equal_to([(2, "C"), (14, "B")])
+
+
+def test_k_nearest_with_more_asked_for_than_exist(grid):
+    found = grid.k_nearest(Point(0, 0, 0), 10)
+    assert_that(found).is_length(3)
+
+
+def test_k_nearest_on_empty_level_is_empty(grid):
+    assert_that(grid.k_nearest(Point(0, 0, 5), 3)).is_empty()
+
+
+def test_moving_between_cells_updates_buckets(grid):
+    grid.move("c", "C", Point(2, 2, 0))
+
+    found = grid.within_manhattan(Point(1, 1, 0), 2)
+    assert_that(found).contains((2, "C"))
+    assert_that(grid.within_manhattan(Point(10, 10, 0), 3)).is_empty()
+
+
+def test_removing_tracks_level_counts(grid):
+    grid.remove("d")
+    grid.remove("unknown")
+
+    assert_that(grid.count_on_level(1)).is_equal_to(0)
+    assert_that(grid.levels()).is_equal_to([0])
+    assert_that(len(grid)).is_equal_to(3)
+
+
+def test_iterate_level_yields_everything_on_that_level(grid):
+    found = [thing for (_, thing, _) in grid.iterate_level(0)]
+    assert_that(found).contains_only("A", "B", "C")
+
+
+def test_entities_index_follows_position_updates():
+    entities = Entities(cell_size=4)
+    fred = Entity(char="A", name="fred",
+                  position=Point(1, 1, 0), identifier="fredID")
+    joe = Entity(char="A", name="joe",
+                 position=Point(20, 20, 0), identifier="joeID")
+    entities.add(fred)
+    entities.add(joe)
+
+    entities.update_position("joeID", Point(2, 1, 0))
+
+    assert_that(entities.within_manhattan(
+        Point(1, 1, 0), 1)).is_equal_to([fred, joe])
+    assert_that(entities.k_nearest(Point(30, 30, 0), 1)).is_equal_to([joe])
+
+
+def test_entities_index_forgets_deleted_entities():
+    entities = Entities()
+    fred = Entity(char="A", name="fred",
+                  position=Point(1, 1, 0), identifier="fredID")
+    joe = Entity(char="A", name="joe",
+                 position=Point(1, 1, 0), identifier="joeID")
+    entities.add(fred)
+    entities.add(joe)
+
+    entities.delete(joe)
+
+    assert_that(entities.within_manhattan(
+        Point(1, 1, 0), 3)).is_equal_to([fred])
+    assert_that(entities.get_by_position(Point(1, 1, 0))).is_equal_to([fred])
+    assert_that(list(entities.get_by_level(0))).is_equal_to([fred])
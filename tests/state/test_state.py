@@ -51,6 +51,18 @@ def test_can_update_items_with_my_position():
         test_items_data, Point(1, 2, 3))
 
 
+
+def test_items_are_ignored_when_we_are_not_in_the_cave():
+    state: State = State()
+    state.my_entity_id = 'aaa'
+
+    changed = state.update_items({'(2,2,0)': [
+        {'pos': {'x': 2, 'y': 2, 'z': 0}, 'name': 'apple',
+         'edible': True, 'wieldable': False, 'wearable': False}]})
+
+    assert_that(changed).is_false()
+    assert_that(state.items.get_items_at_position(Point(2, 2, 0))).is_empty()
+
 class TestState(unittest.TestCase):
 
     def test_can_set_and_get_dungeon_map(self):
@@ -0,0 +1,106 @@
+from assertpy import assert_that
+from roguebot.navigation.point import Point
+from roguebot.state.entity import Entity
+from roguebot.state.state import State
+from roguebot.state.state_changes import ChangeJournal, ChangeWatcher, StateTopic
+
+
+def test_subscribers_only_hear_about_their_topics():
+    journal = ChangeJournal()
+    heard = []
+    journal.subscribe(heard.append, [StateTopic.MESSAGE_ADDED])
+
+    journal.record(StateTopic.MAP_REPLACED)
+    journal.record(StateTopic.MESSAGE_ADDED, detail="hello")
+
+    assert_that([change.detail for change in heard]).is_equal_to(["hello"])
+
+
+def test_unsubscribed_callbacks_are_not_called():
+    journal = ChangeJournal()
+    heard = []
+    token = journal.subscribe(heard.append)
+    journal.unsubscribe(token)
+
+    journal.record(StateTopic.MAP_REPLACED)
+
+    assert_that(heard).is_empty()
+
+
+def test_a_failing_subscriber_doesnt_stop_the_others():
+    journal = ChangeJournal()
+    heard = []
+
+    def fail(change):
+        raise ValueError("oops")
+    journal.subscribe(fail)
+    journal.subscribe(heard.append)
+
+    journal.record(StateTopic.MAP_REPLACED)
+
+    assert_that(heard).is_length(1)
+
+
+def test_changes_since_returns_newer_changes_only():
+    journal = ChangeJournal()
+    journal.record(StateTopic.MAP_REPLACED)
+    seen = journal.sequence
+    journal.record(StateTopic.ENTITY_MOVED, entity_id="a")
+    journal.record(StateTopic.MESSAGE_ADDED)
+
+    changes = journal.changes_since(seen, [StateTopic.ENTITY_MOVED])
+
+    assert_that([change.entity_id for change in changes]).is_equal_to(["a"])
+    assert_that(journal.changes_since(journal.sequence)).is_empty()
+
+
+def test_changes_since_forgotten_changes_is_none():
+    journal = ChangeJournal(capacity=2)
+    for _ in range(5):
+        journal.record(StateTopic.MESSAGE_ADDED)
+
+    assert_that(journal.changes_since(1)).is_none()
+    assert_that(journal.changes_since(3)).is_length(2)
+
+
+def test_watcher_is_only_dirty_when_its_topics_change():
+    journal = ChangeJournal()
+    watcher = ChangeWatcher([StateTopic.MAP_REPLACED])
+    assert_that(watcher.is_dirty(journal)).is_true()
+
+    watcher.mark_clean(journal)
+    journal.record(StateTopic.MESSAGE_ADDED)
+    assert_that(watcher.is_dirty(journal)).is_false()
+
+    journal.record(StateTopic.MAP_REPLACED)
+    assert_that(watcher.is_dirty(journal)).is_true()
+
+    assert_that(watcher.is_dirty(ChangeJournal())).is_true()
+
+
+def test_state_records_entity_changes():
+    state = State(my_entity_id="myId")
+    me = Entity(char="@", name="me", position=Point(1, 1, 0), identifier="myId")
+    start = state.changes.sequence
+
+    state.update_entity(me)
+    state.update_position("myId", Point(2, 1, 0))
+    state.delete_entity_at_position(Point(2, 1, 0))
+    state.delete_entity_by_id("myId")
+
+    topics = [change.topic for change in state.changes.changes_since(start)]
+    assert_that(topics).is_equal_to([
+        StateTopic.ENTITY_ADDED, StateTopic.MY_ENTITY_CHANGED,
+        StateTopic.ENTITY_MOVED, StateTopic.MY_ENTITY_CHANGED,
+        StateTopic.ENTITY_REMOVED, StateTopic.MY_ENTITY_CHANGED])
+    assert_that(state.entities.get_by_id("myId")).is_none()
+
+
+def test_state_records_messages():
+    state = State()
+
+    state.add_message("hello")
+
+    assert_that(state.messages).is_equal_to(["hello"])
+    assert_that(state.changes.changes_since(0)[-1].topic).is_equal_to(
+        StateTopic.MESSAGE_ADDED)
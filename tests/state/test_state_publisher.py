@@ -0,0 +1,95 @@
+import pytest
+from assertpy import assert_that
+from roguebot.navigation.point import Point
+from roguebot.state.entity import Entities, Entity
+from roguebot.state.item import Item, Items
+from roguebot.state.state import State
+from roguebot.state.state_publisher import StatePublisher
+
+
+@pytest.fixture
+def live_state() -> State:
+    entities = Entities()
+    entities.add(Entity(char="@", name="me", position=Point(1, 1, 0),
+                        identifier="myID"))
+    entities.add(Entity(char="g", name="goblin", position=Point(5, 5, 0),
+                        identifier="goblinID"))
+    items = Items()
+    items.add(Item(position=Point(2, 2, 0), name="apple", edible=True))
+    state = State(name="me", entities=entities, items=items,
+                  my_entity_id="myID")
+    state.messages.append("hello")
+    return state
+
+
+def test_nothing_published_at_first():
+    publisher = StatePublisher()
+    assert_that(publisher.version).is_equal_to(0)
+    assert_that(publisher.current.my_position).is_none()
+
+
+def test_snapshot_is_not_affected_by_later_changes(live_state):
+    publisher = StatePublisher()
+    snapshot = publisher.publish(live_state)
+
+    live_state.update_position("myID", Point(2, 1, 0))
+    live_state.items.add(Item(position=Point(3, 3, 0), name="sword"))
+
+    assert_that(snapshot.my_position).is_equal_to(Point(1, 1, 0))
+    assert_that(snapshot.entity_count).is_equal_to(2)
+    assert_that(snapshot.item_count).is_equal_to(1)
+    assert_that(snapshot.summary()).is_equal_to(
+        {"version": 1, "position": "Point(1,1,0)", "entities": 2, "items": 1})
+
+
+def test_publishing_unchanged_state_keeps_the_same_version(live_state):
+    publisher = StatePublisher()
+    first = publisher.publish(live_state)
+    second = publisher.publish(live_state)
+
+    assert_that(second).is_same_as(first)
+    assert_that(second.version).is_equal_to(1)
+
+
+def test_any_change_publishes_a_new_version(live_state):
+    publisher = StatePublisher()
+    publisher.publish(live_state)
+
+    live_state.update_position("goblinID", Point(6, 5, 0))
+    assert_that(publisher.publish(live_state).version).is_equal_to(2)
+
+    live_state.messages.append("goodbye")
+    assert_that(publisher.publish(live_state).version).is_equal_to(3)
+
+    live_state.my_entity_id = "goblinID"
+    snapshot = publisher.publish(live_state)
+    assert_that(snapshot.version).is_equal_to(4)
+    assert_that(snapshot.my_position).is_equal_to(Point(6, 5, 0))
+
+
+def test_replacing_the_entities_publishes_a_new_version(live_state):
+    publisher = StatePublisher()
+    publisher.publish(live_state)
+
+    live_state.entities = Entities()
+    snapshot = publisher.publish(live_state)
+
+    assert_that(snapshot.version).is_equal_to(2)
+    assert_that(snapshot.entity_count).is_equal_to(0)
+    assert_that(snapshot.my_position).is_none()
+
+
+def test_entities_version_goes_up_on_change():
+    entities = Entities()
+    start = entities.version
+    fred = Entity(char="A", name="fred",
+                  position=Point(1, 1, 0), identifier="fredID")
+    entities.add(fred)
+    entities.update_position("fredID", Point(2, 1, 0))
+    entities.delete_at_position(Point(9, 9, 0))
+    after_changes = entities.version
+    entities.delete_at_position(Point(9, 9, 0))
+
+    assert_that(after_changes).is_equal_to(start + 2)
+    assert_that(entities.version).is_equal_to(after_changes)
+
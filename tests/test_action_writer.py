@@ -0,0 +1,89 @@
+import asyncio
+from unittest import IsolatedAsyncioTestCase
+from assertpy import assert_that
+from roguebot.action import MoveAction, TakeAction
+from roguebot.action_writer import ActionWriter
+from roguebot.navigation.direction import Direction
+
+
+class RecordingClient():
+    """ Remembers what it was asked to send. Sending can be held up. """
+
+    def __init__(self):
+        self.sent = []
+        self.may_send = asyncio.Event()
+        self.may_send.set()
+
+    async def send_move(self, direction):
+        await self.may_send.wait()
+        self.sent.append(direction.name)
+
+    async def take_item(self, item_name: str):
+        await self.may_send.wait()
+        self.sent.append("take " + item_name)
+
+
+def test_unsent_moves_are_superseded_by_new_moves() -> None:
+    writer = ActionWriter(RecordingClient())
+    writer.submit([MoveAction(Direction.NORTH), MoveAction(Direction.NORTH)])
+
+    writer.submit([MoveAction(Direction.EAST)])
+
+    assert_that(len(writer)).is_equal_to(1)
+    assert_that(writer.superseded_count).is_equal_to(2)
+
+
+def test_item_actions_are_not_superseded() -> None:
+    writer = ActionWriter(RecordingClient())
+    writer.submit([TakeAction("apple"), MoveAction(Direction.NORTH)])
+
+    writer.submit([MoveAction(Direction.EAST)])
+
+    assert_that(len(writer)).is_equal_to(2)
+    assert_that(writer.superseded_count).is_equal_to(1)
+
+
+def test_new_actions_are_dropped_when_the_queue_is_full() -> None:
+    writer = ActionWriter(RecordingClient(), max_queue_depth=2)
+    writer.submit([TakeAction("apple"), TakeAction("pear")])
+
+    queued = writer.submit([TakeAction("plum")])
+
+    assert_that(queued).is_equal_to(0)
+    assert_that(writer.dropped_count).is_equal_to(1)
+    assert_that(writer.summary()).contains_entry({"max_queue_depth": 2})
+
+
+class TestActionWriterTask(IsolatedAsyncioTestCase):
+
+    async def test_queued_actions_are_sent_in_order_by_the_task(self):
+        client = RecordingClient()
+        writer = ActionWriter(client)
+        writer.start()
+
+        writer.submit([TakeAction("apple"), MoveAction(Direction.NORTH)])
+        assert_that(client.sent).is_empty()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        await writer.stop()
+
+        assert_that(client.sent).is_equal_to(["take apple", "NORTH"])
+        assert_that(writer.summary()).contains_entry({"sent": 2}, {"queue_depth": 0})
+
+    async def test_submit_does_not_wait_for_slow_sends(self):
+        client = RecordingClient()
+        client.may_send.clear()
+        writer = ActionWriter(client)
+        writer.start()
+
+        writer.submit([MoveAction(Direction.NORTH), MoveAction(Direction.NORTH)])
+        await asyncio.sleep(0)
+        # The first move is being sent, so only the second can be superseded.
+        writer.submit([MoveAction(Direction.SOUTH)])
+        client.may_send.set()
+        while writer.sent_count < 2:
+            await asyncio.sleep(0)
+        await writer.stop()
+
+        assert_that(client.sent).is_equal_to(["NORTH", "SOUTH"])
+        assert_that(writer.superseded_count).is_equal_to(1)
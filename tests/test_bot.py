@@ -3,7 +3,8 @@ import unittest
 from unittest import IsolatedAsyncioTestCase
 import roguebot
 from roguebot.bot import Bot
-from roguebot.action import Action
+from roguebot.tick_scheduler import AdaptiveTickScheduler
+from roguebot.action import Action, EatAction
 from roguebot.brains.ibrain import IBrain
 from roguebot.iclient import IEntityClient
 from roguebot.state.dungeon_map import DungeonMap
@@ -215,8 +216,7 @@ class AsyncBotTest(IsolatedAsyncioTestCase):
                 return False
 
         state = None
-        bot = BotNotEverReady("me", MockEntityClient(state))
-        bot._ignore_ticks_before_act = 1
+        bot = BotNotEverReady("me", MockEntityClient(state), speed=10)
 
         mock_brain = Mock(spec=IBrain)
         bot._brain = mock_brain
@@ -244,8 +244,7 @@ class AsyncBotTest(IsolatedAsyncioTestCase):
         state.entities.add(me)
         state.dungeon_map = dungeon
 
-        bot = Bot("me", MockEntityClient(state))
-        bot._ignore_ticks_before_act = 1
+        bot = Bot("me", MockEntityClient(state), speed=10)
 
         mock_brain = Mock(spec=IBrain)
         bot._brain = mock_brain
@@ -259,6 +258,91 @@ class AsyncBotTest(IsolatedAsyncioTestCase):
         await bot.tick()
         mock_brain.decide_actions.assert_called_once()
 
+    async def test_scheduler_chooses_moves_per_turn_and_shows_in_status(self) -> None:
+        state = State()
+        state.my_entity_id = 'myId'
+        state.entities.add(Entity(char='@', name='me',
+                                  position=Point(1, 1, 0), identifier='myId'))
+        state.dungeon_map = get_dungeon_from_picture("""
+        ----------- level z=0 :
+        ###
+        # #
+        ###
+        -----------
+        """)
+        bot = Bot("me", MockEntityClient(state),
+                  tick_scheduler=AdaptiveTickScheduler(min_moves_per_act=3,
+                                                       max_moves_per_act=3))
+        mock_brain = Mock(spec=IBrain)
+        mock_brain.status_summary = {}
+        bot._brain = mock_brain
+        mock_brain.decide_actions.return_value = []
+
+        await bot.tick()
+
+        mock_brain.decide_actions.assert_called_once()
+        assert_that(mock_brain.max_actions_per_turn).is_equal_to(3)
+        assert_that(bot.status_summary["scheduler"]).contains_entry(
+            {"mode": "adaptive"}, {"acts": 1})
+
+    async def test_tick_publishes_a_snapshot_of_the_state(self) -> None:
+        state = State()
+        state.my_entity_id = 'myId'
+        me = Entity(char='@', name='me',
+                    position=Point(1, 1, 0), identifier='myId')
+        state.entities.add(me)
+        state.dungeon_map = get_dungeon_from_picture("""
+        ----------- level z=0 :
+        ###
+        # #
+        ###
+        -----------
+        """)
+
+        bot = Bot("me", MockEntityClient(state), speed=10)
+        mock_brain = Mock(spec=IBrain)
+        mock_brain.status_summary = {}
+        mock_brain.decide_actions.return_value = []
+        bot._brain = mock_brain
+        assert_that(bot.is_ready).is_false()
+
+        # The first tick is skipped, and the bot acts on the second.
+        await bot.tick()
+        await bot.tick()
+        state.update_position('myId', Point(2, 1, 0))
+
+        snapshot = bot.snapshot
+        assert_that(snapshot.version).is_equal_to(1)
+        assert_that(snapshot.my_position).is_equal_to(Point(1, 1, 0))
+        assert_that(bot.status_summary["state"]).contains_entry(
+            {'version': 1}, {'entities': 1})
+        assert_that(bot.is_ready).is_true()
+
+    async def test_ticks_without_acting_publish_nothing(self) -> None:
+        state = State()
+        state.my_entity_id = 'myId'
+        state.entities.add(Entity(char='@', name='me',
+                                  position=Point(1, 1, 0), identifier='myId'))
+        state.dungeon_map = get_dungeon_from_picture("""
+        ----------- level z=0 :
+        ###
+        # #
+        ###
+        -----------
+        """)
+
+        # Acts every 6th tick.
+        bot = Bot("me", MockEntityClient(state), speed=5)
+        mock_brain = Mock(spec=IBrain)
+        mock_brain.decide_actions.return_value = []
+        bot._brain = mock_brain
+
+        for _ in range(5):
+            await bot.tick()
+
+        assert_that(bot.snapshot.version).is_equal_to(0)
+        assert_that(bot.is_ready).is_false()
+
     async def test_action_returns_by_brain_gets_executed(self) -> None:
         mock_client = AsyncMock(spec=IEntityClient)
         bot = Bot("me", client=mock_client)
@@ -269,4 +353,43 @@ class AsyncBotTest(IsolatedAsyncioTestCase):
 
         await bot._do_action()
 
-        mock_action.do_action.assert_awaited_once()
+        # The client is given the actions to send.
+        mock_client.submit_actions.assert_awaited_once_with([mock_action])
+
+    async def test_time_spent_deciding_is_added_up(self) -> None:
+        mock_client = AsyncMock(spec=IEntityClient)
+        bot = Bot("me", client=mock_client)
+        mock_brain = Mock(spec=IBrain)
+        bot._brain = mock_brain
+
+        def busy_deciding(state):
+            sum(range(100000))
+            return []
+        mock_brain.decide_actions.side_effect = busy_deciding
+
+        assert_that(bot.decision_cpu_seconds).is_equal_to(0)
+        await bot._do_action()
+
+        assert_that(bot.decision_cpu_seconds).is_greater_than(0)
+
+    async def test_item_action_is_not_sent_again_while_pending(self) -> None:
+        state = State(my_entity_id='myId')
+        state.entities.add(Entity(char='@', name='me',
+                                  position=Point(1, 1, 0), identifier='myId'))
+        mock_client = AsyncMock(spec=IEntityClient)
+        mock_client.state = state
+        bot = Bot("me", client=mock_client)
+        mock_brain = Mock(spec=IBrain)
+        mock_brain.status_summary = {}
+        bot._brain = mock_brain
+        mock_brain.decide_actions.return_value = [EatAction('apple')]
+
+        await bot._do_action()
+        await bot._do_action()
+
+        mock_client.submit_actions.assert_awaited_once()
+        submitted_actions = mock_client.submit_actions.await_args.args[0]
+        assert_that(submitted_actions).is_length(1)
+        assert_that(submitted_actions[0].item_name).is_equal_to('apple')
+        assert_that(bot.status_summary["pending_actions"]).contains_entry(
+            {"suppressed": 1})
@@ -1,5 +1,7 @@
 
+import asyncio
 import pytest
+import socketio
 from unittest import IsolatedAsyncioTestCase
 from roguebot.bot import Bot
 from roguebot.client import EntityClient
@@ -10,6 +12,8 @@ from roguebot.state.item import Items
 from roguebot.state.entity import Entity, Entities
 from roguebot.navigation.direction import Direction
 from roguebot.navigation.point import Point
+from roguebot.action import MoveAction
+from tests.state.dungeon_draw import get_dungeon_from_picture
 
 
 class MockSocketIO():
@@ -251,6 +255,7 @@ class TestAsyncClientCalls(IsolatedAsyncioTestCase):
                                        }
 
         await entity_client.update_received(raw_entity_wire_format_data)
+        entity_client.apply_pending_events()
 
         entity_set_into_state = state.entities.get_by_id("aaa")
 
@@ -273,6 +278,7 @@ class TestAsyncClientCalls(IsolatedAsyncioTestCase):
         raw_wire_format_data = {'id': 'aaa', "pos": {'x': 1, 'y': 2, 'z': 0}}
 
         await entity_client.position_received(raw_wire_format_data)
+        entity_client.apply_pending_events()
 
         entity_set_into_state = state.entities.get_by_id("aaa")
 
@@ -317,6 +323,7 @@ class TestAsyncClientCalls(IsolatedAsyncioTestCase):
                                   }
 
         await entity_client.delete_received(delete_event_wire_data)
+        entity_client.apply_pending_events()
 
         entity_set_into_state = state.entities.get_by_id("aaa")
 
@@ -362,9 +369,13 @@ class TestClient(IsolatedAsyncioTestCase):
              }
         ]
         }
-        result = await client.items_received(item_wire_format_data)
+        await client.items_received(item_wire_format_data)
+        # Items wait, like entity events, until the bot is about to think.
+        items.update_items.assert_not_called()
 
-        items.update_items.assert_called()
+        client.apply_pending_events()
+
+        items.update_items.assert_called_with(item_wire_format_data, level=0)
 
     async def test_can_update_map(self):
         # Given...
@@ -440,6 +451,7 @@ class TestClient(IsolatedAsyncioTestCase):
 
         # When...
         result = await client.entities_received(raw_entity_wire_format_data)
+        client.apply_pending_events()
 
         # Then ... bot should now have a dungeon map created from the wire-data.
         assert_that(client.state.entities.get_by_id(
@@ -459,7 +471,6 @@ class TestClient(IsolatedAsyncioTestCase):
 
         # Then ... bot should now have a dungeon map created from the wire-data.
         assert_that(client._server_url).is_equal_to("http://somewhere-else")
-        assert_that(client._is_reconnecting).is_true()
 
     async def test_client_reconnect_received_sent_path_after_url(self):
 
@@ -476,7 +487,6 @@ class TestClient(IsolatedAsyncioTestCase):
         # Then ... bot should now have a dungeon map created from the wire-data.
         assert_that(client._server_url).is_equal_to(
             "http://localhost:2999/cake")
-        assert_that(client._is_reconnecting).is_true()
 
     async def test_client_reconnect_received_sent_path_after_path(self):
 
@@ -495,7 +505,222 @@ class TestClient(IsolatedAsyncioTestCase):
         # Then ... bot should now have a dungeon map created from the wire-data.
         assert_that(client._server_url).is_equal_to(
             "http://localhost:2999/cake2")
-        assert_that(client._is_reconnecting).is_true()
+
+
+    async def test_submitted_actions_are_sent_by_the_writer_task(self):
+        client = EntityClient(character_name="fred",
+                              character_role="warrior",
+                              url="http://localhost:2999"
+                              )
+        socket_io = MockSocketIO()
+        client._sio = socket_io
+
+        await client.submit_actions([MoveAction(Direction.NORTH)])
+        assert_that(socket_io.emitted_event_name).is_none()
+        while client.status_summary["actions"]["sent"] < 1:
+            await asyncio.sleep(0)
+        await client._action_writer.stop()
+
+        assert_that(socket_io.emitted_event_name).is_equal_to('move')
+        assert_that(socket_io.emitted_event_data).is_equal_to('NORTH')
+
+    async def test_own_moves_are_predicted_then_confirmed_by_the_server(self):
+        client = EntityClient(character_name="fred",
+                              character_role="warrior",
+                              url="http://localhost:2999"
+                              )
+        client._sio = MockSocketIO()
+        client.bot = MockBot()
+        client.state.dungeon_map = get_dungeon_from_picture("""
+        ----------- level z=0 :
+        #####
+        #   #
+        #####
+        -----------
+        """)
+        client.state.entities.add(Entity("@", "fred", Point(1, 1, 0), "me"))
+        client.state.my_entity_id = "me"
+
+        await client.send_move(Direction.EAST)
+        await client.send_move(Direction.EAST)
+        assert_that(client.state.find_my_entity().position).is_equal_to(Point(3, 1, 0))
+
+        await client.position_received({'id': 'me', 'pos': {'x': 2, 'y': 1, 'z': 0}})
+        await client.ping_received()
+
+        assert_that(client.state.find_my_entity().position).is_equal_to(Point(3, 1, 0))
+        assert_that(client.status_summary["prediction"]).contains_entry(
+            {"predicted": 2}, {"confirmed": 1}, {"outstanding": 1})
+        assert_that(client.move_acks.acknowledged_count).is_equal_to(1)
+        assert_that(client.status_summary["moves"]).contains_entry(
+            {"sent": 2}, {"waiting": 1})
+
+    async def test_only_the_latest_entity_events_are_applied_at_ping(self):
+        client = EntityClient(character_name="fred",
+                              character_role="warrior",
+                              url="http://localhost:2999"
+                              )
+        mock_bot = MockBot()
+        client.bot = mock_bot
+        client.state.entities.add(Entity("A", "mc", Point(1, 1, 0), "aaa"))
+
+        await client.entities_received([{'char': 'G', 'name': 'gob', 'id': 'ggg',
+                                         'pos': {'x': 5, 'y': 5, 'z': 0},
+                                         'alive': True, 'hunger': 0, 'inventory': []}])
+        for x in range(1, 4):
+            await client.position_received({'id': 'ggg', 'pos': {'x': x, 'y': 2, 'z': 0}})
+
+        # Nothing applied until the bot is about to think.
+        assert_that(client.state.entities.get_by_id('aaa')).is_not_none()
+
+        await client.ping_received()
+
+        assert_that(mock_bot.is_tick_called).is_true()
+        assert_that(client.state.entities.get_by_id('aaa')).is_none()
+        assert_that(client.state.entities.get_by_id(
+            'ggg').position).is_equal_to(Point(3, 2, 0))
+        assert_that(client.status_summary["events"]).contains_entry(
+            {"received": 4}, {"applied": 2})
+
+    async def test_items_after_entities_are_placed_on_the_floor_we_end_up_on(self):
+        client = EntityClient(character_name="fred",
+                              character_role="warrior",
+                              url="http://localhost:2999"
+                              )
+        client.bot = MockBot()
+        client.state.my_entity_id = 'aaa'
+
+        await client.entities_received([{'char': 'A', 'name': 'mc', 'id': 'aaa',
+                                         'pos': {'x': 5, 'y': 5, 'z': 0},
+                                         'alive': True, 'hunger': 0, 'inventory': []}])
+        await client.position_received({'id': 'aaa', 'pos': {'x': 5, 'y': 5, 'z': 1}})
+        await client.items_received({'(2,2,1)': [
+            {'pos': {'x': 2, 'y': 2, 'z': 1}, 'name': 'apple',
+             'edible': True, 'wieldable': False, 'wearable': False}]})
+
+        await client.ping_received()
+
+        assert_that(client.state.items.get_items_at_position(Point(2, 2, 1))).is_length(1)
+
+    async def test_empty_items_list_is_for_the_floor_we_were_on_when_it_arrived(self):
+        client = EntityClient(character_name="fred",
+                              character_role="warrior",
+                              url="http://localhost:2999"
+                              )
+        client.bot = MockBot()
+        client.state.my_entity_id = 'aaa'
+        client.state.entities.add(Entity("A", "mc", Point(5, 5, 0), "aaa"))
+        client.state.update_items({'(2,2,0)': [
+            {'pos': {'x': 2, 'y': 2, 'z': 0}, 'name': 'apple',
+             'edible': True, 'wieldable': False, 'wearable': False}]})
+
+        # Someone took the apple, then we went downstairs.
+        await client.items_received({})
+        await client.position_received({'id': 'aaa', 'pos': {'x': 5, 'y': 5, 'z': 1}})
+        await client.ping_received()
+
+        assert_that(client.state.items.count_on_floor(0)).is_equal_to(0)
+
+    async def test_next_cave_is_connected_before_leaving_the_old_one(self):
+        log = []
+        client = HandOffClient(log)
+        first_socket = RecordingSocketIO("cave0", log)
+
+        async def gateway_reached():
+            await client.reconnect_received({'url': '/cave/1'})
+        first_socket.on_wait = gateway_reached
+
+        await client.run_comms(first_socket)
+
+        assert_that(log).is_equal_to([
+            "cave0 connect None", "cave0 wait",
+            "cave1 connect /cave/1", "cave0 disconnect",
+            "cave1 wait"])
+
+    async def test_events_from_the_old_cave_are_ignored(self):
+        log = []
+        client = HandOffClient(log)
+        mock_bot = MockBot()
+        client.bot = mock_bot
+        first_socket = RecordingSocketIO("cave0", log)
+        await client.run_comms(first_socket)
+
+        await client.reconnect_received({'url': '/cave/1'})
+        await first_socket.handlers['ping']()
+        assert_that(mock_bot.is_tick_called).is_false()
+
+        await client.sockets_created[0].handlers['ping']()
+        assert_that(mock_bot.is_tick_called).is_true()
+
+        handoff = client.status_summary["handoff"]
+        assert_that(handoff).contains_entry(
+            {"count": 1}, {"stale_events_ignored": 1})
+        assert_that(handoff["last_seconds"]).is_greater_than_or_equal_to(0)
+
+    async def test_failed_handoff_leaves_the_old_cave_and_finishes(self):
+        log = []
+        client = HandOffClient(log, next_cave_refuses=True)
+        first_socket = RecordingSocketIO("cave0", log)
+
+        async def gateway_reached():
+            await client.reconnect_received({'url': '/cave/1'})
+        first_socket.on_wait = gateway_reached
+
+        await client.run_comms(first_socket)
+
+        assert_that(log).is_equal_to([
+            "cave0 connect None", "cave0 wait",
+            "cave1 connect /cave/1", "cave1 disconnect", "cave0 disconnect"])
+        assert_that(client._handoff_started_at).is_none()
+        assert_that(client.status_summary["handoff"]).contains_entry(
+            {"count": 0}, {"failed": 1})
+
+
+class RecordingSocketIO(MockSocketIO):
+    """ Remembers its handlers, and what happened to it, in a shared log. """
+
+    def __init__(self, name: str, log: list):
+        super().__init__()
+        self.name = name
+        self.log = log
+        self.handlers = {}
+        self.on_wait = None
+        self.refuses = False
+
+    def on(self, event_name: str, callback) -> None:
+        super().on(event_name, callback)
+        self.handlers[event_name] = callback
+
+    async def connect(self, url, auth, transports, socketio_path=None) -> None:
+        self.log.append(self.name + " connect " + str(socketio_path))
+        if self.refuses:
+            raise socketio.exceptions.ConnectionError("refused")
+
+    async def wait(self) -> None:
+        self.log.append(self.name + " wait")
+        if self.on_wait is not None:
+            await self.on_wait()
+
+    async def disconnect(self) -> None:
+        await super().disconnect()
+        self.log.append(self.name + " disconnect")
+
+
+class HandOffClient(EntityClient):
+    """ Connections to the next cave use RecordingSocketIOs """
+
+    def __init__(self, log: list, next_cave_refuses: bool = False):
+        super().__init__(character_name="fred", character_role="warrior",
+                         url="http://localhost:2999")
+        self.log = log
+        self.next_cave_refuses = next_cave_refuses
+        self.sockets_created = []
+
+    def _create_socket(self):
+        socket_io = RecordingSocketIO("cave" + str(len(self.sockets_created) + 1), self.log)
+        socket_io.refuses = self.next_cave_refuses
+        self.sockets_created.append(socket_io)
+        return socket_io
 
 
 class StopNoOpClient(EntityClient):
@@ -503,3 +728,9 @@ class StopNoOpClient(EntityClient):
         """
         Over-riding this method because this bit isn't being tested here
         """
+
+    def _create_socket(self):
+        """
+        Connections to the next cave go nowhere.
+        """
+        return MockSocketIO()
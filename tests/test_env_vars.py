@@ -157,3 +157,113 @@ def test_missing_debug_ok_defaults_to_false(env_a, ok_python_version) -> None:
 
     assert_that(env.is_ok).is_true()
     assert_that(env.is_debug).is_false()
+
+
+def test_columnar_entities_defaults_to_false(env_a, ok_python_version) -> None:
+    env = EnvVarExtractor(env_a, ok_python_version)
+    assert_that(env.columnar_entities).is_false()
+
+
+def test_columnar_entities_can_be_turned_on(env_a, ok_python_version) -> None:
+    env_a['K_AND_K_BOT_COLUMNAR_ENTITIES'] = 'True'
+    env = EnvVarExtractor(env_a, ok_python_version)
+    assert_that(env.columnar_entities).is_true()
+
+
+def test_retention_limits_have_defaults(env_a, ok_python_version) -> None:
+    env = EnvVarExtractor(env_a, ok_python_version)
+    assert_that(env.retention_max_levels).is_equal_to(3)
+    assert_that(env.retention_max_level_age_seconds).is_equal_to(1800)
+    assert_that(env.retention_max_places_per_level).is_equal_to(2000)
+    assert_that(env.retention_max_goal_depth).is_equal_to(32)
+
+
+def test_retention_limits_cannot_drop_below_one(env_a, ok_python_version) -> None:
+    env_a['K_AND_K_BOT_RETENTION_MAX_LEVELS'] = '0'
+    env_a['K_AND_K_BOT_RETENTION_MAX_GOAL_DEPTH'] = '-4'
+    env = EnvVarExtractor(env_a, ok_python_version)
+    assert_that(env.retention_max_levels).is_equal_to(1)
+    assert_that(env.retention_max_goal_depth).is_equal_to(1)
+
+
+def test_wire_trace_is_off_by_default(env_a, ok_python_version) -> None:
+    env = EnvVarExtractor(env_a, ok_python_version)
+    assert_that(env.wire_trace_file).is_none()
+    assert_that(env.wire_trace_sample_rates).is_empty()
+    assert_that(env.wire_trace_payload_bytes).is_equal_to(256)
+
+
+def test_wire_trace_sample_rates_are_parsed(env_a, ok_python_version) -> None:
+    env_a['K_AND_K_BOT_WIRE_TRACE_FILE'] = '/tmp/wire.ndjson'
+    env_a['K_AND_K_BOT_WIRE_TRACE_SAMPLE_RATES'] = 'position=0.1, update=2'
+    env = EnvVarExtractor(env_a, ok_python_version)
+    assert_that(env.wire_trace_file).is_equal_to('/tmp/wire.ndjson')
+    assert_that(env.wire_trace_sample_rates).is_equal_to(
+        {'position': 0.1, 'update': 1.0})
+
+
+def test_fleet_size_defaults_to_one(env_a, ok_python_version) -> None:
+    env = EnvVarExtractor(env_a, ok_python_version)
+    assert_that(env.fleet_size).is_equal_to(1)
+
+
+def test_fleet_size_cannot_drop_below_one(env_a, ok_python_version) -> None:
+    env_a['K_AND_K_BOT_FLEET_SIZE'] = '0'
+    env = EnvVarExtractor(env_a, ok_python_version)
+    assert_that(env.fleet_size).is_equal_to(1)
+
+
+def test_fleet_workers_defaults_to_one(env_a, ok_python_version) -> None:
+    env = EnvVarExtractor(env_a, ok_python_version)
+    assert_that(env.fleet_workers).is_equal_to(1)
+
+
+def test_fleet_workers_zero_means_one_per_core(env_a, ok_python_version) -> None:
+    env_a['K_AND_K_BOT_FLEET_WORKERS'] = '-1'
+    env = EnvVarExtractor(env_a, ok_python_version)
+    assert_that(env.fleet_workers).is_equal_to(0)
+
+
+def test_fleet_rebalance_seconds_defaults_to_five_minutes(env_a, ok_python_version) -> None:
+    env = EnvVarExtractor(env_a, ok_python_version)
+    assert_that(env.fleet_rebalance_seconds).is_equal_to(300)
+
+
+def test_fleet_rebalance_seconds_zero_turns_it_off(env_a, ok_python_version) -> None:
+    env_a['K_AND_K_BOT_FLEET_REBALANCE_SECONDS'] = '-5'
+    env = EnvVarExtractor(env_a, ok_python_version)
+    assert_that(env.fleet_rebalance_seconds).is_equal_to(0)
+
+
+def test_scheduler_defaults_to_adaptive(env_a, ok_python_version) -> None:
+    env = EnvVarExtractor(env_a, ok_python_version)
+    assert_that(env.scheduler).is_equal_to("adaptive")
+
+
+def test_scheduler_can_be_fixed(env_a, ok_python_version) -> None:
+    env_a['K_AND_K_BOT_SCHEDULER'] = 'fixed'
+    env = EnvVarExtractor(env_a, ok_python_version)
+    assert_that(env.scheduler).is_equal_to("fixed")
+
+
+def test_unknown_scheduler_is_adaptive(env_a, ok_python_version) -> None:
+    env_a['K_AND_K_BOT_SCHEDULER'] = 'fast'
+    env = EnvVarExtractor(env_a, ok_python_version)
+    assert_that(env.scheduler).is_equal_to("adaptive")
+
+
+def test_json_codec_defaults_to_auto(env_a, ok_python_version) -> None:
+    env = EnvVarExtractor(env_a, ok_python_version)
+    assert_that(env.json_codec).is_equal_to("auto")
+
+
+def test_json_codec_can_be_chosen(env_a, ok_python_version) -> None:
+    env_a['K_AND_K_BOT_JSON_CODEC'] = 'json'
+    env = EnvVarExtractor(env_a, ok_python_version)
+    assert_that(env.json_codec).is_equal_to("json")
+
+
+def test_unknown_json_codec_is_auto(env_a, ok_python_version) -> None:
+    env_a['K_AND_K_BOT_JSON_CODEC'] = 'simplejson'
+    env = EnvVarExtractor(env_a, ok_python_version)
+    assert_that(env.json_codec).is_equal_to("auto")
@@ -0,0 +1,120 @@
+import pytest
+from assertpy import assert_that
+from roguebot.event_coalescer import EventCoalescer
+from roguebot.navigation.point import Point
+from roguebot.state.entity import Entity
+from roguebot.state.state import State
+
+
+def raw_entity(identifier: str, name: str, x: int) -> dict:
+    return {'char': 'G', 'name': name, 'id': identifier, 'alive': True,
+            'pos': {'x': x, 'y': 1, 'z': 0}, 'hunger': 0, 'inventory': []}
+
+
+@pytest.fixture
+def state() -> State:
+    state = State()
+    state.entities.add(Entity('G', 'gob', Point(1, 1, 0), 'gob'))
+    state.entities.add(Entity('T', 'troll', Point(9, 9, 0), 'troll'))
+    return state
+
+
+def test_last_entities_list_wins(state):
+    coalescer = EventCoalescer()
+    coalescer.add_position('gob', Point(2, 1, 0))
+    coalescer.add_entities([raw_entity('orc', 'orc', 3)])
+    coalescer.add_entities([raw_entity('elf', 'elf', 4)])
+
+    assert_that(coalescer.apply_to(state)).is_equal_to(1)
+
+    assert_that([entity.name for entity in state.entities.get_all()]).is_equal_to(['elf'])
+
+
+def test_update_replaces_earlier_moves_but_later_moves_still_count(state):
+    coalescer = EventCoalescer()
+    coalescer.add_position('gob', Point(2, 1, 0))
+    coalescer.add_update(raw_entity('gob', 'big gob', 3))
+    coalescer.add_position('gob', Point(4, 1, 0))
+    coalescer.add_position('gob', Point(5, 1, 0))
+
+    assert_that(coalescer.pending_count).is_equal_to(2)
+    coalescer.apply_to(state)
+
+    gob = state.entities.get_by_id('gob')
+    assert_that(gob.name).is_equal_to('big gob')
+    assert_that(gob.position).is_equal_to(Point(5, 1, 0))
+
+
+def test_moves_either_side_of_a_delete_at_a_point_are_kept(state):
+    coalescer = EventCoalescer()
+    coalescer.add_position('gob', Point(2, 1, 0))
+    coalescer.add_delete({'x': 2, 'y': 1, 'z': 0})
+    coalescer.add_position('troll', Point(2, 1, 0))
+
+    coalescer.apply_to(state)
+
+    assert_that(state.entities.get_by_id('gob')).is_none()
+    assert_that(state.entities.get_by_id('troll').position).is_equal_to(Point(2, 1, 0))
+
+
+def test_delete_makes_earlier_moves_pointless(state):
+    coalescer = EventCoalescer()
+    coalescer.add_position('gob', Point(2, 1, 0))
+    coalescer.add_delete({'id': 'gob'})
+    coalescer.add_position('nobody', Point(2, 1, 0))
+
+    assert_that(coalescer.apply_to(state)).is_equal_to(1)
+
+    assert_that(state.entities.get_by_id('gob')).is_none()
+    assert_that(coalescer.summary()).is_equal_to(
+        {"received": 3, "applied": 1, "batches": 1, "applied_ratio": 0.333})
+
+
+def test_latest_position_of_an_entity_comes_from_the_last_event_about_it():
+    coalescer = EventCoalescer()
+    coalescer.add_entities([raw_entity('gob', 'gob', 3)])
+    assert_that(coalescer.latest_position_of('gob')).is_equal_to(Point(3, 1, 0))
+
+    coalescer.add_position('gob', Point(4, 1, 0))
+    coalescer.add_position('troll', Point(8, 8, 0))
+    assert_that(coalescer.latest_position_of('gob')).is_equal_to(Point(4, 1, 0))
+
+    coalescer.add_delete({'id': 'gob'})
+    assert_that(coalescer.latest_position_of('gob')).is_none()
+    assert_that(coalescer.latest_position_of('elf')).is_none()
+
+
+def raw_item(x: int, y: int, z: int, name: str) -> dict:
+    return {'pos': {'x': x, 'y': y, 'z': z}, 'name': name,
+            'edible': False, 'wieldable': True, 'wearable': False}
+
+
+def test_items_go_on_the_floor_they_arrived_for_even_after_the_stairs(state):
+    state.my_entity_id = 'gob'
+    state.update_items({'(5,5,2)': [raw_item(5, 5, 2, 'sword')]}, 2)
+    coalescer = EventCoalescer()
+
+    # We pick up something on floor 0, then take the stairs to floor 2.
+    coalescer.add_items({'(3,3,0)': [raw_item(3, 3, 0, 'rock')]}, 0)
+    coalescer.add_position('gob', Point(1, 1, 2))
+
+    assert_that(coalescer.apply_to(state)).is_equal_to(2)
+
+    assert_that(state.find_my_entity().position).is_equal_to(Point(1, 1, 2))
+    assert_that(state.items.count_on_floor(0)).is_equal_to(1)
+    assert_that(state.items.get_items_at_position(Point(3, 3, 0))).is_length(1)
+    assert_that(state.items.count_on_floor(2)).is_equal_to(1)
+    assert_that(state.items.get_items_at_position(Point(5, 5, 2))).is_length(1)
+
+
+def test_later_items_for_the_same_floor_replace_earlier_ones(state):
+    coalescer = EventCoalescer()
+    coalescer.add_items({'(3,3,0)': [raw_item(3, 3, 0, 'rock')]}, 0)
+    coalescer.add_items({}, 0)
+    coalescer.add_items({'(5,5,1)': [raw_item(5, 5, 1, 'sword')]}, 1)
+
+    assert_that(coalescer.pending_count).is_equal_to(2)
+    coalescer.apply_to(state)
+
+    assert_that(state.items.count_on_floor(0)).is_equal_to(0)
+    assert_that(state.items.count_on_floor(1)).is_equal_to(1)
@@ -0,0 +1,80 @@
+import json
+import pytest
+import engineio
+import socketio
+from assertpy import assert_that
+from roguebot.client import EntityClient
+from roguebot.json_codec import JsonCodec, available_codecs, benchmark, \
+    create_json_codec, made_up_payloads, read_trace_payloads
+from roguebot.wire_trace import WireTracer
+
+
+@pytest.mark.parametrize("codec", available_codecs(), ids=lambda codec: codec.name)
+def test_every_codec_round_trips_packets(codec) -> None:
+    data = ["entities", [{"id": "rat-1", "pos": {"x": 1, "y": 2, "z": 0},
+                          "name": "café", "alive": True, "hp": 2.5, "inventory": []}]]
+
+    text = codec.dumps(data, separators=(',', ':'))
+
+    assert_that(text).is_instance_of(str)
+    assert_that(json.loads(text)).is_equal_to(data)
+    assert_that(codec.loads(text)).is_equal_to(data)
+
+
+def test_standard_json_is_always_available() -> None:
+    assert_that([codec.name for codec in available_codecs()]).contains("json")
+
+
+def test_auto_picks_the_fastest_installed() -> None:
+    assert_that(create_json_codec().name).is_equal_to(available_codecs()[0].name)
+
+
+def test_codec_can_be_chosen_by_name() -> None:
+    assert_that(create_json_codec("json")).is_instance_of(JsonCodec)
+    assert_that(create_json_codec("json").name).is_equal_to("json")
+
+
+def test_unknown_codec_picks_one_instead() -> None:
+    assert_that(create_json_codec("simplejson").name).is_equal_to(
+        available_codecs()[0].name)
+
+
+def test_whole_payloads_are_read_from_a_wire_trace(tmp_path) -> None:
+    file_path = str(tmp_path / "wire.ndjson")
+    tracer = WireTracer(file_path=file_path, payload_bytes=20)
+    tracer.trace('position', {"x": 1, "y": 2})
+    tracer.trace('map', {"tiles": [[["a long way past twenty bytes"]]]})
+    tracer.close()
+
+    assert_that(read_trace_payloads(file_path)).is_equal_to(['{"x":1,"y":2}'])
+
+
+def test_benchmark_times_every_codec() -> None:
+    payloads = made_up_payloads(width=5, height=5, entity_count=3)
+
+    seconds = benchmark(payloads, available_codecs(), repeat=1)
+
+    assert_that(seconds).contains_key("json")
+    assert_that(json.loads(payloads[0])["width"]).is_equal_to(5)
+
+
+@pytest.fixture
+def restore_socket_io_json():
+    # socket.io swaps the json module for every socket in the process.
+    socketio_json = socketio.packet.Packet.json
+    engineio_json = engineio.packet.Packet.json
+    yield
+    socketio.packet.Packet.json = socketio_json
+    engineio.packet.Packet.json = engineio_json
+
+
+def test_client_hands_its_codec_to_socket_io(restore_socket_io_json) -> None:
+    codec = create_json_codec("json")
+    client = EntityClient("name", "role", "http://localhost", json_codec=codec)
+
+    sio = client._create_socket()
+
+    assert_that(client.json_codec).is_same_as(codec)
+    assert_that(sio.packet_class.json).is_same_as(codec)
+    assert_that(engineio.packet.Packet.json).is_same_as(codec)
+    assert_that(client.status_summary["json_codec"]).is_equal_to("json")
@@ -0,0 +1,37 @@
+from assertpy import assert_that
+from roguebot.latency_histogram import LatencyHistogram
+
+
+def test_empty_histogram_has_no_percentiles():
+    histogram = LatencyHistogram()
+    assert_that(histogram.percentile(50)).is_none()
+    assert_that(histogram.summary()).contains_entry({"count": 0}, {"p99": None})
+
+
+def test_percentiles_are_within_a_few_percent():
+    histogram = LatencyHistogram()
+    for millis in range(1, 1001):
+        histogram.record(millis / 1000)
+
+    assert_that(histogram.count).is_equal_to(1000)
+    assert_that(histogram.percentile(50)).is_close_to(0.5, 0.5 / 16)
+    assert_that(histogram.percentile(99)).is_close_to(0.99, 0.99 / 16)
+    assert_that(histogram.percentile(100)).is_equal_to(1.0)
+    assert_that(histogram.mean_seconds).is_close_to(0.5005, 1e-9)
+
+
+def test_percentiles_never_fall_outside_what_was_recorded():
+    histogram = LatencyHistogram()
+    histogram.record(0.2)
+
+    assert_that(histogram.percentile(1)).is_equal_to(0.2)
+    assert_that(histogram.percentile(100)).is_equal_to(0.2)
+
+
+def test_latencies_beyond_the_range_are_kept_in_the_last_bucket():
+    histogram = LatencyHistogram(highest_seconds=1)
+    histogram.record(0.1)
+    histogram.record(50)
+
+    assert_that(histogram.max_seconds).is_equal_to(50)
+    assert_that(histogram.percentile(100)).is_equal_to(50)
@@ -0,0 +1,83 @@
+import pytest
+from assertpy import assert_that
+from roguebot.move_ack import MoveAckTracker
+from roguebot.navigation.direction import Direction
+from roguebot.navigation.point import Point
+from tests.fake_clock import FakeClock
+
+
+class RecordingListener():
+    def __init__(self):
+        self.rtts = []
+        self.lost = []
+
+    def observe_move_rtt(self, seconds: float) -> None:
+        self.rtts.append(seconds)
+
+    def observe_moves_lost(self, count: int) -> None:
+        self.lost.append(count)
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def tracker(clock) -> MoveAckTracker:
+    return MoveAckTracker(timeout_seconds=2, clock=clock)
+
+
+def test_position_acknowledges_the_move_which_expected_it(tracker, clock):
+    listener = RecordingListener()
+    tracker.add_listener(listener)
+    first = tracker.move_sent(Point(1, 1, 0), Direction.EAST)
+    second = tracker.move_sent(Point(2, 1, 0), Direction.EAST)
+
+    clock.now = 0.25
+    assert_that(tracker.position_received(Point(2, 1, 0))).is_equal_to(first)
+    clock.now = 0.5
+    assert_that(tracker.position_received(Point(3, 1, 0))).is_equal_to(second)
+
+    assert_that(listener.rtts).is_equal_to([0.25, 0.5])
+    assert_that(tracker.summary()).contains_entry(
+        {"sent": 2}, {"acknowledged": 2}, {"waiting": 0})
+    assert_that(tracker.rtt_histogram.count).is_equal_to(2)
+
+
+def test_moves_skipped_over_were_rejected(tracker):
+    listener = RecordingListener()
+    tracker.add_listener(listener)
+    # Bumps into a wall going north, then goes east instead.
+    tracker.move_sent(Point(1, 1, 0), Direction.NORTH)
+    tracker.move_sent(Point(1, 1, 0), Direction.EAST)
+
+    tracker.position_received(Point(2, 1, 0))
+
+    assert_that(tracker.rejected_count).is_equal_to(1)
+    assert_that(tracker.acknowledged_count).is_equal_to(1)
+    assert_that(listener.lost).is_equal_to([1])
+
+
+def test_positions_no_move_expected_are_unmatched(tracker):
+    tracker.move_sent(Point(1, 1, 0), Direction.EAST)
+
+    assert_that(tracker.position_received(Point(9, 9, 0))).is_none()
+
+    assert_that(tracker.unmatched_count).is_equal_to(1)
+    assert_that(tracker.waiting_count).is_equal_to(1)
+
+
+def test_moves_not_acknowledged_in_time_are_lost(tracker, clock):
+    listener = RecordingListener()
+    tracker.add_listener(listener)
+    tracker.move_sent(Point(1, 1, 0), Direction.EAST)
+    clock.now = 1
+    tracker.move_sent(Point(2, 1, 0), Direction.EAST)
+
+    clock.now = 2.5
+    assert_that(tracker.expire()).is_equal_to(1)
+
+    assert_that(tracker.lost_count).is_equal_to(1)
+    assert_that(tracker.waiting_count).is_equal_to(1)
+    assert_that(listener.lost).is_equal_to([1])
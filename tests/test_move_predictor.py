@@ -0,0 +1,107 @@
+import pytest
+from assertpy import assert_that
+from roguebot.move_predictor import MovePredictor
+from roguebot.navigation.direction import Direction
+from roguebot.navigation.point import Point
+from roguebot.state.entity import Entity
+from roguebot.state.state import State
+from tests.state.dungeon_draw import *
+from tests.fake_clock import FakeClock
+
+
+@pytest.fixture
+def state() -> State:
+    picture = """
+    ----------- level z=0 :
+    ##########
+    #        #
+    ##########
+    -----------
+    """
+    state = State()
+    state.dungeon_map = get_dungeon_from_picture(picture)
+    state.entities.add(Entity(char='@', name='me', position=Point(1, 1, 0), identifier='myId'))
+    state.my_entity_id = 'myId'
+    return state
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def predictor(clock) -> MovePredictor:
+    return MovePredictor(timeout_seconds=2, clock=clock)
+
+
+def my_position(state: State) -> Point:
+    return state.find_my_entity().position
+
+
+def test_sent_moves_are_applied_straight_away(state, predictor):
+    predictor.predict(state, Direction.EAST)
+    predictor.predict(state, Direction.EAST)
+
+    assert_that(my_position(state)).is_equal_to(Point(3, 1, 0))
+    assert_that(predictor.outstanding_count).is_equal_to(2)
+
+
+def test_moves_into_walls_or_entities_are_not_predicted(state, predictor):
+    state.entities.add(Entity(char='r', name='rat', position=Point(2, 1, 0), identifier='rat'))
+
+    assert_that(predictor.predict(state, Direction.NORTH)).is_none()
+    assert_that(predictor.predict(state, Direction.EAST)).is_none()
+
+    assert_that(my_position(state)).is_equal_to(Point(1, 1, 0))
+    assert_that(predictor.summary()).contains_entry({"not_predicted": 2})
+
+
+def test_server_position_confirms_predictions_up_to_it(state, predictor):
+    predictor.predict(state, Direction.EAST)
+    predictor.predict(state, Direction.EAST)
+    # The server's news of the first move overwrites our position...
+    state.update_position('myId', Point(2, 1, 0))
+
+    predictor.reconcile(state, Point(2, 1, 0))
+
+    # ... but we are still expecting to be one step further on.
+    assert_that(my_position(state)).is_equal_to(Point(3, 1, 0))
+    assert_that(predictor.confirmed_count).is_equal_to(1)
+    assert_that(predictor.outstanding_count).is_equal_to(1)
+
+
+def test_stale_server_position_is_not_a_misprediction(state, predictor):
+    predictor.predict(state, Direction.EAST)
+    # An update about us, sent before the server saw the move.
+    state.update_position('myId', Point(1, 1, 0))
+
+    predictor.reconcile(state, Point(1, 1, 0))
+
+    assert_that(my_position(state)).is_equal_to(Point(2, 1, 0))
+    assert_that(predictor.corrected_count).is_equal_to(0)
+
+
+def test_wrong_prediction_is_corrected(state, predictor):
+    predictor.predict(state, Direction.EAST)
+    state.update_position('myId', Point(5, 1, 0))
+
+    predictor.reconcile(state, Point(5, 1, 0))
+
+    assert_that(my_position(state)).is_equal_to(Point(5, 1, 0))
+    assert_that(predictor.corrected_count).is_equal_to(1)
+    assert_that(predictor.outstanding_count).is_equal_to(0)
+
+
+def test_unconfirmed_moves_expire(state, predictor, clock):
+    predictor.predict(state, Direction.EAST)
+
+    clock.now = 1
+    predictor.reconcile(state, None)
+    assert_that(my_position(state)).is_equal_to(Point(2, 1, 0))
+
+    clock.now = 3
+    predictor.reconcile(state, None)
+    assert_that(my_position(state)).is_equal_to(Point(1, 1, 0))
+    assert_that(predictor.expired_count).is_equal_to(1)
+
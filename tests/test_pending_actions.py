@@ -0,0 +1,72 @@
+import pytest
+from assertpy import assert_that
+from roguebot.action import EatAction, MoveAction, WieldAction
+from roguebot.navigation.direction import Direction
+from roguebot.navigation.point import Point
+from roguebot.pending_actions import PendingActionTracker
+from roguebot.state.entity import Entity
+from roguebot.state.item import Item
+from roguebot.state.state import State
+from tests.fake_clock import FakeClock
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock(1000.0)
+
+
+@pytest.fixture
+def apple() -> Item:
+    return Item(name='apple', edible=True)
+
+
+@pytest.fixture
+def hungry_state(apple) -> State:
+    state = State(my_entity_id='myId')
+    state.entities.add(Entity(char='@', name='me', position=Point(1, 1, 0),
+                              identifier='myId', inventory=[apple], hunger=5))
+    return state
+
+
+def test_same_item_action_is_only_sent_once(clock, hungry_state):
+    tracker = PendingActionTracker(clock=clock)
+
+    assert_that(tracker.should_send(EatAction('apple'), hungry_state)).is_true()
+    assert_that(tracker.should_send(EatAction('apple'), hungry_state)).is_false()
+    assert_that(tracker.should_send(EatAction('pie'), hungry_state)).is_true()
+
+    assert_that(tracker.suppressed_count).is_equal_to(1)
+    assert_that(tracker.pending_count).is_equal_to(2)
+
+
+def test_moves_are_never_held_back(clock, hungry_state):
+    tracker = PendingActionTracker(clock=clock)
+    for _ in range(3):
+        assert_that(tracker.should_send(
+            MoveAction(Direction.NORTH), hungry_state)).is_true()
+    assert_that(tracker.pending_count).is_equal_to(0)
+
+
+def test_action_can_be_sent_again_once_the_inventory_changes(clock, hungry_state, apple):
+    tracker = PendingActionTracker(clock=clock)
+    tracker.should_send(EatAction('apple'), hungry_state)
+
+    hungry_state.update_entity(Entity(char='@', name='me', position=Point(1, 1, 0),
+                                      identifier='myId', inventory=[], hunger=0))
+
+    assert_that(tracker.should_send(WieldAction('apple'), hungry_state)).is_true()
+    assert_that(tracker.should_send(EatAction('apple'), hungry_state)).is_true()
+    assert_that(tracker.confirmed_count).is_equal_to(1)
+
+
+def test_action_can_be_sent_again_after_the_time_to_live(clock, hungry_state):
+    tracker = PendingActionTracker(ttl_seconds=2, clock=clock)
+    tracker.should_send(EatAction('apple'), hungry_state)
+
+    clock.now += 1
+    assert_that(tracker.should_send(EatAction('apple'), hungry_state)).is_false()
+    clock.now += 1
+    assert_that(tracker.should_send(EatAction('apple'), hungry_state)).is_true()
+
+    assert_that(tracker.summary()).contains_entry(
+        {"expired": 1}, {"suppressed": 1}, {"sent": 2})
@@ -0,0 +1,129 @@
+import pytest
+from assertpy import assert_that
+from roguebot.brains.brain import GoalDrivenBrain
+from roguebot.brains.goal_stack import GoalStack
+from roguebot.goals.explore_goal import ExploreGoal
+from roguebot.goals.goal import Goal
+from roguebot.navigation.point import Point
+from roguebot.retention import RetentionPolicy
+from roguebot.state.entity import Entity
+from roguebot.state.item import Item
+from roguebot.state.state import State
+from tests.fake_clock import FakeClock
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock(1000.0)
+
+
+@pytest.fixture
+def state_on_floor_0() -> State:
+    state = State(my_entity_id='myId')
+    state.entities.add(Entity(char='@', name='me', position=Point(1, 1, 0),
+                              identifier='myId'))
+    return state
+
+
+def test_items_on_old_floors_are_forgotten(state_on_floor_0):
+    state = state_on_floor_0
+    for z in range(0, 4):
+        state.items.add(Item(position=Point(1, 1, z), name='apple'))
+    now = state.items.floor_touched_at(0)
+
+    evicted = state.items.evict_floors(0, max_floors=2, max_age_seconds=60,
+                                       now=now)
+
+    assert_that(evicted).is_length(2)
+    assert_that(state.items.floors).is_length(2).contains(0)
+
+
+def test_items_on_floors_left_long_ago_are_forgotten(state_on_floor_0):
+    state = state_on_floor_0
+    state.items.add(Item(position=Point(1, 1, 0), name='apple'))
+    state.items.add(Item(position=Point(1, 1, 1), name='apple'))
+    state.items.evict_floors(0, max_floors=5, max_age_seconds=60, now=0)
+
+    evicted = state.evict_item_floors(max_floors=5, max_age_seconds=60,
+                                      now=61)
+
+    assert_that(evicted).is_equal_to([1])
+    assert_that(state.items.floors).is_equal_to([0])
+
+
+def test_explore_goal_forgets_least_recently_visited_places():
+    goal = ExploreGoal()
+    for x in range(1, 6):
+        goal._remember_we_visited_this_point(Point(x, 1, 0), 0)
+    goal._remember_we_visited_this_point(Point(1, 1, 0), 0)
+    policy = RetentionPolicy(max_places_per_level=3)
+
+    forgotten = goal.compact(policy, 0, 0)
+
+    assert_that(forgotten).is_equal_to(2)
+    assert_that(goal.retained_size).is_equal_to(3)
+    assert_that(goal._visit_count(Point(1, 1, 0))).is_equal_to(2)
+    assert_that(goal._visit_count(Point(2, 1, 0))).is_equal_to(0)
+
+
+def test_explore_goal_forgets_other_levels_but_not_this_one(clock):
+    goal = ExploreGoal()
+    for z in range(0, 3):
+        goal._remember_we_visited_this_point(Point(1, 1, z), clock())
+    policy = RetentionPolicy(max_levels=1)
+
+    goal.compact(policy, 0, clock())
+
+    assert_that(list(goal._places_visited.keys())).is_equal_to([0])
+
+
+def test_brain_drops_oldest_goals_beyond_max_depth():
+    brain = GoalDrivenBrain()
+    oldest = Goal()
+    brain._goals = GoalStack([oldest] + [Goal() for _ in range(4)])
+
+    report = brain.compact(RetentionPolicy(max_goal_depth=3), 0, 0)
+
+    assert_that(brain._goals).is_length(3).does_not_contain(oldest)
+    assert_that(report).contains_entry({'goal_depth': 3}, {'goals_dropped': 2})
+
+
+def test_compaction_runs_periodically_and_reports_sizes(state_on_floor_0):
+    policy = RetentionPolicy(compact_every_ticks=2)
+    brain = GoalDrivenBrain()
+
+    assert_that(policy.on_tick(state_on_floor_0, brain)).is_false()
+    assert_that(policy.last_report).is_empty()
+    assert_that(policy.on_tick(state_on_floor_0, brain)).is_true()
+
+    assert_that(policy.last_report).contains_entry(
+        {'compactions': 1}, {'items': 0}, {'goal_depth': 0})
+
+
+def test_items_and_goals_are_aged_with_the_states_clock(clock):
+    state = State(my_entity_id='myId', clock=clock)
+    state.entities.add(Entity(char='@', name='me', position=Point(1, 1, 1),
+                              identifier='myId'))
+    state.update_items({'(2,2,0)': [
+        {'pos': {'x': 2, 'y': 2, 'z': 0}, 'name': 'apple',
+         'edible': True, 'wieldable': False, 'wearable': False}]}, level=0)
+    goal = ExploreGoal()
+    goal._remember_we_visited_this_point(Point(1, 1, 0), state.clock())
+    brain = GoalDrivenBrain()
+    brain._goals = GoalStack([goal])
+    policy = RetentionPolicy(max_level_age_seconds=60)
+
+    clock.now += 60
+    policy.compact(state, brain)
+    assert_that(state.items.floors).is_equal_to([0])
+    assert_that(goal._places_visited).contains_key(0)
+
+    clock.now += 1
+    policy.compact(state, brain)
+    assert_that(state.items.floors).is_empty()
+    assert_that(goal._places_visited).does_not_contain_key(0)
+
+
+def test_goal_stack_and_policy_share_one_default_depth():
+    assert_that(RetentionPolicy().max_goal_depth).is_equal_to(
+        GoalStack().max_depth)
@@ -0,0 +1,92 @@
+from assertpy import assert_that
+from roguebot.tick_scheduler import AdaptiveTickScheduler, FixedTickScheduler, \
+    create_tick_scheduler
+
+
+def acting_ticks(scheduler, tick_count: int, tick_seconds: float = 0.1) -> [int]:
+    acted = []
+    for tick in range(tick_count):
+        scheduler.observe_tick(tick * tick_seconds)
+        if scheduler.should_act():
+            acted.append(tick)
+    return acted
+
+
+def test_fixed_scheduler_acts_every_11_minus_speed_ticks():
+    scheduler = FixedTickScheduler(speed=8, actions_per_turn=2)
+
+    assert_that(acting_ticks(scheduler, 10)).is_equal_to([3, 6, 9])
+    assert_that(scheduler.moves_per_act).is_equal_to(2)
+    assert_that(scheduler.summary()).contains_entry({"mode": "fixed"}, {"acts": 3})
+
+
+def test_adaptive_scheduler_acts_every_tick_when_deciding_is_quick():
+    scheduler = AdaptiveTickScheduler()
+    scheduler.observe_decision(0.001)
+
+    assert_that(acting_ticks(scheduler, 5)).is_equal_to([0, 1, 2, 3, 4])
+
+
+def test_adaptive_scheduler_acts_less_often_when_deciding_is_slow():
+    scheduler = AdaptiveTickScheduler()
+    # Deciding takes 0.15s, and only half of each 0.1s tick may be spent deciding.
+    scheduler.observe_decision(0.15)
+
+    assert_that(acting_ticks(scheduler, 10)).is_equal_to([0, 3, 6, 9])
+    assert_that(scheduler.act_every_ticks).is_equal_to(3)
+
+
+def test_adaptive_scheduler_never_waits_longer_than_its_bound():
+    scheduler = AdaptiveTickScheduler(max_act_every_ticks=4)
+    scheduler.observe_decision(10)
+
+    acting_ticks(scheduler, 10)
+
+    assert_that(scheduler.act_every_ticks).is_equal_to(4)
+
+
+def test_adaptive_scheduler_acts_less_often_when_moves_are_slow_to_confirm():
+    scheduler = AdaptiveTickScheduler(max_moves_in_flight=2)
+    scheduler.observe_decision(0.001)
+    scheduler.observe_move_rtt(0.5)
+
+    acting_ticks(scheduler, 3)
+
+    # One move per act, 0.5s to confirm, at most 2 in flight
+    # means acting at most every 0.25s, which is 3 ticks.
+    assert_that(scheduler.act_every_ticks).is_equal_to(3)
+
+
+def test_adaptive_moves_per_act_grow_as_moves_are_confirmed_and_halve_when_lost():
+    scheduler = AdaptiveTickScheduler(max_moves_per_act=4, increase_after_confirmed=2)
+
+    for _ in range(10):
+        scheduler.observe_move_rtt(0.01)
+    assert_that(scheduler.moves_per_act).is_equal_to(4)
+
+    scheduler.observe_moves_lost(1)
+    assert_that(scheduler.moves_per_act).is_equal_to(2)
+    scheduler.observe_moves_lost(1)
+    scheduler.observe_moves_lost(1)
+    assert_that(scheduler.moves_per_act).is_equal_to(1)
+
+
+def test_create_tick_scheduler_by_name():
+    assert_that(create_tick_scheduler("fixed", 5, 1)).is_instance_of(FixedTickScheduler)
+    assert_that(create_tick_scheduler("adaptive", 5, 3).summary()).contains_entry(
+        {"mode": "adaptive"})
+
+
+def test_adaptive_scheduler_never_acts_more_often_than_speed_allows():
+    scheduler = create_tick_scheduler("adaptive", 8, 1)
+    scheduler.observe_decision(0.001)
+
+    # Deciding is quick, but speed 8 means acting every 3 ticks at most.
+    assert_that(acting_ticks(scheduler, 10)).is_equal_to([0, 3, 6, 9])
+
+
+def test_adaptive_scheduler_at_full_speed_acts_every_tick():
+    scheduler = create_tick_scheduler("adaptive", 10, 1)
+    scheduler.observe_decision(0.001)
+
+    assert_that(acting_ticks(scheduler, 4)).is_equal_to([0, 1, 2, 3])
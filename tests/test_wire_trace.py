@@ -0,0 +1,92 @@
+import json
+import os
+import tempfile
+import pytest
+from unittest import IsolatedAsyncioTestCase
+from assertpy import assert_that
+from roguebot.client import EntityClient
+from roguebot.state.entity import Entity
+from roguebot.navigation.point import Point
+from roguebot.wire_trace import WireTracer
+
+
+def read_records(path) -> list:
+    with open(path, encoding='utf-8') as trace_file:
+        return [json.loads(line) for line in trace_file if len(line.strip()) > 0]
+
+
+class NeverCalledData():
+    """ Fails the test if anyone tries to turn it into json. """
+
+    def __getattr__(self, name):
+        raise AssertionError("Payload should not have been looked at")
+
+
+def test_disabled_tracer_does_nothing():
+    tracer = WireTracer()
+    assert_that(tracer.enabled).is_false()
+    assert_that(tracer.trace('update', NeverCalledData())).is_false()
+
+
+def test_writes_one_compact_line_per_event(tmp_path):
+    path = tmp_path / "wire.ndjson"
+    tracer = WireTracer(file_path=str(path), payload_bytes=8, clock=lambda: 12.5)
+
+    tracer.trace('position', {'id': 'abc', 'pos': {'x': 1, 'y': 2, 'z': 0}})
+    tracer.trace('message', 'hello')
+    tracer.close()
+
+    records = read_records(path)
+    assert_that(records).is_length(2)
+    assert_that(records[0]).is_equal_to({
+        "event": "position", "t": 12.5,
+        "size": len('{"id":"abc","pos":{"x":1,"y":2,"z":0}}'),
+        "sample": '{"id":"a'})
+    assert_that(records[1]["sample"]).is_equal_to('"hello"')
+
+
+def test_events_can_be_sampled(tmp_path):
+    path = tmp_path / "wire.ndjson"
+    rolls = iter([0.05, 0.5, 0.05])
+    tracer = WireTracer(file_path=str(path),
+                        sample_rates={'position': 0.1, 'update': 0},
+                        rng=lambda: next(rolls))
+
+    for _ in range(3):
+        tracer.trace('position', {})
+    tracer.trace('update', NeverCalledData())
+    tracer.trace('items', [])
+    tracer.close()
+
+    assert_that([record["event"] for record in read_records(path)]).is_equal_to(
+        ['position', 'position', 'items'])
+    assert_that(tracer.written_count).is_equal_to(3)
+    assert_that(tracer.skipped_count).is_equal_to(2)
+
+
+def test_payload_can_be_left_out(tmp_path):
+    path = tmp_path / "wire.ndjson"
+    tracer = WireTracer(file_path=str(path), payload_bytes=0)
+    tracer.trace('items', [1, 2, 3])
+    tracer.close()
+
+    assert_that(read_records(path)[0]).does_not_contain_key("sample")
+
+
+class AsyncWireTraceTest(IsolatedAsyncioTestCase):
+
+    async def test_client_traces_events_it_receives(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "wire.ndjson")
+            tracer = WireTracer(file_path=path)
+            client = EntityClient("fred", "warrior", "http://localhost:2999",
+                                  wire_tracer=tracer)
+            client.state.entities.add(Entity(char='@', name='fred',
+                                             position=Point(1, 1, 0), identifier='abc'))
+
+            await client.position_received({'id': 'abc', 'pos': {'x': 2, 'y': 1, 'z': 0}})
+            await client.message_received("hello")
+            tracer.close()
+
+            assert_that([record["event"] for record in read_records(path)]).is_equal_to(
+                ['position', 'message'])